@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+Build (or load) the IVF track-similarity index and report recall@k and QPS.
+
+Inputs:
+  --features: feature store CSV (track_id + numeric feature columns); omit to use
+              synthetic clustered embeddings of --rows x --dims.
+  --index:    bundle path; built and saved if missing, memory-mapped if present.
+
+Example:
+  PYTHONPATH=src python scripts/bench_ann.py --rows 200000 --index data/tracks.ivf --n-lists 512
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from classically_punk.graph.ann import IVFIndex, benchmark_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the approximate nearest-neighbour index.")
+    parser.add_argument("--features", type=Path, default=None)
+    parser.add_argument("--index", type=Path, default=None)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--dims", type=int, default=36)
+    parser.add_argument("--n-lists", type=int, default=None)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=1_000)
+    parser.add_argument("--n-probes", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    if args.index and args.index.exists():
+        index = IVFIndex.load(args.index)
+        print(f"Loaded {len(index)} vectors from {args.index} in {time.perf_counter() - t0:.3f}s")
+    else:
+        if args.features:
+            index = IVFIndex.from_feature_store(args.features, n_lists=args.n_lists)
+        else:
+            rng = np.random.default_rng(0)
+            centers = rng.normal(size=(max(args.rows // 200, 1), args.dims))
+            X = centers[rng.integers(0, centers.shape[0], args.rows)] + 0.3 * rng.normal(size=(args.rows, args.dims))
+            index = IVFIndex.build(X, [f"track::{i}" for i in range(args.rows)], n_lists=args.n_lists)
+        print(f"Built {len(index)} vectors / {index.n_lists} lists in {time.perf_counter() - t0:.2f}s")
+        if args.index:
+            index.save(args.index)
+            print(f"Saved index to {args.index}")
+
+    rng = np.random.default_rng(1)
+    sample = rng.choice(len(index), min(args.queries, len(index)), replace=False)
+    queries = np.asarray(index.vectors[np.sort(sample)])
+    report = benchmark_index(index, queries, k=args.k, n_probes=args.n_probes)
+    print(report.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Compare peak RSS and wall time of the streaming graph exporters against the
+networkx path (edges_to_networkx + node_link_data/json.dumps or write_graphml).
+
+Each exporter runs in its own child process so peak RSS is measured in isolation.
+Edges are synthetic SIMILAR_TO EdgeArrays over --nodes ids.
+
+Example:
+  PYTHONPATH=src python scripts/bench_export.py --edges 10000000 --out-dir /tmp/export_bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing as mp
+import resource
+import time
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+
+from classically_punk.graph.export import edges_to_networkx, stream_graphml, stream_node_link_json
+from classically_punk.graph.schema import EdgeArrays
+
+
+def _edges(n_edges: int, n_nodes: int) -> EdgeArrays:
+    rng = np.random.default_rng(0)
+    ids = np.array([f"track::{i}" for i in range(n_nodes)], dtype=object)
+    return EdgeArrays(
+        src=ids[rng.integers(0, n_nodes, n_edges)],
+        dst=ids[rng.integers(0, n_nodes, n_edges)],
+        weight=rng.random(n_edges),
+        type="SIMILAR_TO",
+        source="embedding",
+    )
+
+
+def _run(kind: str, n_edges: int, n_nodes: int, out: Path, queue) -> None:
+    edges = _edges(n_edges, n_nodes)
+    t0 = time.perf_counter()
+    if kind == "json-networkx":
+        out.write_text(json.dumps(nx.readwrite.json_graph.node_link_data(edges_to_networkx(edges.to_edges()))))
+    elif kind == "json-stream":
+        stream_node_link_json(edges, out)
+    elif kind == "json-stream-gz":
+        stream_node_link_json(edges, out, compress=True)
+    elif kind == "graphml-networkx":
+        nx.write_graphml(edges_to_networkx(edges.to_edges()), out)
+    elif kind == "graphml-stream":
+        stream_graphml(edges, out)
+    elapsed = time.perf_counter() - t0
+    queue.put((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark graph exporters.")
+    parser.add_argument("--edges", type=int, default=1_000_000)
+    parser.add_argument("--nodes", type=int, default=100_000)
+    parser.add_argument("--out-dir", type=Path, default=Path("/tmp/export_bench"))
+    parser.add_argument(
+        "--kinds",
+        nargs="+",
+        default=["json-networkx", "json-stream", "json-stream-gz", "graphml-networkx", "graphml-stream"],
+    )
+    args = parser.parse_args()
+    args.out_dir.mkdir(parents=True, exist_ok=True)
+
+    # Baseline RSS of a child that only builds the input edges.
+    ctx = mp.get_context("spawn")
+    for kind in ["inputs-only", *args.kinds]:
+        suffix = ".json.gz" if kind.endswith("gz") else (".graphml" if "graphml" in kind else ".json")
+        out = args.out_dir / f"{kind}{suffix}"
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_run, args=(kind, args.edges, args.nodes, out, queue))
+        proc.start()
+        elapsed, peak_mb = queue.get()
+        proc.join()
+        size = out.stat().st_size / 1e6 if out.exists() else 0.0
+        print(f"{kind:18s} time={elapsed:8.2f}s peak_rss={peak_mb:9.1f}MB file={size:9.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
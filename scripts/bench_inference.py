@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Compare genre scoring latency of the sklearn Pipeline against the exported
+LinearPredictor: per-request p50/p99 for single clips and small batches, and
+throughput for a large memory-mapped feature matrix.
+
+Example:
+  PYTHONPATH=src python scripts/bench_inference.py --features 57 --classes 10 --batch-rows 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from classically_punk.models.inference import LinearPredictor, export_linear_classifier
+
+
+def _latencies(fn, rows: np.ndarray, calls: int) -> np.ndarray:
+    out = np.empty(calls)
+    for i in range(calls):
+        x = rows[i % rows.shape[0]]
+        t0 = time.perf_counter()
+        fn(x)
+        out[i] = time.perf_counter() - t0
+    return out * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark exported linear classifier inference.")
+    parser.add_argument("--features", type=int, default=57)
+    parser.add_argument("--classes", type=int, default=10)
+    parser.add_argument("--train-rows", type=int, default=20_000)
+    parser.add_argument("--calls", type=int, default=5_000)
+    parser.add_argument("--request-sizes", type=int, nargs="+", default=[1, 32])
+    parser.add_argument("--batch-rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = rng.normal(scale=3.0, size=(args.classes, args.features))
+    y = rng.integers(0, args.classes, size=args.train_rows)
+    X = centers[y] + rng.normal(size=(args.train_rows, args.features))
+    clf = Pipeline([("scale", StandardScaler()), ("logreg", LogisticRegression(max_iter=1000))]).fit(X, y.astype(str))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        path = export_linear_classifier(clf, Path(tmp) / "models", feature_cols=[f"f{i}" for i in range(args.features)])
+        predictor = LinearPredictor.load(path)
+        print(f"export+load {1e3 * (time.perf_counter() - t0):.1f}ms  bundle={path.stat().st_size} bytes")
+
+        for size in args.request_sizes:
+            requests = X[: size * 100].reshape(100, size, args.features)
+            for name, fn in (("sklearn", clf.predict_proba), ("predictor", predictor.predict_proba)):
+                lat = _latencies(fn, requests, args.calls)
+                print(f"rows/request={size:4d} {name:10s} p50={np.percentile(lat, 50):8.1f}us p99={np.percentile(lat, 99):8.1f}us")
+
+        batch_path = Path(tmp) / "batch.npy"
+        batch = np.lib.format.open_memmap(batch_path, mode="w+", dtype=np.float32, shape=(args.batch_rows, args.features))
+        for start in range(0, args.batch_rows, 100_000):
+            stop = min(start + 100_000, args.batch_rows)
+            batch[start:stop] = centers[rng.integers(0, args.classes, size=stop - start)] + rng.normal(size=(stop - start, args.features))
+        batch.flush()
+        del batch
+        mapped = np.load(batch_path, mmap_mode="r")
+        t0 = time.perf_counter()
+        labels = predictor.predict(mapped)
+        fast_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        reference = clf.predict(np.asarray(mapped))
+        sk_s = time.perf_counter() - t0
+        agree = (labels == reference).mean()
+        print(
+            f"batch rows={args.batch_rows} predictor={fast_s:.2f}s ({args.batch_rows / fast_s:,.0f} rows/s) "
+            f"sklearn={sk_s:.2f}s agreement={agree:.5f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
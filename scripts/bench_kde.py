@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+"""
+Time the exact (sklearn KernelDensity) and FFT grid KDE engines of
+kde_density_surface across point counts and grid sizes, and report the FFT
+engine's max error relative to the exact density peak.
+
+The exact engine is skipped once N * grid_size^3 exceeds --exact-max-evals.
+
+Example:
+  PYTHONPATH=src python scripts/bench_kde.py --rows 1000 10000 100000 --grids 30 60 100
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from classically_punk.features.visualization import kde_density_surface
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark KDE density engines.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--grids", type=int, nargs="+", default=[30, 60])
+    parser.add_argument("--bandwidth", type=float, default=0.5)
+    parser.add_argument("--exact-max-evals", type=float, default=5e8)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    for n in args.rows:
+        coords = np.vstack([rng.normal(size=(n // 2, 3)), rng.normal(loc=3.0, size=(n - n // 2, 3))])
+        for grid in args.grids:
+            t0 = time.perf_counter()
+            fast = kde_density_surface(coords, bandwidth=args.bandwidth, grid_size=grid, method="fft")["density"]
+            fft_s = time.perf_counter() - t0
+            line = f"rows={n:8d} grid={grid:4d} fft={fft_s:8.3f}s"
+            if n * grid**3 <= args.exact_max_evals:
+                t0 = time.perf_counter()
+                exact = kde_density_surface(coords, bandwidth=args.bandwidth, grid_size=grid, method="exact")["density"]
+                exact_s = time.perf_counter() - t0
+                err = np.abs(exact - fast).max() / exact.max()
+                line += f" exact={exact_s:8.3f}s speedup={exact_s / fft_s:8.1f}x rel_max_err={err:.4f}"
+            else:
+                line += " exact=skipped"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+Compare wall time and peak RSS of project_with_umap (UMAP on raw features)
+against the large-scale modes of project_large.
+
+Each mode runs in its own child process so peak RSS is measured in isolation,
+after an untimed warm-up run that absorbs numba JIT compilation.
+Features are synthetic Gaussian clusters (36 dims by default, matching the
+extracted feature vector) with one label per cluster.
+
+Example:
+  PYTHONPATH=src python scripts/bench_projection.py --rows 200000 --landmarks 20000 --n-jobs 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import resource
+import time
+
+import numpy as np
+import pandas as pd
+
+from classically_punk.features.projection import project_large, project_with_umap
+
+
+def _frame(rows: int, dims: int, clusters: int = 20) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    labels = rng.integers(0, clusters, rows)
+    centers = rng.normal(scale=4.0, size=(clusters, dims))
+    X = (centers[labels] + rng.normal(size=(rows, dims))).astype(np.float32)
+    df = pd.DataFrame(X, columns=[f"f{i}" for i in range(dims)])
+    df["label"] = [f"genre{c}" for c in labels]
+    return df
+
+
+def _project(kind: str, df: pd.DataFrame, args, landmarks: int) -> None:
+    if kind == "umap-raw":
+        project_with_umap(df, n_neighbors=args.n_neighbors)
+    elif kind == "large-pca":
+        project_large(df, n_neighbors=args.n_neighbors, pca_components=args.pca)
+    elif kind == "large-blocked-knn":
+        project_large(df, n_neighbors=args.n_neighbors, pca_components=args.pca, blocked_knn=True)
+    elif kind == "large-landmarks":
+        project_large(df, n_neighbors=args.n_neighbors, pca_components=args.pca, landmarks=landmarks, n_jobs=args.n_jobs)
+
+
+def _run(kind: str, args, queue) -> None:
+    # Untimed warm-up so numba JIT compilation is not counted. UMAP switches to its
+    # NN-descent code path above 4096 rows, so the warm-up must exceed that too.
+    _project(kind, _frame(5000, args.dims), args, landmarks=4200)
+    df = _frame(args.rows, args.dims)
+    t0 = time.perf_counter()
+    _project(kind, df, args, landmarks=args.landmarks)
+    elapsed = time.perf_counter() - t0
+    queue.put((elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark projection modes.")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--dims", type=int, default=36)
+    parser.add_argument("--n-neighbors", type=int, default=15)
+    parser.add_argument("--pca", type=int, default=16)
+    parser.add_argument("--landmarks", type=int, default=10_000)
+    parser.add_argument("--n-jobs", type=int, default=None)
+    parser.add_argument("--kinds", nargs="+", default=["umap-raw", "large-pca", "large-blocked-knn", "large-landmarks"])
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    for kind in ["inputs-only", *args.kinds]:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_run, args=(kind, args, queue))
+        proc.start()
+        elapsed, peak_mb = queue.get()
+        proc.join()
+        print(f"{kind:18s} rows={args.rows} time={elapsed:8.2f}s peak_rss={peak_mb:9.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
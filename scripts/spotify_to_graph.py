@@ -8,67 +8,146 @@ Inputs (from fetch_spotify.py):
 
 Outputs:
   data_samples/spotify_edges.csv with columns: src,dst,type,weight,source,version
+
+Tracks are processed column-wise in chunks, so memory stays bounded on large
+exports; repeated playlist-track and artist-track pairs are written once.
 """
 
 from __future__ import annotations
 
 import argparse
+import shutil
 from pathlib import Path
+from typing import Dict, Iterator, Set
 
+import numpy as np
 import pandas as pd
 
 
-def build_edges(playlists_csv: Path, tracks_csv: Path) -> pd.DataFrame:
-    playlists = pd.read_csv(playlists_csv)
-    tracks = pd.read_csv(tracks_csv)
-
-    edges = []
-
-    # Playlist -> track edges
-    for _, row in tracks.iterrows():
-        pl_id = row.get("playlist_id")
-        track_id = row.get("track_id")
-        if pd.isna(pl_id) or pd.isna(track_id):
-            continue
-        edges.append(
-            {
-                "src": f"playlist::{pl_id}",
-                "dst": f"track::{track_id}",
-                "type": "IN_PLAYLIST",
-                "weight": 1.0,
-                "source": "spotify",
-                "version": "v1",
-            }
-        )
-
-    # Track -> artist edges
-    for _, row in tracks.iterrows():
-        track_id = row.get("track_id")
-        if pd.isna(track_id):
-            continue
-        artist_ids = row.get("artist_ids", "")
-        if isinstance(artist_ids, str):
-            try:
-                # artist_ids stored as list-like string: "['id1', 'id2']" or "[id1, id2]"
-                cleaned = artist_ids.strip("[]").replace("'", "").split(",")
-                cleaned = [a.strip() for a in cleaned if a.strip()]
-            except Exception:
-                cleaned = []
-        else:
-            cleaned = []
-        for aid in cleaned:
-            edges.append(
-                {
-                    "src": f"artist::{aid}",
-                    "dst": f"track::{track_id}",
-                    "type": "PERFORMS",
-                    "weight": 1.0,
-                    "source": "spotify",
-                    "version": "v1",
-                }
+EDGE_COLUMNS = ["src", "dst", "type", "weight", "source", "version"]
+TRACK_COLUMNS = {"playlist_id", "track_id", "artist_ids"}
+
+
+def _edge_frame(src: pd.Series, dst: pd.Series, edge_type: str) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "src": src.to_numpy(dtype=object),
+            "dst": dst.to_numpy(dtype=object),
+            "type": edge_type,
+            "weight": 1.0,
+            "source": "spotify",
+            "version": "v1",
+        },
+        columns=EDGE_COLUMNS,
+    )
+
+
+def parse_artist_ids(artist_ids: pd.Series) -> pd.Series:
+    """
+    Explode list-like strings ("['id1', 'id2']" or "[id1, id2]") into one artist id per row.
+    """
+    parsed = artist_ids.where(artist_ids.map(lambda v: isinstance(v, str)), "")
+    exploded = parsed.str.strip("[]").str.replace("'", "", regex=False).str.split(",").explode().str.strip()
+    return exploded[exploded.notna() & (exploded != "")]
+
+
+class _PairFilter:
+    """
+    Exact (src, dst) deduplication across chunks.
+
+    Node ids get incremental integer codes and each pair one int64 key (src << 32 | dst), so
+    memory grows with the unique nodes and pairs only and each chunk costs O(chunk).
+    """
+
+    def __init__(self) -> None:
+        self.codes: Dict[str, int] = {}
+        self.seen: Set[int] = set()
+
+    def _encode(self, ids: pd.Series) -> np.ndarray:
+        codes = ids.map(self.codes)
+        new = pd.unique(ids[codes.isna()])
+        if len(new):
+            self.codes.update(zip(new, range(len(self.codes), len(self.codes) + len(new))))
+            if len(self.codes) > 2**32:
+                raise ValueError("Too many distinct node ids for 32-bit pair keys.")
+            codes = ids.map(self.codes)
+        return codes.to_numpy(dtype=np.int64)
+
+    def new_pairs(self, edges: pd.DataFrame) -> pd.DataFrame:
+        """
+        Drop pairs already seen in earlier chunks or repeated within this one.
+        """
+        if edges.empty:
+            return edges
+        keys = (self._encode(edges["src"]) << 32) | self._encode(edges["dst"])
+        fresh = ~pd.Series(keys).duplicated().to_numpy()
+        fresh &= np.fromiter((k not in self.seen for k in keys.tolist()), dtype=bool, count=len(keys))
+        self.seen.update(keys[fresh].tolist())
+        return edges[fresh]
+
+
+def iter_edge_chunks(tracks_csv: Path, chunksize: int = 200_000) -> Iterator[tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    Yield (IN_PLAYLIST, PERFORMS) edge frames per chunk of the tracks CSV.
+
+    Repeated playlist-track and artist-track pairs are emitted once across the whole file.
+    """
+    pairs = _PairFilter()
+    with pd.read_csv(tracks_csv, chunksize=chunksize, dtype=str, usecols=lambda c: c in TRACK_COLUMNS) as reader:
+        for tracks in reader:
+            track_id = tracks["track_id"] if "track_id" in tracks else pd.Series(np.nan, index=tracks.index, dtype=object)
+            playlist_id = tracks["playlist_id"] if "playlist_id" in tracks else pd.Series(np.nan, index=tracks.index, dtype=object)
+
+            has_pair = playlist_id.notna() & track_id.notna()
+            in_playlist = _edge_frame(
+                "playlist::" + playlist_id[has_pair],
+                "track::" + track_id[has_pair],
+                "IN_PLAYLIST",
             )
-
-    return pd.DataFrame(edges)
+            in_playlist = pairs.new_pairs(in_playlist)
+
+            if "artist_ids" in tracks:
+                has_track = track_id.notna()
+                artists = parse_artist_ids(tracks.loc[has_track, "artist_ids"])
+                performs = pairs.new_pairs(
+                    _edge_frame("artist::" + artists, "track::" + track_id.loc[artists.index], "PERFORMS")
+                )
+            else:
+                performs = _edge_frame(pd.Series(dtype=object), pd.Series(dtype=object), "PERFORMS")
+            yield in_playlist, performs
+
+
+def build_edges(playlists_csv: Path, tracks_csv: Path, chunksize: int = 200_000) -> pd.DataFrame:
+    """
+    Build playlist->track and artist->track edges (all IN_PLAYLIST rows first, then PERFORMS).
+    """
+    in_playlist = []
+    performs = []
+    for pl_chunk, perf_chunk in iter_edge_chunks(tracks_csv, chunksize=chunksize):
+        in_playlist.append(pl_chunk)
+        performs.append(perf_chunk)
+    return pd.concat(in_playlist + performs, ignore_index=True)
+
+
+def write_edges(tracks_csv: Path, output: Path, chunksize: int = 200_000) -> int:
+    """
+    Stream edges to CSV with bounded memory; PERFORMS rows are spooled and appended after IN_PLAYLIST.
+    """
+    output.parent.mkdir(parents=True, exist_ok=True)
+    spool = output.with_name(output.name + ".performs.tmp")
+    total = 0
+    try:
+        with open(output, "w", newline="") as out, open(spool, "w", newline="") as perf:
+            out.write(",".join(EDGE_COLUMNS) + "\n")
+            for pl_chunk, perf_chunk in iter_edge_chunks(tracks_csv, chunksize=chunksize):
+                pl_chunk.to_csv(out, index=False, header=False)
+                perf_chunk.to_csv(perf, index=False, header=False)
+                total += len(pl_chunk) + len(perf_chunk)
+        with open(spool) as perf, open(output, "a", newline="") as out:
+            shutil.copyfileobj(perf, out)
+    finally:
+        spool.unlink(missing_ok=True)
+    return total
 
 
 def main():
@@ -76,12 +155,11 @@ def main():
     parser.add_argument("--playlists", type=Path, default=Path("data_samples/spotify_playlists.csv"))
     parser.add_argument("--tracks", type=Path, default=Path("data_samples/spotify_tracks.csv"))
     parser.add_argument("--output", type=Path, default=Path("data_samples/spotify_edges.csv"))
+    parser.add_argument("--chunksize", type=int, default=200_000, help="Track rows processed per chunk")
     args = parser.parse_args()
 
-    edges_df = build_edges(args.playlists, args.tracks)
-    args.output.parent.mkdir(parents=True, exist_ok=True)
-    edges_df.to_csv(args.output, index=False)
-    print(f"Wrote {len(edges_df)} edges to {args.output}")
+    total = write_edges(args.tracks, args.output, chunksize=args.chunksize)
+    print(f"Wrote {total} edges to {args.output}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,254 @@
+"""
+Shared normalisation statistics for the feature store.
+
+compute_normalization_stats makes one streaming pass over the store: per-column
+count/mean/variance are merged chunk by chunk with the pairwise update used by
+GenreAccumulator, and a fixed-size uniform row reservoir (bottom-k random
+priorities) yields approximate quantiles. The result is saved as an array
+bundle fingerprinted with the store it came from, and consumers (kNN edge
+building, UMAP projection, the baseline classifier) apply it instead of
+refitting a scaler on their own copy of the data.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+
+from classically_punk.features.store import META_COLUMNS, feature_columns, iter_feature_chunks
+from classically_punk.storage import load_bundle, save_bundle
+
+DEFAULT_QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+
+def store_fingerprint(path: Path) -> str:
+    """
+    Cheap identity of a feature store file (name, size, mtime) used to version its stats.
+    """
+    st = os.stat(path)
+    key = f"{Path(path).name}:{st.st_size}:{st.st_mtime_ns}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12]
+
+
+class FrozenScaler(StandardScaler):
+    """
+    StandardScaler with preset statistics: fit copies mean/scale instead of estimating them.
+
+    The statistics are constructor parameters, so sklearn.base.clone (cross-validation,
+    grid search) yields an equivalent scaler rather than an unfitted one.
+    """
+
+    def __init__(self, mean=None, scale=None, feature_cols=None, check_feature_names=False, copy=True):
+        super().__init__(copy=copy)
+        self.mean = mean
+        self.scale = scale
+        self.feature_cols = feature_cols
+        self.check_feature_names = check_feature_names
+
+    def fit(self, X=None, y=None, sample_weight=None):
+        if self.mean is None or self.scale is None:
+            raise ValueError("FrozenScaler needs preset mean and scale.")
+        self.mean_ = np.asarray(self.mean, dtype=np.float64)
+        self.scale_ = np.asarray(self.scale, dtype=np.float64)
+        self.var_ = self.scale_**2
+        self.n_samples_seen_ = 0
+        self.n_features_in_ = self.mean_.shape[0]
+        if self.feature_cols is not None:
+            self.feature_cols_ = list(self.feature_cols)
+            if self.check_feature_names:
+                self.feature_names_in_ = np.asarray(self.feature_cols, dtype=object)
+        return self
+
+    def partial_fit(self, X=None, y=None, sample_weight=None):
+        return self.fit(X, y)
+
+
+@dataclass
+class NormalizationStats:
+    feature_cols: List[str]
+    count: np.ndarray  # non-missing values per column
+    mean: np.ndarray
+    std: np.ndarray
+    quantile_levels: np.ndarray
+    quantiles: np.ndarray  # (n_levels, n_features), approximate (reservoir sample)
+    version: str = "v1"
+    meta: Dict[str, object] = field(default_factory=dict)
+
+    def _quantile(self, level: float) -> np.ndarray:
+        hit = np.flatnonzero(np.isclose(self.quantile_levels, level))
+        if hit.size == 0:
+            raise ValueError(f"Quantile {level} was not computed; available: {self.quantile_levels.tolist()}")
+        return self.quantiles[hit[0]]
+
+    def center_scale(self, method: str = "standard") -> tuple[np.ndarray, np.ndarray]:
+        """
+        (center, scale) per column: mean/std for "standard", median/IQR for "robust".
+        Constant columns get scale 1.
+        """
+        if method == "standard":
+            center, scale = self.mean, self.std
+        elif method == "robust":
+            center, scale = self._quantile(0.5), self._quantile(0.75) - self._quantile(0.25)
+        else:
+            raise ValueError(f"Unknown normalisation method: {method}")
+        return center, np.where(scale > 0, scale, 1.0)
+
+    def transform(self, X, method: str = "standard", dtype=np.float32) -> np.ndarray:
+        """
+        Normalise a DataFrame (columns selected by name) or an array whose columns follow feature_cols.
+        """
+        if isinstance(X, pd.DataFrame):
+            X = X[self.feature_cols].to_numpy(dtype=np.float64)
+        X = np.asarray(X)
+        if X.ndim != 2 or X.shape[1] != len(self.feature_cols):
+            raise ValueError(f"Expected {len(self.feature_cols)} feature columns, got shape {X.shape}.")
+        center, scale = self.center_scale(method)
+        return ((X - center) / scale).astype(dtype, copy=False)
+
+    def as_scaler(self, method: str = "standard", feature_names: bool = False) -> FrozenScaler:
+        """
+        A fitted, non-refitting sklearn scaler for Pipelines (feature_names=True when fed DataFrames).
+        """
+        center, scale = self.center_scale(method)
+        return FrozenScaler(
+            mean=center.astype(np.float64),
+            scale=scale.astype(np.float64),
+            feature_cols=list(self.feature_cols),
+            check_feature_names=feature_names,
+        ).fit()
+
+    def is_current(self, store_path: Path) -> bool:
+        """
+        Whether the stats were computed from the store file as it is now.
+        """
+        return self.meta.get("store_fingerprint") == store_fingerprint(store_path)
+
+    def save(self, path: Path) -> None:
+        save_bundle(
+            path,
+            {
+                "count": self.count,
+                "mean": self.mean,
+                "std": self.std,
+                "quantile_levels": self.quantile_levels,
+                "quantiles": self.quantiles,
+            },
+            meta={**self.meta, "kind": "normalization_stats", "version": self.version, "feature_cols": self.feature_cols},
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "NormalizationStats":
+        arrays, meta = load_bundle(path, mmap=False)
+        if meta.get("kind") != "normalization_stats":
+            raise ValueError(f"{path} does not contain normalisation statistics")
+        return cls(
+            feature_cols=list(meta["feature_cols"]),
+            count=arrays["count"],
+            mean=arrays["mean"],
+            std=arrays["std"],
+            quantile_levels=arrays["quantile_levels"],
+            quantiles=arrays["quantiles"],
+            version=meta["version"],
+            meta={k: v for k, v in meta.items() if k not in {"kind", "version", "feature_cols"}},
+        )
+
+
+def normalization_stats_from_chunks(
+    chunks: Iterable[pd.DataFrame],
+    feature_cols: Sequence[str] | None = None,
+    quantiles: Sequence[float] = DEFAULT_QUANTILES,
+    reservoir_size: int = 100_000,
+    random_state: int = 42,
+) -> NormalizationStats:
+    """
+    One pass over feature chunks: exact per-column mean/std (NaNs skipped) and reservoir quantiles.
+    """
+    rng = np.random.default_rng(random_state)
+    cols: List[str] | None = list(feature_cols) if feature_cols is not None else None
+    count = mean = m2 = None
+    sample = np.empty((0, 0))
+    priority = np.empty(0)
+    n_rows = 0
+    for chunk in chunks:
+        if cols is None:
+            cols = feature_columns(chunk, exclude=META_COLUMNS)
+            if not cols:
+                raise ValueError("No feature columns to normalise.")
+        X = chunk[cols].to_numpy(dtype=np.float64)
+        if count is None:
+            count, mean, m2 = np.zeros(len(cols)), np.zeros(len(cols)), np.zeros(len(cols))
+            sample = np.empty((0, len(cols)))
+        n_rows += X.shape[0]
+
+        valid = ~np.isnan(X)
+        n_b = valid.sum(axis=0).astype(np.float64)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_b = np.where(n_b > 0, np.nansum(X, axis=0) / np.maximum(n_b, 1), 0.0)
+        m2_b = np.nansum((X - mean_b) ** 2, axis=0)
+        n = count + n_b
+        delta = mean_b - mean
+        ratio = np.divide(n_b, n, out=np.zeros_like(n), where=n > 0)
+        m2 += m2_b + delta**2 * count * ratio
+        mean += delta * ratio
+        count = n
+
+        # Keep the reservoir_size rows with the smallest random priorities seen so far.
+        sample = np.vstack([sample, X])
+        priority = np.concatenate([priority, rng.random(X.shape[0])])
+        if priority.shape[0] > reservoir_size:
+            keep = np.argpartition(priority, reservoir_size)[:reservoir_size]
+            sample, priority = sample[keep], priority[keep]
+    if cols is None or count is None:
+        raise ValueError("No rows to compute normalisation statistics from.")
+
+    levels = np.asarray(quantiles, dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        qs = np.nanquantile(sample, levels, axis=0) if sample.shape[0] else np.full((len(levels), len(cols)), np.nan)
+        std = np.sqrt(np.divide(m2, count - 1, out=np.zeros_like(m2), where=count > 1))
+    return NormalizationStats(
+        feature_cols=cols,
+        count=count.astype(np.int64),
+        mean=mean,
+        std=std,
+        quantile_levels=levels,
+        quantiles=np.atleast_2d(qs),
+        meta={"n_rows": n_rows, "reservoir_size": int(min(reservoir_size, n_rows)), "created_at": time.time()},
+    )
+
+
+def compute_normalization_stats(
+    store_path: Path,
+    out: Path | None = None,
+    feature_cols: Sequence[str] | None = None,
+    quantiles: Sequence[float] = DEFAULT_QUANTILES,
+    reservoir_size: int = 100_000,
+    chunksize: int = 100_000,
+    random_state: int = 42,
+) -> NormalizationStats:
+    """
+    Stream the feature store once and (optionally) save the stats to out.
+
+    The stats are versioned by the store's fingerprint, so is_current tells consumers
+    whether the artifact still matches the store.
+    """
+    stats = normalization_stats_from_chunks(
+        iter_feature_chunks(Path(store_path), chunksize=chunksize),
+        feature_cols=feature_cols,
+        quantiles=quantiles,
+        reservoir_size=reservoir_size,
+        random_state=random_state,
+    )
+    fingerprint = store_fingerprint(store_path)
+    stats.version = fingerprint
+    stats.meta.update({"store": Path(store_path).name, "store_fingerprint": fingerprint})
+    if out is not None:
+        stats.save(out)
+    return stats
@@ -2,16 +2,38 @@
 Projection utilities for map-like visualizations.
 
 Generates low-dimensional coordinates (UMAP) from feature DataFrames so genres,
-artists, or tracks can be plotted similarly to EveryNoise.
+artists, or tracks can be plotted similarly to EveryNoise. ProjectionStore keeps
+fitted mappers and their coordinates under version ids so new tracks can be
+placed on an existing map without refitting. project_large is the large-scale
+path: optional standardisation and PCA, precomputed kNN from the graph tooling,
+and landmark fitting with batched out-of-sample transforms.
 """
 
 from __future__ import annotations
 
-from typing import Iterable, List, Sequence, Tuple
+import os
+import pickle
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 import umap
+from sklearn.decomposition import PCA
+from sklearn.preprocessing import StandardScaler
+
+from classically_punk.features.normalization import NormalizationStats
+from classically_punk.features.store import META_COLUMNS, feature_columns
+from classically_punk.graph.ann import IVFIndex
+from classically_punk.graph.knn import exact_cosine_knn, topk_per_group
+from classically_punk.graph.schema import EdgeArrays
+from classically_punk.storage import load_bundle, read_bundle_meta, save_bundle
 
 
 def select_feature_matrix(df: pd.DataFrame, target_col: str = "label") -> Tuple[pd.DataFrame, List[str]]:
@@ -27,13 +49,17 @@ def project_with_umap(
     min_dist: float = 0.1,
     metric: str = "euclidean",
     random_state: int = 42,
+    normalization: NormalizationStats | None = None,
 ) -> Tuple[pd.DataFrame, umap.UMAP]:
     """
     Fit UMAP on numeric feature columns and return coords merged with id/label metadata.
+
+    With normalization, UMAP runs on its feature_cols standardised by the shared stats.
     """
     X, feature_cols = select_feature_matrix(df, target_col=target_col)
     if X.empty:
         raise ValueError("No feature columns available for projection.")
+    values = normalization.transform(df) if normalization is not None else X.values
 
     mapper = umap.UMAP(
         n_components=n_components,
@@ -42,7 +68,7 @@ def project_with_umap(
         metric=metric,
         random_state=random_state,
     )
-    coords = mapper.fit_transform(X.values)
+    coords = mapper.fit_transform(values)
 
     coord_cols = ["x", "y", "z"][:n_components]
     coords_df = pd.DataFrame(coords, columns=coord_cols, index=df.index)
@@ -56,3 +82,505 @@ def project_with_umap(
     result = pd.concat([df[meta_cols], coords_df], axis=1)
     return result, mapper
 
+
+@dataclass
+class ProjectionPipeline:
+    """
+    Fitted scaler -> PCA -> UMAP chain; transform maps raw feature rows to map coordinates.
+    """
+
+    mapper: umap.UMAP
+    feature_cols: List[str]
+    scaler: StandardScaler | None = None
+    pca: PCA | None = None
+
+    @property
+    def n_components(self) -> int:
+        return int(self.mapper.n_components)
+
+    def reduce(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if self.scaler is not None:
+            X = self.scaler.transform(X)
+        if self.pca is not None:
+            X = self.pca.transform(X)
+        return np.asarray(X, dtype=np.float32)
+
+    def transform(self, X: np.ndarray) -> np.ndarray:
+        return self.mapper.transform(self.reduce(X))
+
+    def get_params(self) -> Dict[str, object]:
+        params = dict(self.mapper.get_params())
+        params["standardize"] = self.scaler is not None
+        params["pca_components"] = int(self.pca.n_components_) if self.pca is not None else None
+        return params
+
+
+def knn_from_edges(edges: EdgeArrays, ids: Sequence[str], n_neighbors: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    UMAP-style (indices, distances) from SIMILAR_TO kNN edges (weight = cosine similarity).
+
+    Column 0 is the point itself at distance 0; rows with fewer neighbours are padded with -1.
+    """
+    lookup = pd.Index(np.asarray(ids, dtype=str))
+    src = lookup.get_indexer(np.asarray(edges.src, dtype=str))
+    dst = lookup.get_indexer(np.asarray(edges.dst, dtype=str))
+    weight = np.asarray(edges.weight, dtype=np.float64)
+    valid = (src >= 0) & (dst >= 0) & (src != dst)
+    src, dst, weight = src[valid], dst[valid], weight[valid]
+
+    keep = topk_per_group(src, weight, n_neighbors - 1)
+    rows = src[keep]
+    starts = np.searchsorted(rows, np.arange(len(lookup)))
+    slot = np.arange(keep.shape[0]) - starts[rows] + 1
+    indices = np.full((len(lookup), n_neighbors), -1, dtype=np.int64)
+    dists = np.zeros((len(lookup), n_neighbors), dtype=np.float32)
+    indices[:, 0] = np.arange(len(lookup))
+    indices[rows, slot] = dst[keep]
+    dists[rows, slot] = 1.0 - weight[keep]
+    return indices, _pad_distances(indices, dists)
+
+
+def knn_from_ivf(index: IVFIndex, n_neighbors: int, n_probe: int | None = None, batch_size: int = 10_000) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    UMAP-style (indices, distances) for every indexed vector, searched against the IVF index itself.
+    """
+    vectors = np.asarray(index.vectors)[np.argsort(np.asarray(index.rows))]
+    indices = np.empty((vectors.shape[0], n_neighbors), dtype=np.int64)
+    dists = np.empty((vectors.shape[0], n_neighbors), dtype=np.float32)
+    for start in range(0, vectors.shape[0], batch_size):
+        rows, sims = index.search(vectors[start : start + batch_size], k=n_neighbors, n_probe=n_probe)
+        indices[start : start + batch_size] = rows
+        dists[start : start + batch_size] = np.where(rows >= 0, 1.0 - sims, 0.0)
+    return indices, _pad_distances(indices, np.maximum(dists, 0.0))
+
+
+def _pad_distances(indices: np.ndarray, dists: np.ndarray) -> np.ndarray:
+    # Padded slots (-1) take the row's largest real distance so UMAP's bandwidth search stays finite.
+    real = np.where(indices >= 0, dists, -np.inf).max(axis=1, keepdims=True)
+    return np.where(indices >= 0, dists, real).astype(np.float32)
+
+
+def _check_knn_space(Z: np.ndarray, indices: np.ndarray, dists: np.ndarray, n_check: int = 256, atol: float = 1e-3) -> None:
+    """
+    Raise unless a precomputed graph's distances are cosine distances between rows of Z.
+    """
+    if indices.shape[0] != Z.shape[0]:
+        raise ValueError(f"precomputed_knn has {indices.shape[0]} rows but the projection has {Z.shape[0]}.")
+    rows = np.unique(np.linspace(0, Z.shape[0] - 1, min(n_check, Z.shape[0])).astype(np.int64))
+    nbrs = indices[rows]
+    valid = nbrs >= 0
+    Zc = np.asarray(Z, dtype=np.float64)
+    unit = Zc / np.maximum(np.linalg.norm(Zc, axis=1, keepdims=True), np.finfo(np.float64).tiny)
+    expected = 1.0 - np.einsum("rd,rkd->rk", unit[rows], unit[np.where(valid, nbrs, 0)])
+    if valid.any() and np.abs(expected - dists[rows])[valid].max() > atol:
+        raise ValueError(
+            "precomputed_knn distances do not match cosine distances over the standardised/PCA "
+            "features; build the graph from the same transformed features or disable standardize/PCA."
+        )
+
+
+def stratified_sample(labels: np.ndarray | None, n: int, n_rows: int, random_state: int = 42) -> np.ndarray:
+    """
+    Sorted row positions of a size-n sample drawn proportionally from every label (at least one each).
+    """
+    rng = np.random.default_rng(random_state)
+    if n >= n_rows:
+        return np.arange(n_rows)
+    if labels is None:
+        return np.sort(rng.choice(n_rows, n, replace=False))
+    codes, uniques = pd.factorize(pd.Series(labels), use_na_sentinel=False)
+    sizes = np.bincount(codes)
+    quota = np.maximum(np.floor(sizes * n / n_rows), 1).astype(np.int64)
+    priority = rng.permutation(n_rows)
+    order = np.lexsort((priority, codes))
+    starts = np.r_[0, np.cumsum(sizes)[:-1]]
+    rank = np.arange(n_rows) - np.repeat(starts, sizes)
+    return np.sort(order[rank < np.repeat(quota, sizes)])
+
+
+_WORKER_PIPELINE: ProjectionPipeline | None = None
+
+
+def _init_transform_worker(payload: bytes) -> None:
+    global _WORKER_PIPELINE
+    _WORKER_PIPELINE = pickle.loads(payload)
+
+
+def _transform_batch(X: np.ndarray) -> np.ndarray:
+    return _WORKER_PIPELINE.mapper.transform(X)
+
+
+def transform_in_batches(
+    pipeline: ProjectionPipeline,
+    X: np.ndarray,
+    batch_size: int = 50_000,
+    n_jobs: int | None = 1,
+) -> np.ndarray:
+    """
+    Transform rows with a fitted pipeline in batches, optionally across worker processes.
+    """
+    reduced = pipeline.reduce(X)
+    batches = [reduced[i : i + batch_size] for i in range(0, reduced.shape[0], batch_size)]
+    if not batches:
+        return np.empty((0, pipeline.n_components), dtype=np.float32)
+    if n_jobs == 1 or len(batches) == 1:
+        parts = [pipeline.mapper.transform(b) for b in batches]
+    else:
+        payload = pickle.dumps(pipeline, protocol=pickle.HIGHEST_PROTOCOL)
+        workers = min(n_jobs or os.cpu_count() or 1, len(batches))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_transform_worker, initargs=(payload,)) as pool:
+            parts = list(pool.map(_transform_batch, batches))
+    return np.vstack(parts).astype(np.float32)
+
+
+def project_large(
+    df: pd.DataFrame,
+    target_col: str = "label",
+    id_col: str = "track_id",
+    n_components: int = 2,
+    n_neighbors: int = 15,
+    min_dist: float = 0.1,
+    standardize: bool = True,
+    pca_components: int | None = 50,
+    precomputed_knn: Tuple[np.ndarray, np.ndarray] | None = None,
+    blocked_knn: bool = False,
+    landmarks: int | None = None,
+    batch_size: int = 50_000,
+    n_jobs: int | None = 1,
+    random_state: int = 42,
+    normalization: NormalizationStats | None = None,
+) -> Tuple[pd.DataFrame, ProjectionPipeline]:
+    """
+    Large-scale UMAP projection of df's numeric feature columns.
+
+    - standardize / pca_components: pre-reduce features before any neighbour search.
+      normalization replaces the fitted scaler with shared feature-store statistics
+      (and restricts features to its columns).
+    - precomputed_knn: (indices, distances) over all rows, e.g. from knn_from_edges or
+      knn_from_ivf, used as UMAP's neighbour graph (cosine metric). The distances must be
+      over the same features UMAP is fitted on, i.e. after standardisation/normalization
+      and PCA (pass standardize=False, pca_components=None for a raw-feature graph); a
+      sample of rows is checked and a mismatch raises ValueError. blocked_knn=True builds
+      the graph from the reduced features with the exact blocked cosine engine instead of
+      UMAP's NN-descent. Neither can be combined with landmarks.
+    - landmarks: fit on a label-stratified subsample of this size and place the other
+      rows with batched transforms over n_jobs processes. Precomputed neighbours are
+      only usable without landmarks, since the fit set must match the graph's rows.
+
+    UMAP has no search index for precomputed neighbours, so pipelines fitted that way
+    cannot transform new rows; use landmarks (or the default path) for ProjectionStore
+    versions that must place new tracks.
+    """
+    if normalization is not None:
+        feature_cols = list(normalization.feature_cols)
+    else:
+        feature_cols = feature_columns(df, exclude=(*META_COLUMNS, target_col, id_col))
+    if not feature_cols:
+        raise ValueError("No feature columns available for projection.")
+    if landmarks is not None and precomputed_knn is not None:
+        raise ValueError("precomputed_knn covers all rows and cannot be combined with landmarks.")
+    if landmarks is not None and blocked_knn:
+        # A precomputed neighbour graph leaves UMAP without a search index to place the other rows.
+        raise ValueError("blocked_knn cannot be combined with landmarks; use one or the other.")
+
+    X = df[feature_cols].to_numpy(dtype=np.float32)
+    if normalization is not None:
+        scaler = normalization.as_scaler()
+    else:
+        scaler = StandardScaler().fit(X) if standardize else None
+    Z = scaler.transform(X).astype(np.float32) if scaler is not None else X
+    pca = None
+    if pca_components is not None and pca_components < Z.shape[1]:
+        pca = PCA(n_components=pca_components, svd_solver="randomized", random_state=random_state).fit(Z)
+        Z = pca.transform(Z).astype(np.float32)
+
+    labels = df[target_col].to_numpy() if target_col in df.columns else None
+    fit_rows = np.arange(Z.shape[0]) if landmarks is None else stratified_sample(labels, landmarks, Z.shape[0], random_state)
+    Z_fit = Z[fit_rows]
+
+    metric = "euclidean"
+    knn = precomputed_knn
+    if knn is None and blocked_knn:
+        nn_idx, nn_sims = exact_cosine_knn(Z_fit, k=n_neighbors - 1)
+        knn = (
+            np.hstack([np.arange(Z_fit.shape[0])[:, None], nn_idx]),
+            np.hstack([np.zeros((Z_fit.shape[0], 1), dtype=np.float32), np.maximum(1.0 - nn_sims, 0.0)]),
+        )
+    if knn is not None:
+        metric = "cosine"
+        knn = (np.asarray(knn[0])[:, :n_neighbors], np.asarray(knn[1], dtype=np.float32)[:, :n_neighbors])
+        if precomputed_knn is not None:
+            _check_knn_space(Z_fit, *knn)
+
+    mapper = umap.UMAP(
+        n_components=n_components,
+        n_neighbors=n_neighbors,
+        min_dist=min_dist,
+        metric=metric,
+        random_state=random_state,
+        precomputed_knn=knn if knn is not None else (None, None, None),
+        force_approximation_algorithm=knn is not None,
+    )
+    fit_coords = mapper.fit_transform(Z_fit)
+    pipeline = ProjectionPipeline(mapper=mapper, feature_cols=feature_cols, scaler=scaler, pca=pca)
+
+    coords = np.empty((Z.shape[0], n_components), dtype=np.float32)
+    coords[fit_rows] = fit_coords
+    rest = np.setdiff1d(np.arange(Z.shape[0]), fit_rows, assume_unique=True)
+    if rest.size:
+        # Already reduced, so skip the pipeline's scaler/PCA.
+        reduced_only = ProjectionPipeline(mapper=mapper, feature_cols=feature_cols)
+        coords[rest] = transform_in_batches(reduced_only, Z[rest], batch_size=batch_size, n_jobs=n_jobs)
+
+    coord_cols = ["x", "y", "z"][:n_components]
+    meta_cols = [c for c in (id_col, "path", target_col) if c in df.columns]
+    result = pd.concat([df[meta_cols].reset_index(drop=True), pd.DataFrame(coords, columns=coord_cols)], axis=1)
+    result.index = df.index
+    return result, pipeline
+
+
+_VERSION_RE = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+@dataclass
+class ProjectionStore:
+    """
+    Registry of fitted projections under root/<version>/.
+
+    Each version holds mapper.pkl (the fitted UMAP or ProjectionPipeline) and
+    coords.bundle (ids, labels, float32 coordinates and fit metadata in the bundle
+    header). Listing versions reads only bundle headers and coordinates are
+    memory-mapped, so startup does not unpickle any mapper; the mapper is loaded on
+    the first transform.
+    """
+
+    root: Path
+    _mappers: Dict[str, umap.UMAP | ProjectionPipeline] = field(default_factory=dict, repr=False)
+
+    def __post_init__(self) -> None:
+        self.root = Path(self.root)
+
+    def _dir(self, version: str) -> Path:
+        if not _VERSION_RE.match(version):
+            raise ValueError(f"Invalid projection version: {version!r}")
+        return self.root / version
+
+    def versions(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        found = [p.name for p in self.root.iterdir() if (p / "coords.bundle").exists()]
+        return sorted(found, key=lambda v: (int(v[1:]) if re.fullmatch(r"v\d+", v) else float("inf"), v))
+
+    def next_version(self) -> str:
+        numbered = [int(v[1:]) for v in self.versions() if re.fullmatch(r"v\d+", v)]
+        return f"v{max(numbered, default=0) + 1}"
+
+    def latest(self) -> str:
+        versions = self.versions()
+        if not versions:
+            raise FileNotFoundError(f"No projections stored under {self.root}")
+        return max(versions, key=lambda v: self.metadata(v)["created_at"])
+
+    def metadata(self, version: str) -> Dict[str, object]:
+        meta, _, _ = read_bundle_meta(self._dir(version) / "coords.bundle")
+        return meta
+
+    def list_versions(self) -> pd.DataFrame:
+        """
+        One row per stored version: model, creation time, point count and fit metrics.
+        """
+        rows = []
+        for version in self.versions():
+            meta = self.metadata(version)
+            rows.append(
+                {
+                    "version": version,
+                    "model": meta["model"],
+                    "created_at": meta["created_at"],
+                    "n_points": meta["n_points"],
+                    "n_components": meta["n_components"],
+                    "params": meta["params"],
+                    "metrics": meta["metrics"],
+                }
+            )
+        return pd.DataFrame(rows, columns=["version", "model", "created_at", "n_points", "n_components", "params", "metrics"])
+
+    def save(
+        self,
+        version: str,
+        mapper: umap.UMAP | ProjectionPipeline,
+        coords: np.ndarray,
+        ids: Sequence[str],
+        feature_cols: Sequence[str],
+        labels: Sequence[str] | None = None,
+        params: Dict[str, object] | None = None,
+        metrics: Dict[str, float] | None = None,
+    ) -> Path:
+        out = self._dir(version)
+        out.mkdir(parents=True, exist_ok=True)
+        tmp = out / "mapper.pkl.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(mapper, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(out / "mapper.pkl")
+        self._write_coords(
+            version,
+            np.asarray(coords, dtype=np.float32),
+            np.asarray(ids, dtype=str),
+            np.asarray(labels, dtype=str) if labels is not None else None,
+            {
+                "kind": "projection",
+                "model": "umap",
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "n_components": int(np.asarray(coords).shape[1]),
+                "feature_cols": list(feature_cols),
+                "params": params or {},
+                "metrics": metrics or {},
+            },
+        )
+        self._mappers[version] = mapper
+        return out
+
+    def _write_coords(self, version: str, coords: np.ndarray, ids: np.ndarray, labels: np.ndarray | None, meta: Dict[str, object]) -> None:
+        arrays = {"coords": coords, "ids": ids}
+        if labels is not None:
+            arrays["labels"] = labels
+        save_bundle(self._dir(version) / "coords.bundle", arrays, meta={**meta, "n_points": int(coords.shape[0])})
+
+    def fit(
+        self,
+        df: pd.DataFrame,
+        version: str | None = None,
+        target_col: str = "label",
+        id_col: str = "track_id",
+        large: bool = False,
+        **umap_kwargs,
+    ) -> str:
+        """
+        Fit a new projection on df's numeric feature columns and store it; returns the version id.
+
+        large=True fits with project_large (kwargs go to it) and stores the whole pipeline.
+        precomputed_knn and blocked_knn are rejected: UMAP keeps no search index for them,
+        so the stored version could not place new tracks.
+        """
+        if large and (umap_kwargs.get("precomputed_knn") is not None or umap_kwargs.get("blocked_knn")):
+            raise ValueError("Stored projections must transform new rows; fit without precomputed_knn/blocked_knn.")
+        feature_cols = feature_columns(df, exclude=(*META_COLUMNS, target_col, id_col))
+        cols = feature_cols + ([target_col] if target_col in df.columns else [])
+        start = time.perf_counter()
+        if large:
+            coords_df, mapper = project_large(df, target_col=target_col, id_col=id_col, **umap_kwargs)
+        else:
+            coords_df, mapper = project_with_umap(df[cols], target_col=target_col, **umap_kwargs)
+        fit_seconds = time.perf_counter() - start
+
+        coord_cols = ["x", "y", "z"][: mapper.n_components]
+        version = version or self.next_version()
+        self.save(
+            version,
+            mapper,
+            coords_df[coord_cols].to_numpy(),
+            _row_ids(df, id_col),
+            feature_cols,
+            labels=_row_labels(df, target_col),
+            params={k: v for k, v in mapper.get_params().items() if isinstance(v, (int, float, str, bool, type(None)))},
+            metrics={"fit_seconds": fit_seconds},
+        )
+        return version
+
+    def load_coords(self, version: str | None = None, mmap: bool = True) -> pd.DataFrame:
+        """
+        Stored coordinates of a version as a DataFrame with id, label (if stored) and x/y[/z].
+        """
+        version = version or self.latest()
+        arrays, meta = load_bundle(self._dir(version) / "coords.bundle", mmap=mmap)
+        coords = np.asarray(arrays["coords"])
+        out = pd.DataFrame(coords, columns=["x", "y", "z"][: coords.shape[1]])
+        out.insert(0, "id", arrays["ids"])
+        if "labels" in arrays:
+            out.insert(1, "label", arrays["labels"])
+        return out
+
+    def load_mapper(self, version: str) -> umap.UMAP | ProjectionPipeline:
+        if version not in self._mappers:
+            with open(self._dir(version) / "mapper.pkl", "rb") as f:
+                self._mappers[version] = pickle.load(f)
+        return self._mappers[version]
+
+    def transform(
+        self,
+        df: pd.DataFrame,
+        version: str | None = None,
+        id_col: str = "track_id",
+        target_col: str = "label",
+    ) -> pd.DataFrame:
+        """
+        Place new tracks on a stored projection with the fitted mapper (no refit).
+
+        Stored versions are never modified; append saves a grown map as a new version.
+        """
+        version = version or self.latest()
+        meta = self.metadata(version)
+        missing = [c for c in meta["feature_cols"] if c not in df.columns]
+        if missing:
+            raise ValueError(f"Missing feature columns for projection {version}: {missing}")
+        coords = self.load_mapper(version).transform(df[meta["feature_cols"]].to_numpy())
+        placed = pd.DataFrame(coords, columns=["x", "y", "z"][: coords.shape[1]])
+        placed.insert(0, "id", _row_ids(df, id_col))
+        labels = _row_labels(df, target_col)
+        if labels is not None:
+            placed.insert(1, "label", labels)
+        return placed
+
+    def append(
+        self,
+        df: pd.DataFrame,
+        version: str | None = None,
+        new_version: str | None = None,
+        id_col: str = "track_id",
+        target_col: str = "label",
+    ) -> str:
+        """
+        Place new tracks on a stored projection and save the grown map as a new version.
+
+        The new version reuses the parent's mapper, so stored points keep their layout;
+        rows whose ids are already stored are replaced. Returns the new version id.
+        """
+        version = version or self.latest()
+        new_version = new_version or self.next_version()
+        if new_version in self.versions():
+            raise ValueError(f"Projection version {new_version} already exists")
+        placed = self.transform(df, version, id_col=id_col, target_col=target_col)
+        stored = self.load_coords(version, mmap=False)
+        combined = pd.concat([stored[~stored["id"].isin(set(placed["id"]))], placed], ignore_index=True)
+        meta = {k: v for k, v in self.metadata(version).items() if k != "n_points"}
+        coord_cols = ["x", "y", "z"][: meta["n_components"]]
+
+        out = self._dir(new_version)
+        out.mkdir(parents=True, exist_ok=True)
+        tmp = out / "mapper.pkl.tmp"
+        shutil.copyfile(self._dir(version) / "mapper.pkl", tmp)
+        tmp.replace(out / "mapper.pkl")
+        self._write_coords(
+            new_version,
+            combined[coord_cols].to_numpy(dtype=np.float32),
+            combined["id"].to_numpy(dtype=str),
+            combined["label"].fillna("").to_numpy(dtype=str) if "label" in combined.columns else None,
+            {**meta, "created_at": datetime.now(timezone.utc).isoformat(), "parent": version},
+        )
+        return new_version
+
+
+def _row_labels(df: pd.DataFrame, target_col: str) -> np.ndarray | None:
+    # Missing labels are stored as "" on every path, never as "nan".
+    if target_col not in df.columns:
+        return None
+    return df[target_col].fillna("").astype(str).to_numpy()
+
+
+def _row_ids(df: pd.DataFrame, id_col: str) -> np.ndarray:
+    if id_col in df.columns:
+        return df[id_col].astype(str).to_numpy()
+    if "path" in df.columns:
+        return df["path"].astype(str).to_numpy()
+    return df.index.astype(str).to_numpy()
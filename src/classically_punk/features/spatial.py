@@ -0,0 +1,292 @@
+"""
+Spatial index over projected map coordinates.
+
+Points are bucketed into a uniform 2^z x 2^z grid over the projection's x/y
+bounds at the finest zoom level and stored sorted by cell, so each occupied cell
+is a contiguous slice (CSR-style offsets). Coarser zoom levels hold precomputed
+cluster aggregates per cell (count, centroid, dominant label), matching the
+"cluster at higher zoom" behaviour of the map UX. Viewport queries touch one
+key range per grid row and k-nearest lookups expand rings of cells, so response
+time depends on the viewport and k, not on the size of the catalogue.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from classically_punk.storage import load_bundle, save_bundle
+
+BBox = Tuple[float, float, float, float]  # xmin, ymin, xmax, ymax
+
+
+@dataclass
+class ZoomLevel:
+    keys: np.ndarray  # (C,) occupied cell keys (cy * 2^zoom + cx), sorted
+    counts: np.ndarray  # (C,) points per cell
+    x: np.ndarray  # (C,) centroid x
+    y: np.ndarray  # (C,) centroid y
+    label_codes: np.ndarray  # (C,) dominant label code, -1 without labels
+
+
+def _ranges_to_rows(starts: np.ndarray, stops: np.ndarray) -> np.ndarray:
+    lengths = stops - starts
+    keep = lengths > 0
+    starts, lengths = starts[keep], lengths[keep]
+    if not lengths.size:
+        return np.empty(0, dtype=np.int64)
+    offsets = np.repeat(starts - np.r_[0, np.cumsum(lengths)[:-1]], lengths)
+    return np.arange(int(lengths.sum())) + offsets
+
+
+def _dominant(keys: np.ndarray, labels: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Unique keys and, for each, the label with the largest count among its (key, label, count) triplets.
+    """
+    order = np.lexsort((-counts, keys))
+    keys, labels = keys[order], labels[order]
+    first = np.r_[True, keys[1:] != keys[:-1]] if keys.size else np.zeros(0, dtype=bool)
+    return keys[first], labels[first]
+
+
+def _ring_key_ranges(qx: int, qy: int, r: int, side: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Inclusive cell key ranges covering the ring of cells at Chebyshev distance r, clipped to the grid.
+    """
+    if r == 0:
+        key = np.array([qy * side + qx])
+        return key, key
+    lo_x, hi_x = max(qx - r, 0), min(qx + r, side - 1)
+    edge_rows = np.array([cy for cy in (qy - r, qy + r) if 0 <= cy < side], dtype=np.int64)
+    mid_rows = np.arange(max(qy - r + 1, 0), min(qy + r - 1, side - 1) + 1)
+    mid_cols = np.array([cx for cx in (qx - r, qx + r) if 0 <= cx < side], dtype=np.int64)
+    mid_keys = (mid_rows[:, None] * side + mid_cols[None, :]).ravel()
+    starts = np.r_[edge_rows * side + lo_x, mid_keys]
+    stops = np.r_[edge_rows * side + hi_x, mid_keys]
+    return starts, stops
+
+
+@dataclass
+class MapIndex:
+    bounds: np.ndarray  # (4,) xmin, ymin, xmax, ymax
+    max_zoom: int
+    cell_keys: np.ndarray  # (C,) occupied cells at max_zoom, sorted
+    cell_offsets: np.ndarray  # (C + 1,) point slice of each occupied cell
+    xy: np.ndarray  # (N, 2) float32 coordinates, sorted by cell
+    ids: np.ndarray  # (N,) ids, sorted by cell
+    label_codes: np.ndarray  # (N,) int32 label codes, -1 without labels
+    labels: List[str]
+    levels: Dict[int, ZoomLevel]
+
+    def __len__(self) -> int:
+        return int(self.xy.shape[0])
+
+    @classmethod
+    def build(
+        cls,
+        coords_df: pd.DataFrame,
+        id_col: str | None = "track_id",
+        label_col: str | None = "label",
+        max_zoom: int | None = None,
+        leaf_size: int = 64,
+    ) -> "MapIndex":
+        """
+        Index a projection frame with x/y columns; max_zoom defaults to ~leaf_size points per cell.
+        """
+        xy = coords_df[["x", "y"]].to_numpy(dtype=np.float64)
+        n = xy.shape[0]
+        if n == 0:
+            raise ValueError("Cannot index an empty projection.")
+        ids = coords_df[id_col].to_numpy() if id_col is not None and id_col in coords_df.columns else coords_df.index.to_numpy()
+        if label_col is not None and label_col in coords_df.columns:
+            codes, uniques = pd.factorize(coords_df[label_col])
+            labels = [str(u) for u in uniques]
+        else:
+            codes, labels = np.full(n, -1), []
+        if max_zoom is None:
+            max_zoom = int(min(max(math.ceil(math.log(max(n / leaf_size, 1.0), 4)), 0), 15))
+
+        bounds = np.r_[xy.min(axis=0), xy.max(axis=0)]
+        index = cls(
+            bounds=bounds,
+            max_zoom=max_zoom,
+            cell_keys=np.empty(0, dtype=np.int64),
+            cell_offsets=np.zeros(1, dtype=np.int64),
+            xy=np.empty((0, 2), dtype=np.float32),
+            ids=np.asarray(ids),
+            label_codes=np.asarray(codes, dtype=np.int32),
+            labels=labels,
+            levels={},
+        )
+        cx, cy = index._cells(xy[:, 0], xy[:, 1], max_zoom)
+        keys = cy * (1 << max_zoom) + cx
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        index.xy = xy[order].astype(np.float32)
+        index.ids = np.asarray(ids)[order].astype(str)
+        index.label_codes = index.label_codes[order]
+        starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        index.cell_keys = keys[starts]
+        index.cell_offsets = np.r_[starts, n].astype(np.int64)
+        index.levels = index._aggregate(cx[order], cy[order])
+        return index
+
+    def _cells(self, x: np.ndarray, y: np.ndarray, zoom: int) -> Tuple[np.ndarray, np.ndarray]:
+        side = 1 << zoom
+        xmin, ymin, xmax, ymax = self.bounds
+        u = (np.asarray(x, dtype=np.float64) - xmin) / max(xmax - xmin, 1e-12)
+        v = (np.asarray(y, dtype=np.float64) - ymin) / max(ymax - ymin, 1e-12)
+        cx = np.clip(np.floor(u * side), 0, side - 1).astype(np.int64)
+        cy = np.clip(np.floor(v * side), 0, side - 1).astype(np.int64)
+        return cx, cy
+
+    def _aggregate(self, cx: np.ndarray, cy: np.ndarray) -> Dict[int, ZoomLevel]:
+        # Each level is one bincount pass over the points using their parent cell at that zoom.
+        x = self.xy[:, 0].astype(np.float64)
+        y = self.xy[:, 1].astype(np.float64)
+        levels: Dict[int, ZoomLevel] = {}
+        for zoom in range(self.max_zoom, -1, -1):
+            shift = self.max_zoom - zoom
+            pcx, pcy = cx >> shift, cy >> shift
+            keys = pcy * (1 << zoom) + pcx
+            cell_keys, inverse = np.unique(keys, return_inverse=True)
+            counts = np.bincount(inverse, minlength=cell_keys.shape[0])
+            sum_x = np.bincount(inverse, weights=x, minlength=cell_keys.shape[0])
+            sum_y = np.bincount(inverse, weights=y, minlength=cell_keys.shape[0])
+            dominant = np.full(cell_keys.shape[0], -1)
+            labeled = self.label_codes >= 0
+            if labeled.any():
+                n_labels = len(self.labels)
+                pair, pair_counts = np.unique(inverse[labeled] * n_labels + self.label_codes[labeled], return_counts=True)
+                cells, best = _dominant(pair // n_labels, pair % n_labels, pair_counts)
+                dominant[cells] = best
+            levels[zoom] = ZoomLevel(
+                keys=cell_keys.astype(np.int64),
+                counts=counts.astype(np.int64),
+                x=(sum_x / counts).astype(np.float32),
+                y=(sum_y / counts).astype(np.float32),
+                label_codes=np.asarray(dominant, dtype=np.int32),
+            )
+        return levels
+
+    def _key_ranges(self, keys: np.ndarray, zoom: int, bbox: BBox) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        [start, stop) positions in sorted keys of the cells overlapping bbox, one range per grid row.
+        """
+        xmin, ymin, xmax, ymax = bbox
+        (cx0, cx1), (cy0, cy1) = self._cells([xmin, xmax], [ymin, ymax], zoom)
+        rows = np.arange(cy0, cy1 + 1) * (1 << zoom)
+        return np.searchsorted(keys, rows + cx0, side="left"), np.searchsorted(keys, rows + cx1, side="right")
+
+    def _frame(self, rows: np.ndarray, distance: np.ndarray | None = None) -> pd.DataFrame:
+        codes = self.label_codes[rows]
+        labels = np.asarray(self.labels + [None], dtype=object)[np.where(codes >= 0, codes, len(self.labels))]
+        out = pd.DataFrame({"id": self.ids[rows], "x": self.xy[rows, 0], "y": self.xy[rows, 1], "label": labels})
+        if distance is not None:
+            out["distance"] = distance
+        return out
+
+    def query_bbox(self, bbox: BBox, limit: int | None = None) -> pd.DataFrame:
+        """
+        Points inside a viewport (xmin, ymin, xmax, ymax), in cell order, at most limit rows.
+        """
+        starts, stops = self._key_ranges(self.cell_keys, self.max_zoom, bbox)
+        rows = _ranges_to_rows(self.cell_offsets[starts], self.cell_offsets[stops])
+        xy = self.xy[rows]
+        inside = (xy[:, 0] >= bbox[0]) & (xy[:, 0] <= bbox[2]) & (xy[:, 1] >= bbox[1]) & (xy[:, 1] <= bbox[3])
+        rows = rows[inside][:limit]
+        return self._frame(rows)
+
+    def clusters(self, zoom: int, bbox: BBox | None = None) -> pd.DataFrame:
+        """
+        Precomputed cluster aggregates at a zoom level: one row per occupied cell in the viewport.
+        """
+        zoom = min(max(zoom, 0), self.max_zoom)
+        level = self.levels[zoom]
+        if bbox is None:
+            sel = np.arange(level.keys.shape[0])
+        else:
+            sel = _ranges_to_rows(*self._key_ranges(level.keys, zoom, bbox))
+        side = 1 << zoom
+        codes = level.label_codes[sel]
+        labels = np.asarray(self.labels + [None], dtype=object)[np.where(codes >= 0, codes, len(self.labels))]
+        return pd.DataFrame(
+            {
+                "zoom": zoom,
+                "cell_x": level.keys[sel] % side,
+                "cell_y": level.keys[sel] // side,
+                "count": level.counts[sel],
+                "x": level.x[sel],
+                "y": level.y[sel],
+                "label": labels,
+            }
+        )
+
+    def nearest(self, x: float, y: float, k: int = 10) -> pd.DataFrame:
+        """
+        k nearest points to (x, y) in map space, searching rings of grid cells outward.
+        """
+        k = min(k, len(self))
+        side = 1 << self.max_zoom
+        xmin, ymin, xmax, ymax = self.bounds
+        # Any point r + 1 or more rings out is at least r cell widths away.
+        cell = min(max(xmax - xmin, 1e-12), max(ymax - ymin, 1e-12)) / side
+        (qx,), (qy,) = self._cells([x], [y], self.max_zoom)
+        cand_rows: List[np.ndarray] = []
+        cand_dist: List[np.ndarray] = []
+        found = 0
+        for r in range(side):
+            starts, stops = _ring_key_ranges(int(qx), int(qy), r, side)
+            i0 = np.searchsorted(self.cell_keys, starts, side="left")
+            i1 = np.searchsorted(self.cell_keys, stops, side="right")
+            rows = _ranges_to_rows(self.cell_offsets[i0], self.cell_offsets[i1])
+            if rows.size:
+                cand_rows.append(rows)
+                cand_dist.append(np.hypot(self.xy[rows, 0] - x, self.xy[rows, 1] - y))
+                found += rows.size
+            if found >= k and np.partition(np.concatenate(cand_dist), k - 1)[k - 1] <= r * cell:
+                break
+        rows, dist = np.concatenate(cand_rows), np.concatenate(cand_dist)
+        top = np.argsort(dist, kind="stable")[:k]
+        return self._frame(rows[top], dist[top])
+
+    def save(self, path: Path) -> None:
+        arrays = {
+            "bounds": self.bounds,
+            "cell_keys": self.cell_keys,
+            "cell_offsets": self.cell_offsets,
+            "xy": self.xy,
+            "ids": self.ids,
+            "label_codes": self.label_codes,
+        }
+        for zoom, level in self.levels.items():
+            for name in ("keys", "counts", "x", "y", "label_codes"):
+                arrays[f"z{zoom}_{name}"] = getattr(level, name)
+        save_bundle(path, arrays, meta={"kind": "map_index", "max_zoom": self.max_zoom, "labels": self.labels})
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "MapIndex":
+        arrays, meta = load_bundle(path, mmap=mmap)
+        if meta.get("kind") != "map_index":
+            raise ValueError(f"{path} does not contain a map index")
+        max_zoom = int(meta["max_zoom"])
+        levels = {
+            zoom: ZoomLevel(**{name: arrays[f"z{zoom}_{name}"] for name in ("keys", "counts", "x", "y", "label_codes")})
+            for zoom in range(max_zoom + 1)
+        }
+        return cls(
+            bounds=np.asarray(arrays["bounds"]),
+            max_zoom=max_zoom,
+            cell_keys=arrays["cell_keys"],
+            cell_offsets=arrays["cell_offsets"],
+            xy=arrays["xy"],
+            ids=arrays["ids"],
+            label_codes=arrays["label_codes"],
+            labels=list(meta["labels"]),
+            levels=levels,
+        )
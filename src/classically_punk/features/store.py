@@ -0,0 +1,57 @@
+"""
+Feature store readers.
+
+The feature store is the CSV written by scripts/extract_features.py: one row per
+track with track_id, optional label/path metadata, and numeric feature columns.
+These helpers read it in chunks so downstream jobs never need the whole table.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterator, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+META_COLUMNS = ("track_id", "label", "path")
+
+
+def feature_columns(df: pd.DataFrame, exclude: Sequence[str] = META_COLUMNS) -> List[str]:
+    """
+    Numeric columns of df that are not metadata.
+    """
+    return [c for c in df.columns if c not in set(exclude) and pd.api.types.is_numeric_dtype(df[c])]
+
+
+def iter_feature_chunks(path: Path, chunksize: int = 100_000, **read_kwargs) -> Iterator[pd.DataFrame]:
+    """
+    Yield the feature store as DataFrame chunks of at most chunksize rows.
+    """
+    with pd.read_csv(path, chunksize=chunksize, **read_kwargs) as reader:
+        for chunk in reader:
+            yield chunk
+
+
+def load_feature_matrix(
+    path: Path,
+    id_col: str = "track_id",
+    chunksize: int = 100_000,
+    dtype=np.float32,
+) -> Tuple[np.ndarray, np.ndarray, List[str]]:
+    """
+    Read ids and the feature matrix from the store chunk by chunk.
+
+    Returns (ids, X, feature_cols) with X cast to dtype as each chunk is read.
+    """
+    ids: List[np.ndarray] = []
+    blocks: List[np.ndarray] = []
+    cols: List[str] | None = None
+    for chunk in iter_feature_chunks(path, chunksize=chunksize):
+        if cols is None:
+            cols = feature_columns(chunk)
+        ids.append(chunk[id_col].astype(str).to_numpy(dtype=object))
+        blocks.append(chunk[cols].to_numpy(dtype=dtype))
+    if cols is None:
+        raise ValueError(f"Feature store {path} is empty.")
+    return np.concatenate(ids), np.vstack(blocks), cols
@@ -0,0 +1,262 @@
+"""
+Map tile pyramid export for 2D projections.
+
+Cuts projected x/y coordinates into z/x/y tiles (tile row 0 at the top, as in
+web maps) so the frontend and GET /map/* endpoints only ship the tiles in view.
+Each tile is a compact little-endian blob:
+
+    b"CPTL" | uint32 n | int16 x[n] | int16 y[n] | int16 label[n] | uint32 len | ids (UTF-8, "\\n"-joined)
+
+x/y are quantised to [0, 32767] within the tile's extent and labels are codes
+into the tileset's label list (-1 = unlabeled). Below max_zoom, dense tiles keep
+a fixed-size sample chosen by a per-point random priority, so a point visible at
+one zoom stays visible when zooming in. Tiles are written either as a directory
+({z}/{x}/{y}.bin plus tileset.json) or packed into one array bundle archive.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from classically_punk.storage import load_bundle, save_bundle
+
+TILE_MAGIC = b"CPTL"
+QUANT_MAX = 32767
+
+
+def encode_tile(qx: np.ndarray, qy: np.ndarray, labels: np.ndarray, ids: np.ndarray) -> bytes:
+    id_bytes = "\n".join(np.asarray(ids, dtype=str).tolist()).encode("utf-8")
+    return b"".join(
+        [
+            TILE_MAGIC,
+            struct.pack("<I", qx.shape[0]),
+            np.asarray(qx, dtype="<i2").tobytes(),
+            np.asarray(qy, dtype="<i2").tobytes(),
+            np.asarray(labels, dtype="<i2").tobytes(),
+            struct.pack("<I", len(id_bytes)),
+            id_bytes,
+        ]
+    )
+
+
+def decode_tile(blob: bytes) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (qx, qy, label codes, ids) from a tile blob.
+    """
+    if blob[:4] != TILE_MAGIC:
+        raise ValueError("Not a map tile blob.")
+    (n,) = struct.unpack_from("<I", blob, 4)
+    pos = 8
+    qx = np.frombuffer(blob, dtype="<i2", count=n, offset=pos)
+    qy = np.frombuffer(blob, dtype="<i2", count=n, offset=pos + 2 * n)
+    labels = np.frombuffer(blob, dtype="<i2", count=n, offset=pos + 4 * n)
+    pos += 6 * n
+    (id_len,) = struct.unpack_from("<I", blob, pos)
+    text = bytes(blob[pos + 4 : pos + 4 + id_len]).decode("utf-8")
+    ids = np.asarray(text.split("\n") if n else [], dtype=str)
+    return qx, qy, labels, ids
+
+
+def iter_tiles(
+    coords_df: pd.DataFrame,
+    bounds: np.ndarray,
+    max_zoom: int,
+    min_zoom: int = 0,
+    max_points_per_tile: int = 4096,
+    id_col: str | None = "track_id",
+    label_codes: np.ndarray | None = None,
+    random_state: int = 42,
+) -> Iterator[Tuple[int, int, int, bytes]]:
+    """
+    Yield (z, x, y, blob) for every occupied tile; max_zoom tiles are never downsampled.
+    """
+    xy = coords_df[["x", "y"]].to_numpy(dtype=np.float64)
+    n = xy.shape[0]
+    ids = coords_df[id_col].to_numpy() if id_col is not None and id_col in coords_df.columns else coords_df.index.to_numpy()
+    ids = np.asarray(ids).astype(str)
+    codes = np.full(n, -1, dtype=np.int16) if label_codes is None else np.asarray(label_codes, dtype=np.int16)
+    priority = np.random.default_rng(random_state).permutation(n)
+
+    xmin, ymin, xmax, ymax = bounds
+    u = np.clip((xy[:, 0] - xmin) / max(xmax - xmin, 1e-12), 0.0, 1.0)
+    v = np.clip((ymax - xy[:, 1]) / max(ymax - ymin, 1e-12), 0.0, 1.0)
+    for z in range(min_zoom, max_zoom + 1):
+        side = 1 << z
+        fx, fy = u * side, v * side
+        tx = np.minimum(fx.astype(np.int64), side - 1)
+        ty = np.minimum(fy.astype(np.int64), side - 1)
+        keys = tx * side + ty
+        order = np.lexsort((priority, keys))
+        sorted_keys = keys[order]
+        starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+        stops = np.r_[starts[1:], n]
+        qx_all = np.rint((fx - tx) * QUANT_MAX).astype(np.int16)
+        qy_all = np.rint((fy - ty) * QUANT_MAX).astype(np.int16)
+        for start, stop in zip(starts, stops):
+            if z < max_zoom:
+                stop = min(stop, start + max_points_per_tile)
+            rows = order[start:stop]
+            key = int(sorted_keys[start])
+            yield z, key // side, key % side, encode_tile(qx_all[rows], qy_all[rows], codes[rows], ids[rows])
+
+
+@dataclass
+class TileSet:
+    bounds: np.ndarray  # (4,) xmin, ymin, xmax, ymax of the projection
+    min_zoom: int
+    max_zoom: int
+    labels: List[str]
+    projection_version: str = "v1"
+    _blobs: Dict[Tuple[int, int, int], object] = field(default_factory=dict, repr=False)
+
+    def header(self) -> Dict[str, object]:
+        return {
+            "kind": "tileset",
+            "bounds": [float(b) for b in self.bounds],
+            "min_zoom": self.min_zoom,
+            "max_zoom": self.max_zoom,
+            "labels": self.labels,
+            "projection_version": self.projection_version,
+            "quantization": QUANT_MAX,
+        }
+
+    def tile(self, z: int, x: int, y: int) -> bytes | None:
+        """
+        Raw blob of one tile, or None when the tile is empty.
+        """
+        entry = self._blobs.get((z, x, y))
+        if entry is None:
+            return None
+        if isinstance(entry, Path):
+            return entry.read_bytes()
+        return bytes(entry)
+
+    def points(self, z: int, x: int, y: int) -> pd.DataFrame:
+        """
+        Decoded points of a tile in projection coordinates.
+        """
+        blob = self.tile(z, x, y)
+        if blob is None:
+            return pd.DataFrame({"id": [], "x": [], "y": [], "label": []})
+        qx, qy, codes, ids = decode_tile(blob)
+        side = 1 << z
+        xmin, ymin, xmax, ymax = self.bounds
+        px = xmin + (x + qx / QUANT_MAX) / side * (xmax - xmin)
+        py = ymax - (y + qy / QUANT_MAX) / side * (ymax - ymin)
+        names = np.asarray(self.labels + [None], dtype=object)
+        return pd.DataFrame({"id": ids, "x": px, "y": py, "label": names[np.where(codes >= 0, codes, len(self.labels))]})
+
+    def tile_keys(self) -> List[Tuple[int, int, int]]:
+        return sorted(self._blobs)
+
+    @classmethod
+    def open(cls, path: Path, mmap: bool = True) -> "TileSet":
+        """
+        Open a tile directory (containing tileset.json) or a packed tile archive.
+        """
+        path = Path(path)
+        if path.is_dir():
+            header = json.loads((path / "tileset.json").read_text())
+            blobs: Dict[Tuple[int, int, int], object] = {
+                (z, x, y): path / str(z) / str(x) / f"{y}.bin" for z, x, y, _ in header["tiles"]
+            }
+        else:
+            arrays, header = load_bundle(path, mmap=mmap)
+            if header.get("kind") != "tileset":
+                raise ValueError(f"{path} does not contain a tile archive")
+            data = arrays["data"]
+            blobs = {
+                (int(z), int(x), int(y)): data[int(off) : int(off) + int(length)]
+                for z, x, y, off, length in zip(
+                    arrays["tile_z"], arrays["tile_x"], arrays["tile_y"], arrays["tile_offset"], arrays["tile_length"]
+                )
+            }
+        return cls(
+            bounds=np.asarray(header["bounds"], dtype=np.float64),
+            min_zoom=int(header["min_zoom"]),
+            max_zoom=int(header["max_zoom"]),
+            labels=list(header["labels"]),
+            projection_version=header.get("projection_version", "v1"),
+            _blobs=blobs,
+        )
+
+
+def export_tiles(
+    coords_df: pd.DataFrame,
+    out: Path,
+    max_zoom: int = 8,
+    min_zoom: int = 0,
+    max_points_per_tile: int = 4096,
+    id_col: str | None = "track_id",
+    label_col: str | None = "label",
+    packed: bool = False,
+    projection_version: str = "v1",
+    random_state: int = 42,
+) -> Dict[str, object]:
+    """
+    Write a z/x/y tile pyramid for a projection frame with x/y columns and return the tileset header.
+
+    packed=False writes out/{z}/{x}/{y}.bin and out/tileset.json; packed=True writes a single
+    archive file at out with a tile index (z, x, y, offset, length) and the concatenated blobs.
+    """
+    if coords_df.empty:
+        raise ValueError("Cannot tile an empty projection.")
+    xy = coords_df[["x", "y"]].to_numpy(dtype=np.float64)
+    bounds = np.r_[xy.min(axis=0), xy.max(axis=0)]
+    if label_col is not None and label_col in coords_df.columns:
+        codes, uniques = pd.factorize(coords_df[label_col])
+        labels = [str(u) for u in uniques]
+    else:
+        codes, labels = None, []
+    if len(labels) > np.iinfo(np.int16).max:
+        raise ValueError("Too many labels for int16 label codes.")
+    tileset = TileSet(bounds=bounds, min_zoom=min_zoom, max_zoom=max_zoom, labels=labels, projection_version=projection_version)
+    header = tileset.header()
+    tiles = iter_tiles(
+        coords_df,
+        bounds,
+        max_zoom,
+        min_zoom=min_zoom,
+        max_points_per_tile=max_points_per_tile,
+        id_col=id_col,
+        label_codes=codes,
+        random_state=random_state,
+    )
+
+    out = Path(out)
+    index: List[Tuple[int, int, int, int]] = []
+    if packed:
+        blobs: List[bytes] = []
+        for z, x, y, blob in tiles:
+            index.append((z, x, y, len(blob)))
+            blobs.append(blob)
+        lengths = np.array([entry[3] for entry in index], dtype=np.int64)
+        save_bundle(
+            out,
+            {
+                "tile_z": np.array([e[0] for e in index], dtype=np.int16),
+                "tile_x": np.array([e[1] for e in index], dtype=np.int32),
+                "tile_y": np.array([e[2] for e in index], dtype=np.int32),
+                "tile_offset": np.r_[0, np.cumsum(lengths)[:-1]].astype(np.int64),
+                "tile_length": lengths,
+                "data": np.frombuffer(b"".join(blobs), dtype=np.uint8),
+            },
+            meta=header,
+        )
+    else:
+        for z, x, y, blob in tiles:
+            tile_path = out / str(z) / str(x) / f"{y}.bin"
+            tile_path.parent.mkdir(parents=True, exist_ok=True)
+            tile_path.write_bytes(blob)
+            index.append((z, x, y, len(blob)))
+        (out / "tileset.json").write_text(json.dumps({**header, "tiles": [list(e) for e in index]}))
+    header["n_tiles"] = len(index)
+    header["n_bytes"] = int(sum(e[3] for e in index))
+    return header
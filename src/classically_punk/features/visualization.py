@@ -2,7 +2,10 @@
 3D projection and surface utilities for audio features and embeddings.
 
 Exports Plotly-friendly data for interactive rendering, plus helper functions for
-static matplotlib/plotly generation.
+static matplotlib/plotly generation. plotly_scatter3d_large renders large catalogues
+as one trace with float32 typed arrays, categorical colour codes and an optional
+voxel/density point budget; hover carries only the row index so metadata can be
+fetched lazily.
 """
 
 from __future__ import annotations
@@ -12,6 +15,8 @@ from typing import Dict, Tuple
 import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
+from plotly.colors import qualitative
+from scipy.signal import fftconvolve
 from sklearn.neighbors import KernelDensity
 
 from classically_punk.features.projection import project_with_umap
@@ -26,22 +31,101 @@ def project_3d(df: pd.DataFrame, target_col: str = "label", **umap_kwargs) -> Tu
     return coords_df, mapper
 
 
-def kde_density_surface(coords: np.ndarray, bandwidth: float = 0.5, grid_size: int = 30) -> Dict[str, np.ndarray]:
+def _density_grid(coords: np.ndarray, grid_size: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    mins = coords.min(axis=0)
+    maxs = coords.max(axis=0)
+    axes = [np.linspace(mins[d], maxs[d], grid_size) for d in range(3)]
+    xx, yy, zz = np.meshgrid(*axes, indexing="ij")
+    return xx, yy, zz
+
+
+def _check_grid_size(grid_size: int) -> None:
+    if grid_size < 2:
+        raise ValueError(f"grid_size must be at least 2, got {grid_size}")
+
+
+def linear_binning(coords: np.ndarray, mins: np.ndarray, steps: np.ndarray, grid_size: int) -> np.ndarray:
     """
-    Estimate a 3D density over projected coordinates and return a mesh grid.
+    Spread each point's unit weight over its 8 surrounding grid nodes (trilinear weights).
+    """
+    _check_grid_size(grid_size)
+    frac = (coords - mins) / steps
+    base = np.clip(np.floor(frac).astype(np.int64), 0, grid_size - 2)
+    t = np.clip(frac - base, 0.0, 1.0)
+    counts = np.zeros(grid_size**3)
+    for corner in range(8):
+        offset = np.array([(corner >> 2) & 1, (corner >> 1) & 1, corner & 1])
+        w = np.prod(np.where(offset, t, 1.0 - t), axis=1)
+        idx = base + offset
+        flat = (idx[:, 0] * grid_size + idx[:, 1]) * grid_size + idx[:, 2]
+        counts += np.bincount(flat, weights=w, minlength=grid_size**3)
+    return counts.reshape(grid_size, grid_size, grid_size)
+
+
+def fft_kde_grid(coords: np.ndarray, bandwidth: float, grid_size: int) -> np.ndarray:
     """
-    kde = KernelDensity(bandwidth=bandwidth, kernel="gaussian")
-    kde.fit(coords)
+    Gaussian KDE on the regular grid spanning coords: linear binning, then a separable
+    FFT convolution with the kernel truncated at 4 bandwidths. O(N + G^3 log G).
 
+    The binning error grows with (grid step / bandwidth)^2: a few percent of the peak
+    density when the step is about half the bandwidth.
+    """
+    _check_grid_size(grid_size)
     mins = coords.min(axis=0)
-    maxs = coords.max(axis=0)
-    xs = np.linspace(mins[0], maxs[0], grid_size)
-    ys = np.linspace(mins[1], maxs[1], grid_size)
-    zs = np.linspace(mins[2], maxs[2], grid_size)
-    xx, yy, zz = np.meshgrid(xs, ys, zs, indexing="ij")
-    grid_points = np.vstack([xx.ravel(), yy.ravel(), zz.ravel()]).T
-    log_dens = kde.score_samples(grid_points)
-    dens = np.exp(log_dens).reshape(xx.shape)
+    spans = coords.max(axis=0) - mins
+    steps = np.where(spans > 0, spans, 1.0) / (grid_size - 1)
+    density = linear_binning(coords, mins, steps, grid_size)
+    for d in range(3):
+        half = int(min(np.ceil(4.0 * bandwidth / steps[d]), grid_size - 1)) if spans[d] > 0 else 0
+        offsets = np.arange(-half, half + 1) * (steps[d] if spans[d] > 0 else 0.0)
+        kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2) / (np.sqrt(2 * np.pi) * bandwidth)
+        shape = [1, 1, 1]
+        shape[d] = kernel.shape[0]
+        if spans[d] > 0:
+            density = fftconvolve(density, kernel.reshape(shape), mode="same", axes=d)
+        else:
+            # Flat axis: every grid node coincides, so the whole column gets the kernel peak.
+            density = np.repeat(density.sum(axis=d, keepdims=True), grid_size, axis=d) * kernel[half]
+    return np.maximum(density, 0.0) / coords.shape[0]
+
+
+def resolve_kde_method(n_points: int, grid_size: int, method: str = "auto") -> str:
+    """
+    The engine kde_density_surface runs for this input: "auto" becomes "fft" once
+    N * G^3 exceeds a few million kernel evaluations, otherwise "exact".
+    """
+    if method == "auto":
+        return "fft" if n_points * grid_size**3 > 5_000_000 else "exact"
+    return method
+
+
+def kde_density_surface(
+    coords: np.ndarray,
+    bandwidth: float = 0.5,
+    grid_size: int = 30,
+    method: str = "exact",
+) -> Dict[str, np.ndarray]:
+    """
+    Estimate a 3D density over projected coordinates and return a mesh grid.
+
+    method="exact" scores every grid node with sklearn KernelDensity (O(N * G^3));
+    "fft" uses linear binning plus FFT convolution (approximate); "auto" defers to
+    resolve_kde_method, which callers can use to see which engine will run.
+    """
+    _check_grid_size(grid_size)
+    coords = np.asarray(coords, dtype=np.float64)
+    method = resolve_kde_method(coords.shape[0], grid_size, method)
+    xx, yy, zz = _density_grid(coords, grid_size)
+    if method == "fft":
+        dens = fft_kde_grid(coords, bandwidth, grid_size)
+    elif method == "exact":
+        kde = KernelDensity(bandwidth=bandwidth, kernel="gaussian")
+        kde.fit(coords)
+        grid_points = np.vstack([xx.ravel(), yy.ravel(), zz.ravel()]).T
+        log_dens = kde.score_samples(grid_points)
+        dens = np.exp(log_dens).reshape(xx.shape)
+    else:
+        raise ValueError(f"Unknown KDE method: {method}")
     return {"xx": xx, "yy": yy, "zz": zz, "density": dens}
 
 
@@ -66,6 +150,143 @@ def plotly_scatter3d(coords_df: pd.DataFrame, label_col: str = "label") -> go.Fi
     return fig
 
 
+def _voxel_keys(coords: np.ndarray, resolution: int) -> np.ndarray:
+    mins = coords.min(axis=0)
+    spans = np.where(np.ptp(coords, axis=0) > 0, np.ptp(coords, axis=0), 1.0)
+    cells = np.clip(((coords - mins) / spans * resolution).astype(np.int64), 0, resolution - 1)
+    return (cells[:, 0] * resolution + cells[:, 1]) * resolution + cells[:, 2]
+
+
+def _voxel_resolution(coords: np.ndarray, max_points: int) -> int:
+    # Finest per-axis resolution whose occupied voxel count stays within the budget.
+    lo, hi = 1, 1024
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if np.unique(_voxel_keys(coords, mid)).shape[0] <= max_points:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+def voxel_aggregate(coords: np.ndarray, codes: np.ndarray, max_points: int) -> Dict[str, np.ndarray]:
+    """
+    Merge points into at most max_points occupied voxels: centroid, count, dominant label
+    code and one representative row per voxel.
+    """
+    keys = _voxel_keys(coords, _voxel_resolution(coords, max_points))
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse)
+    centroid = np.stack([np.bincount(inverse, weights=coords[:, d]) / counts for d in range(3)], axis=1)
+    n_codes = int(codes.max()) + 2 if codes.size else 1
+    pair, pair_counts = np.unique(inverse * n_codes + (codes + 1), return_counts=True)
+    order = np.lexsort((-pair_counts, pair // n_codes))
+    first = np.r_[True, (pair // n_codes)[order][1:] != (pair // n_codes)[order][:-1]]
+    dominant = (pair % n_codes)[order][first] - 1
+    representative = np.full(uniq.shape[0], -1, dtype=np.int64)
+    representative[inverse[::-1]] = np.arange(keys.shape[0])[::-1]
+    return {"coords": centroid, "counts": counts, "codes": dominant, "rows": representative}
+
+
+def density_downsample(coords: np.ndarray, max_points: int, resolution: int = 64, random_state: int = 42) -> np.ndarray:
+    """
+    Sorted rows of a density-aware subsample: every voxel keeps at most m random points, with m
+    chosen so the total fits max_points, so sparse regions survive and dense cores are thinned.
+    """
+    if coords.shape[0] <= max_points:
+        return np.arange(coords.shape[0])
+    keys = _voxel_keys(coords, resolution)
+    _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    # Water-filling: the largest cap m with sum(min(counts, m)) <= max_points.
+    sorted_counts = np.sort(counts)
+    kept_below = np.r_[0, np.cumsum(sorted_counts)[:-1]] + sorted_counts * (sorted_counts.shape[0] - np.arange(sorted_counts.shape[0]))
+    idx = np.searchsorted(kept_below, max_points, side="right")
+    below = int(sorted_counts[:idx].sum())
+    cap = max((max_points - below) // max(sorted_counts.shape[0] - idx, 1), 1)
+    priority = np.random.default_rng(random_state).permutation(coords.shape[0])
+    order = np.lexsort((priority, inverse))
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+    rank = np.arange(order.shape[0]) - np.repeat(starts, counts)
+    keep = order[rank < cap]
+    if keep.shape[0] > max_points:
+        # More occupied voxels than the budget: keep a random max_points of the per-voxel picks.
+        keep = keep[np.argsort(priority[keep])[:max_points]]
+    return np.sort(keep)
+
+
+def _categorical_colorscale(n: int) -> list:
+    palette = qualitative.Plotly
+    scale = []
+    for i in range(max(n, 1)):
+        color = palette[i % len(palette)]
+        scale += [[i / max(n, 1), color], [(i + 1) / max(n, 1), color]]
+    return scale
+
+
+def plotly_scatter3d_large(
+    coords_df: pd.DataFrame,
+    label_col: str = "label",
+    max_points: int | None = 200_000,
+    method: str = "density",
+    marker_size: float = 2.0,
+    random_state: int = 42,
+) -> go.Figure:
+    """
+    Single-trace 3D scatter for large projections.
+
+    Coordinates are float32 and colours are integer label codes on a discrete colorscale,
+    both encoded by plotly as binary typed arrays. Above max_points, method="density" keeps
+    a density-aware subsample and method="voxel" draws one marker per occupied voxel
+    (sized by count). customdata holds each marker's row position in coords_df, so hover
+    metadata (path, title, preview) can be looked up lazily by index instead of embedded.
+    """
+    coords = coords_df[["x", "y", "z"]].to_numpy(dtype=np.float64)
+    if label_col in coords_df.columns:
+        codes, labels = pd.factorize(coords_df[label_col])
+    else:
+        codes, labels = np.full(coords.shape[0], -1), pd.Index([])
+    sizes = None
+    if max_points is not None and coords.shape[0] > max_points:
+        if method == "voxel":
+            agg = voxel_aggregate(coords, codes, max_points)
+            coords, codes, rows = agg["coords"], agg["codes"], agg["rows"]
+            sizes = marker_size * (1.0 + np.log2(agg["counts"]))
+        elif method == "density":
+            rows = density_downsample(coords, max_points, random_state=random_state)
+            coords, codes = coords[rows], codes[rows]
+        else:
+            raise ValueError(f"Unknown downsampling method: {method}")
+    else:
+        rows = np.arange(coords.shape[0])
+
+    n_labels = len(labels)
+    coords = coords.astype(np.float32)
+    fig = go.Figure(
+        go.Scatter3d(
+            x=coords[:, 0],
+            y=coords[:, 1],
+            z=coords[:, 2],
+            mode="markers",
+            customdata=rows.astype(np.int32),
+            hovertemplate="row %{customdata}<extra></extra>",
+            marker=dict(
+                size=sizes.astype(np.float32) if sizes is not None else marker_size,
+                color=codes.astype(np.int16),
+                colorscale=_categorical_colorscale(n_labels),
+                cmin=-0.5,
+                cmax=max(n_labels, 1) - 0.5,
+                colorbar=dict(tickvals=list(range(n_labels)), ticktext=[str(l) for l in labels]) if n_labels else None,
+                showscale=bool(n_labels),
+            ),
+        )
+    )
+    fig.update_layout(
+        scene=dict(xaxis_title="x", yaxis_title="y", zaxis_title="z"),
+        meta={"labels": [str(l) for l in labels], "n_points": int(len(coords_df)), "n_shown": int(coords.shape[0])},
+    )
+    return fig
+
+
 def plotly_isosurface(density_mesh: Dict[str, np.ndarray], iso_threshold: float = 0.1) -> go.Figure:
     """
     Build a Plotly isosurface figure from KDE density mesh.
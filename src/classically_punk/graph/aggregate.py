@@ -0,0 +1,195 @@
+"""
+Streaming genre-level aggregation of track features.
+
+GenreAccumulator keeps per-genre count, mean and centred sum-of-squares (and
+optionally centred cross-products) and folds in feature chunks one at a time.
+Chunks and partial accumulators are combined with the pairwise update of Chan
+et al., which stays numerically stable where raw sum/sum-of-squares would
+cancel. Accumulators are plain arrays, so worker processes can each aggregate
+a shard and the parent merges the results.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Hashable, Iterable, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from classically_punk.features.store import feature_columns, iter_feature_chunks
+
+
+class GenreAccumulator:
+    def __init__(
+        self,
+        feature_cols: Sequence[str] | None = None,
+        target_col: str = "label",
+        full_covariance: bool = False,
+    ):
+        self.feature_cols: List[str] | None = list(feature_cols) if feature_cols is not None else None
+        self.target_col = target_col
+        self.full_covariance = full_covariance
+        self.labels: List[Hashable] = []
+        self._rows: Dict[Hashable, int] = {}
+        self.count = np.zeros(0, dtype=np.int64)
+        self.mean = np.zeros((0, 0))
+        self.m2 = np.zeros((0, 0))
+        self.comoment = np.zeros((0, 0, 0)) if full_covariance else None
+
+    def _ensure(self, labels: Iterable[Hashable]) -> np.ndarray:
+        for label in labels:
+            if label not in self._rows:
+                self._rows[label] = len(self.labels)
+                self.labels.append(label)
+        grow = len(self.labels) - self.count.shape[0]
+        if grow > 0:
+            n_feat = len(self.feature_cols or [])
+            self.count = np.concatenate([self.count, np.zeros(grow, dtype=np.int64)])
+            self.mean = np.vstack([self.mean.reshape(-1, n_feat), np.zeros((grow, n_feat))])
+            self.m2 = np.vstack([self.m2.reshape(-1, n_feat), np.zeros((grow, n_feat))])
+            if self.comoment is not None:
+                self.comoment = np.concatenate(
+                    [self.comoment.reshape(-1, n_feat, n_feat), np.zeros((grow, n_feat, n_feat))]
+                )
+        return np.array([self._rows[label] for label in labels], dtype=np.int64)
+
+    def _combine(self, rows: np.ndarray, count: np.ndarray, mean: np.ndarray, m2: np.ndarray, comoment) -> None:
+        n_a = self.count[rows].astype(float)
+        n_b = count.astype(float)
+        n = n_a + n_b
+        delta = mean - self.mean[rows]
+        w = (n_a * n_b / n)[:, None]
+        self.mean[rows] += delta * (n_b / n)[:, None]
+        self.m2[rows] += m2 + delta**2 * w
+        if self.comoment is not None:
+            self.comoment[rows] += comoment + np.einsum("gi,gj->gij", delta, delta) * w[:, :, None]
+        self.count[rows] += count
+
+    def update(self, chunk: pd.DataFrame) -> "GenreAccumulator":
+        """
+        Fold a DataFrame chunk (label column + feature columns) into the running statistics.
+        """
+        if self.feature_cols is None:
+            self.feature_cols = feature_columns(chunk, exclude=(self.target_col, "path", "track_id"))
+            if not self.feature_cols:
+                raise ValueError("No feature columns to aggregate.")
+        codes, uniques = pd.factorize(chunk[self.target_col], sort=False)
+        valid = codes >= 0
+        if not valid.any():
+            return self
+        codes = codes[valid]
+        X = chunk[self.feature_cols].to_numpy(dtype=float)[valid]
+
+        n_groups = len(uniques)
+        indicator = sparse.csr_matrix((np.ones(codes.shape[0]), (codes, np.arange(codes.shape[0]))), shape=(n_groups, codes.shape[0]))
+        count = np.bincount(codes, minlength=n_groups)
+        mean = np.asarray(indicator @ X) / count[:, None]
+        dev = X - mean[codes]
+        m2 = np.asarray(indicator @ (dev**2))
+        comoment = None
+        if self.comoment is not None:
+            comoment = np.zeros((n_groups, X.shape[1], X.shape[1]))
+            order = np.argsort(codes, kind="stable")
+            bounds = np.concatenate([[0], np.cumsum(count)])
+            for g in range(n_groups):
+                block = dev[order[bounds[g] : bounds[g + 1]]]
+                comoment[g] = block.T @ block
+
+        rows = self._ensure(list(uniques))
+        self._combine(rows, count, mean, m2, comoment)
+        return self
+
+    def merge(self, other: "GenreAccumulator") -> "GenreAccumulator":
+        """
+        Merge a partial accumulator (e.g. from a worker process) into this one.
+        """
+        if other.count.shape[0] == 0:
+            return self
+        if self.feature_cols is None:
+            self.feature_cols = other.feature_cols
+        if list(other.feature_cols or []) != list(self.feature_cols or []):
+            raise ValueError("Cannot merge accumulators over different feature columns.")
+        if (self.comoment is None) != (other.comoment is None):
+            raise ValueError("Cannot merge accumulators with and without full covariance.")
+        rows = self._ensure(other.labels)
+        self._combine(rows, other.count, other.mean, other.m2, other.comoment)
+        return self
+
+    def cov_traces(self) -> np.ndarray:
+        denom = np.maximum(self.count - 1, 1)
+        return np.where(self.count > 1, self.m2.sum(axis=1) / denom, 0.0)
+
+    def covariances(self) -> Dict[Hashable, np.ndarray]:
+        """
+        Full sample covariance matrix per genre (requires full_covariance=True).
+        """
+        if self.comoment is None:
+            raise ValueError("Accumulator was created without full_covariance=True.")
+        denom = np.maximum(self.count - 1, 1)
+        return {label: self.comoment[i] / denom[i] for i, label in enumerate(self.labels)}
+
+    def finalize(self) -> Tuple[pd.DataFrame, np.ndarray, List[str]]:
+        """
+        Return (agg_df, centroids, ids) in the format of aggregate_genre_embeddings, sorted by genre.
+        """
+        if not self.labels:
+            raise ValueError("No rows were aggregated.")
+        order = sorted(range(len(self.labels)), key=lambda i: self.labels[i])
+        labels = [self.labels[i] for i in order]
+        centroids = self.mean[order]
+        agg_df = pd.DataFrame(centroids, columns=[f"feat_{i}" for i in range(centroids.shape[1])])
+        agg_df.insert(0, "cov_trace", self.cov_traces()[order])
+        agg_df.insert(0, "genre", labels)
+        return agg_df, centroids, [f"genre::{label}" for label in labels]
+
+
+def aggregate_genre_chunks(
+    chunks: Iterable[pd.DataFrame],
+    target_col: str = "label",
+    feature_cols: Sequence[str] | None = None,
+    full_covariance: bool = False,
+) -> GenreAccumulator:
+    """
+    Aggregate an iterable of feature chunks in one pass.
+    """
+    acc = GenreAccumulator(feature_cols=feature_cols, target_col=target_col, full_covariance=full_covariance)
+    for chunk in chunks:
+        acc.update(chunk)
+    return acc
+
+
+def _aggregate_shard(args: Tuple[Path, str, Sequence[str] | None, bool, int]) -> GenreAccumulator:
+    path, target_col, feature_cols, full_covariance, chunksize = args
+    return aggregate_genre_chunks(
+        iter_feature_chunks(path, chunksize=chunksize),
+        target_col=target_col,
+        feature_cols=feature_cols,
+        full_covariance=full_covariance,
+    )
+
+
+def aggregate_feature_store(
+    paths: Sequence[Path],
+    target_col: str = "label",
+    feature_cols: Sequence[str] | None = None,
+    full_covariance: bool = False,
+    chunksize: int = 100_000,
+    n_jobs: int | None = None,
+) -> GenreAccumulator:
+    """
+    Aggregate feature store shards across worker processes and merge the partials.
+    """
+    jobs = [(Path(p), target_col, feature_cols, full_covariance, chunksize) for p in paths]
+    if n_jobs == 1 or len(jobs) <= 1:
+        partials = [_aggregate_shard(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            partials = list(pool.map(_aggregate_shard, jobs))
+
+    acc = GenreAccumulator(feature_cols=feature_cols, target_col=target_col, full_covariance=full_covariance)
+    for partial in partials:
+        acc.merge(partial)
+    return acc
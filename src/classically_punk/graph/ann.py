@@ -0,0 +1,224 @@
+"""
+Approximate nearest-neighbour index for track similarity.
+
+An inverted-file (IVF) index over unit-normalised embeddings: spherical k-means
+partitions the catalogue into lists, and a query scans only the n_probe lists
+whose centroids are closest. n_lists trades build time against list size and
+n_probe trades recall against latency. The index persists as a single array
+bundle that is memory-mapped at load, so a serving process starts without
+re-reading features or refitting anything.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from classically_punk.features.store import load_feature_matrix
+from classically_punk.graph.knn import cosine_knn_search, normalize_rows
+from classically_punk.storage import load_bundle, save_bundle
+
+
+def _spherical_kmeans(X: np.ndarray, n_lists: int, n_iter: int, rng: np.random.Generator) -> np.ndarray:
+    centroids = X[rng.choice(X.shape[0], n_lists, replace=False)].copy()
+    for _ in range(n_iter):
+        assign = cosine_knn_search(X, centroids, k=1, normalized=True, n_jobs=1)[0][:, 0]
+        counts = np.bincount(assign, minlength=n_lists)
+        sums = np.stack([np.bincount(assign, weights=X[:, j], minlength=n_lists) for j in range(X.shape[1])], axis=1)
+        empty = counts == 0
+        if empty.any():
+            sums[empty] = X[rng.choice(X.shape[0], int(empty.sum()), replace=False)]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+@dataclass
+class IVFIndex:
+    centroids: np.ndarray  # (n_lists, d) unit-norm float32
+    list_offsets: np.ndarray  # (n_lists + 1,) start of each list in vectors
+    vectors: np.ndarray  # (N, d) unit-norm float32, grouped by list
+    rows: np.ndarray  # (N,) original row of each stored vector
+    ids: np.ndarray  # (N,) ids in original row order
+    n_probe: int = 8
+    _positions: Dict[str, int] | None = field(default=None, repr=False)
+
+    @property
+    def n_lists(self) -> int:
+        return int(self.centroids.shape[0])
+
+    def __len__(self) -> int:
+        return int(self.vectors.shape[0])
+
+    @classmethod
+    def build(
+        cls,
+        embeddings: np.ndarray,
+        ids: Sequence[str],
+        n_lists: int | None = None,
+        n_probe: int = 8,
+        n_iter: int = 10,
+        train_size: int | None = None,
+        random_state: int = 42,
+        memory_budget_mb: float = 512.0,
+        n_jobs: int | None = None,
+    ) -> "IVFIndex":
+        """
+        Partition embeddings with spherical k-means (default sqrt(N) lists) and build the index.
+        """
+        if embeddings.shape[0] != len(ids):
+            raise ValueError("embeddings and ids length mismatch")
+        if embeddings.shape[0] == 0:
+            raise ValueError("Cannot build an index over zero embeddings.")
+
+        X = normalize_rows(embeddings)
+        n = X.shape[0]
+        n_lists = min(n_lists or max(1, int(np.sqrt(n))), n)
+        rng = np.random.default_rng(random_state)
+        train_size = min(n, train_size or max(64 * n_lists, 10_000))
+        train = X[np.sort(rng.choice(n, train_size, replace=False))]
+        centroids = _spherical_kmeans(train, n_lists, n_iter, rng)
+
+        assign = cosine_knn_search(
+            X, centroids, k=1, memory_budget_mb=memory_budget_mb, n_jobs=n_jobs, normalized=True
+        )[0][:, 0]
+        order = np.argsort(assign, kind="stable")
+        counts = np.bincount(assign, minlength=n_lists)
+        return cls(
+            centroids=centroids,
+            list_offsets=np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+            vectors=X[order],
+            rows=order.astype(np.int64),
+            ids=np.asarray(ids, dtype=str),
+            n_probe=n_probe,
+        )
+
+    @classmethod
+    def from_feature_store(cls, path: Path, id_col: str = "track_id", chunksize: int = 100_000, **build_kwargs) -> "IVFIndex":
+        """
+        Build an index from the feature store CSV.
+        """
+        ids, X, _ = load_feature_matrix(path, id_col=id_col, chunksize=chunksize)
+        return cls.build(X, ids, **build_kwargs)
+
+    def save(self, path: Path) -> None:
+        save_bundle(
+            path,
+            {
+                "centroids": self.centroids,
+                "list_offsets": self.list_offsets,
+                "vectors": self.vectors,
+                "rows": self.rows,
+                "ids": self.ids,
+            },
+            meta={"kind": "ivf", "metric": "cosine", "n_probe": self.n_probe},
+        )
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "IVFIndex":
+        arrays, meta = load_bundle(path, mmap=mmap)
+        if meta.get("kind") != "ivf":
+            raise ValueError(f"{path} does not contain an IVF index")
+        return cls(
+            centroids=arrays["centroids"],
+            list_offsets=arrays["list_offsets"],
+            vectors=arrays["vectors"],
+            rows=arrays["rows"],
+            ids=arrays["ids"],
+            n_probe=int(meta["n_probe"]),
+        )
+
+    def search(self, queries: np.ndarray, k: int = 10, n_probe: int | None = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k cosine neighbours for a batch of query vectors.
+
+        Returns (rows, similarities) of shape (n_queries, k) sorted by descending
+        similarity; rows index into ids. Slots left unfilled because the probed
+        lists held fewer than k vectors have row -1 and similarity -inf.
+        """
+        Q = normalize_rows(np.atleast_2d(queries))
+        n_q = Q.shape[0]
+        n_probe = min(n_probe or self.n_probe, self.n_lists)
+        probe = cosine_knn_search(Q, self.centroids, k=n_probe, normalized=True, n_jobs=1)[0]
+
+        best_sims = np.full((n_q, k), -np.inf, dtype=np.float32)
+        best_pos = np.full((n_q, k), -1, dtype=np.int64)
+
+        # Visit each probed list once, scoring every query that probes it together.
+        flat_lists = probe.ravel()
+        flat_queries = np.repeat(np.arange(n_q), n_probe)
+        order = np.argsort(flat_lists, kind="stable")
+        lists, starts = np.unique(flat_lists[order], return_index=True)
+        bounds = np.append(starts, order.shape[0])
+        for i, lst in enumerate(lists):
+            lo, hi = int(self.list_offsets[lst]), int(self.list_offsets[lst + 1])
+            if hi == lo:
+                continue
+            qs = flat_queries[order[bounds[i] : bounds[i + 1]]]
+            cand_sims = np.hstack([best_sims[qs], Q[qs] @ np.asarray(self.vectors[lo:hi]).T])
+            cand_pos = np.hstack([best_pos[qs], np.broadcast_to(np.arange(lo, hi), (qs.shape[0], hi - lo))])
+            width = cand_sims.shape[1]
+            keep = np.argpartition(cand_sims, width - k, axis=1)[:, width - k :]
+            best_sims[qs] = np.take_along_axis(cand_sims, keep, axis=1)
+            best_pos[qs] = np.take_along_axis(cand_pos, keep, axis=1)
+
+        order = np.argsort(-best_sims, axis=1, kind="stable")
+        best_sims = np.take_along_axis(best_sims, order, axis=1)
+        best_pos = np.take_along_axis(best_pos, order, axis=1)
+        rows = np.where(best_pos >= 0, np.asarray(self.rows)[np.maximum(best_pos, 0)], -1)
+        return rows, best_sims
+
+    def query(self, vector: np.ndarray, k: int = 10, n_probe: int | None = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k neighbours of a single vector.
+        """
+        rows, sims = self.search(np.asarray(vector)[None, :], k=k, n_probe=n_probe)
+        return rows[0], sims[0]
+
+    def neighbors(self, track_id: str, k: int = 10, n_probe: int | None = None) -> pd.DataFrame:
+        """
+        Top-k neighbours of an indexed track (excluding itself) as an id/similarity frame.
+        """
+        if self._positions is None:
+            ids = np.asarray(self.ids)[np.asarray(self.rows)]
+            self._positions = {str(t): pos for pos, t in enumerate(ids.tolist())}
+        position = self._positions[track_id]
+        row = int(self.rows[position])
+        rows, sims = self.query(self.vectors[position], k=k + 1, n_probe=n_probe)
+        keep = (rows != row) & (rows >= 0)
+        rows, sims = rows[keep][:k], sims[keep][:k]
+        return pd.DataFrame({"id": np.asarray(self.ids)[rows], "similarity": sims})
+
+
+def benchmark_index(
+    index: IVFIndex,
+    queries: np.ndarray,
+    k: int = 10,
+    n_probes: Iterable[int] = (1, 2, 4, 8, 16, 32),
+) -> pd.DataFrame:
+    """
+    Report recall@k against exact search and queries/second for each n_probe.
+    """
+    exact_pos, _ = cosine_knn_search(queries, np.asarray(index.vectors), k=k)
+    exact = np.asarray(index.rows)[exact_pos]
+
+    records = []
+    for n_probe in n_probes:
+        if n_probe > index.n_lists:
+            continue
+        t0 = time.perf_counter()
+        approx, _ = index.search(queries, k=k, n_probe=n_probe)
+        elapsed = time.perf_counter() - t0
+        hits = sum(len(set(a) & set(e)) for a, e in zip(approx.tolist(), exact.tolist()))
+        records.append(
+            {
+                "n_probe": n_probe,
+                "recall_at_k": hits / (k * queries.shape[0]),
+                "qps": queries.shape[0] / elapsed if elapsed > 0 else float("inf"),
+            }
+        )
+    return pd.DataFrame(records)
@@ -0,0 +1,142 @@
+"""
+Collaborative (playlist co-occurrence) track similarity.
+
+Builds the sparse playlist x track incidence matrix from IN_PLAYLIST edges and
+computes track-track co-occurrence counts C = P^T P in blocks of track rows.
+Block boundaries come from an upper bound on each row's non-zeros
+(sum of the sizes of the playlists containing the track), so every block
+fits the memory budget. Each block is normalised (cosine, Jaccard or positive
+PMI), pruned to the top-k per row, and emitted as SIMILAR_TO edges with
+source="cooccurrence". PMI is clipped at 0 and zero scores are dropped, so edge
+weights stay positive for PageRank and Louvain.
+"""
+
+from __future__ import annotations
+
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from classically_punk.graph.knn import topk_per_group
+from classically_punk.graph.schema import EdgeArrays
+
+# Bytes per non-zero held while a block is normalised and ranked
+# (int32 index + float64 value, plus sort keys and temporaries).
+_BYTES_PER_NNZ = 48
+NORMALIZATIONS = ("cosine", "jaccard", "ppmi", "count")
+
+
+def incidence_matrix(edges: pd.DataFrame, edge_type: str = "IN_PLAYLIST") -> Tuple[sparse.csr_matrix, np.ndarray, np.ndarray]:
+    """
+    Binary (playlists x tracks) incidence matrix from an edge frame, with row/column ids.
+    """
+    sub = edges[edges["type"] == edge_type] if "type" in edges.columns else edges
+    pl_codes, playlists = pd.factorize(sub["src"])
+    tr_codes, tracks = pd.factorize(sub["dst"])
+    P = sparse.csr_matrix(
+        (np.ones(len(sub), dtype=np.float64), (pl_codes, tr_codes)),
+        shape=(len(playlists), len(tracks)),
+    )
+    P.sum_duplicates()
+    P.data[:] = 1.0
+    return P, np.asarray(playlists, dtype=object), np.asarray(tracks, dtype=object)
+
+
+def _row_blocks(nnz_bound: np.ndarray, memory_budget_mb: float) -> List[Tuple[int, int]]:
+    budget = max(int(memory_budget_mb * 1024 * 1024 // _BYTES_PER_NNZ), 1)
+    cum = np.cumsum(nnz_bound)
+    blocks = []
+    start = 0
+    while start < nnz_bound.shape[0]:
+        base = cum[start - 1] if start else 0
+        stop = int(np.searchsorted(cum, base + budget, side="right"))
+        stop = max(stop, start + 1)
+        blocks.append((start, stop))
+        start = stop
+    return blocks
+
+
+def _normalize(C: sparse.csr_matrix, rows: np.ndarray, degree: np.ndarray, n_playlists: int, normalization: str) -> np.ndarray:
+    cols = C.indices
+    counts = C.data
+    d_i = degree[rows]
+    d_j = degree[cols]
+    if normalization == "cosine":
+        return counts / np.sqrt(d_i * d_j)
+    if normalization == "jaccard":
+        return counts / (d_i + d_j - counts)
+    if normalization == "ppmi":
+        return np.maximum(np.log(counts * n_playlists / (d_i * d_j)), 0.0)
+    return counts.astype(np.float64)
+
+
+def cooccurrence_topk(
+    P: sparse.csr_matrix,
+    k: int = 20,
+    normalization: str = "cosine",
+    min_count: int = 1,
+    memory_budget_mb: float = 256.0,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Top-k co-occurring tracks per track as (row, col, score) arrays.
+    """
+    if normalization not in NORMALIZATIONS:
+        raise ValueError(f"Unknown normalization: {normalization}")
+    P = P.tocsr()
+    PT = P.T.tocsr()
+    degree = np.asarray(P.sum(axis=0)).ravel()
+    playlist_sizes = np.asarray(P.sum(axis=1)).ravel()
+    nnz_bound = PT @ playlist_sizes
+
+    out_rows: List[np.ndarray] = [np.empty(0, dtype=np.int64)]
+    out_cols: List[np.ndarray] = [np.empty(0, dtype=np.int64)]
+    out_scores: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+    for start, stop in _row_blocks(nnz_bound, memory_budget_mb):
+        C = (PT[start:stop] @ P).tocsr()
+        local_rows = np.repeat(np.arange(C.shape[0]), np.diff(C.indptr))
+        C.data[(C.indices == local_rows + start) | (C.data < min_count)] = 0
+        C.eliminate_zeros()
+        if C.nnz == 0:
+            continue
+        local_rows = np.repeat(np.arange(C.shape[0]), np.diff(C.indptr))
+        scores = _normalize(C, local_rows + start, degree, P.shape[0], normalization)
+        # PPMI is 0 for pairs co-occurring no more than chance; they are not similarity edges.
+        positive = scores > 0
+        local_rows, cols, scores = local_rows[positive], C.indices[positive], scores[positive]
+
+        keep = topk_per_group(local_rows, scores, k)
+        out_rows.append(local_rows[keep] + start)
+        out_cols.append(cols[keep].astype(np.int64))
+        out_scores.append(scores[keep])
+    return np.concatenate(out_rows), np.concatenate(out_cols), np.concatenate(out_scores)
+
+
+def build_cooccurrence_edges(
+    edges: pd.DataFrame,
+    k: int = 20,
+    normalization: str = "cosine",
+    min_count: int = 1,
+    memory_budget_mb: float = 256.0,
+    version: str = "v1",
+) -> EdgeArrays:
+    """
+    SIMILAR_TO edges between tracks that share playlists, tagged source="cooccurrence".
+    """
+    P, _, tracks = incidence_matrix(edges)
+    rows, cols, scores = cooccurrence_topk(
+        P,
+        k=k,
+        normalization=normalization,
+        min_count=min_count,
+        memory_budget_mb=memory_budget_mb,
+    )
+    return EdgeArrays(
+        src=tracks[rows],
+        dst=tracks[cols],
+        weight=scores,
+        type="SIMILAR_TO",
+        source="cooccurrence",
+        version=version,
+    )
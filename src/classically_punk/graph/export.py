@@ -2,18 +2,53 @@
 Graph export utilities.
 
 Converts Edge collections to networkx graphs and serializes to JSON/GraphML for
-downstream visualization or analysis.
+downstream visualization or analysis. The file exporters encode edges into
+compact integer columns instead of building a networkx graph, then write the
+document in chunks, byte-for-byte the same as networkx would produce for the
+equivalent MultiDiGraph. networkx's edge order groups edges by source node,
+so the exporters buffer the whole column table: peak memory is still O(E),
+roughly 120 bytes per edge including sort temporaries plus the node-id strings,
+rather than the kilobytes per edge a networkx graph costs.
+
+CSRGraph is the binary counterpart for analytics and serving: compressed sparse
+row adjacency plus node-id and edge-attribute tables, saved as an uncompressed
+array bundle that memory-maps at load.
 """
 
 from __future__ import annotations
 
+import gzip
+import inspect
 import json
+import math
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterable
+from typing import Dict, Iterable, Iterator, List, Sequence, TextIO, Tuple, Union
 
 import networkx as nx
+import numpy as np
+import pandas as pd
+
+from classically_punk.graph.schema import Edge, EdgeArrays
+from classically_punk.storage import load_bundle, save_bundle
+
+EdgeInput = Union[Iterable[Edge], EdgeArrays, Sequence[EdgeArrays]]
 
-from classically_punk.graph.schema import Edge
+_ATTRS = ("type", "source", "version")
+_ATTR_DEFAULTS = {"source": "unknown", "version": "v1"}
+_GRAPHML_HEADER = (
+    "<?xml version='1.0' encoding='utf-8'?>\n"
+    '<graphml xmlns="http://graphml.graphdrawing.org/xmlns" '
+    'xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+    'xsi:schemaLocation="http://graphml.graphdrawing.org/xmlns '
+    'http://graphml.graphdrawing.org/xmlns/1.0/graphml.xsd">\n'
+)
+_GRAPHML_KEYS = (
+    '  <key id="d3" for="edge" attr.name="version" attr.type="string" />\n'
+    '  <key id="d2" for="edge" attr.name="source" attr.type="string" />\n'
+    '  <key id="d1" for="edge" attr.name="weight" attr.type="double" />\n'
+    '  <key id="d0" for="edge" attr.name="type" attr.type="string" />\n'
+)
 
 
 def edges_to_networkx(edges: Iterable[Edge], directed: bool = True) -> nx.Graph:
@@ -37,17 +72,438 @@ def export_node_link_json(edges: Iterable[Edge], path: Path) -> None:
     """
     Write a node-link JSON from edges for web visualization.
     """
-    G = edges_to_networkx(edges)
-    data = nx.readwrite.json_graph.node_link_data(G)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(data))
+    stream_node_link_json(edges, path, compress=False)
 
 
 def export_graphml(edges: Iterable[Edge], path: Path) -> None:
     """
     Write GraphML for offline graph tools.
     """
-    G = edges_to_networkx(edges)
+    stream_graphml(edges, path)
+
+
+@dataclass
+class EdgeColumns:
+    """
+    Integer-coded edge table: node ids in first-seen order plus per-edge codes.
+    """
+
+    nodes: List[str]
+    src: np.ndarray
+    dst: np.ndarray
+    weight: np.ndarray
+    codes: Dict[str, np.ndarray]
+    values: Dict[str, List[str]]
+
+    def __len__(self) -> int:
+        return int(self.src.shape[0])
+
+
+def collect_edge_columns(edges: EdgeInput, chunk_size: int = 100_000) -> EdgeColumns:
+    """
+    Encode Edge objects or EdgeArrays batches into integer columns without keeping the objects.
+    """
+    if isinstance(edges, EdgeArrays):
+        edges = [edges]
+    node_codes: Dict[str, int] = {}
+    attr_codes: Dict[str, Dict[str, int]] = {name: {} for name in _ATTRS}
+    parts: Dict[str, List[np.ndarray]] = {name: [] for name in ("src", "dst", "weight", *_ATTRS)}
+
+    def flush(src, dst, weight, attrs) -> None:
+        parts["src"].append(np.asarray(src, dtype=np.int64))
+        parts["dst"].append(np.asarray(dst, dtype=np.int64))
+        parts["weight"].append(np.asarray(weight, dtype=np.float64))
+        for name in _ATTRS:
+            parts[name].append(np.asarray(attrs[name], dtype=np.int32))
+
+    def node(n: str) -> int:
+        return node_codes.setdefault(n, len(node_codes))
+
+    def attr(name: str, value: str) -> int:
+        table = attr_codes[name]
+        return table.setdefault(value, len(table))
+
+    src: List[int] = []
+    dst: List[int] = []
+    weight: List[float] = []
+    attrs: Dict[str, List[int]] = {name: [] for name in _ATTRS}
+    for item in edges:
+        if isinstance(item, EdgeArrays):
+            if src:
+                flush(src, dst, weight, attrs)
+                src, dst, weight, attrs = [], [], [], {name: [] for name in _ATTRS}
+            batch_src: List[int] = []
+            batch_dst: List[int] = []
+            for s, d in zip(item.src.tolist(), item.dst.tolist()):
+                batch_src.append(node(s))
+                batch_dst.append(node(d))
+            n = len(item)
+            flush(
+                batch_src,
+                batch_dst,
+                item.weight,
+                {name: np.full(n, attr(name, getattr(item, name))) for name in _ATTRS},
+            )
+            continue
+        src.append(node(item.src))
+        dst.append(node(item.dst))
+        weight.append(item.weight)
+        for name in _ATTRS:
+            attrs[name].append(attr(name, getattr(item, name)))
+        if len(src) >= chunk_size:
+            flush(src, dst, weight, attrs)
+            src, dst, weight, attrs = [], [], [], {name: [] for name in _ATTRS}
+    flush(src, dst, weight, attrs)
+
+    return EdgeColumns(
+        nodes=list(node_codes),
+        src=np.concatenate(parts["src"]),
+        dst=np.concatenate(parts["dst"]),
+        weight=np.concatenate(parts["weight"]),
+        codes={name: np.concatenate(parts[name]) for name in _ATTRS},
+        values={name: list(attr_codes[name]) for name in _ATTRS},
+    )
+
+
+def edge_columns_from_frame(df: pd.DataFrame) -> EdgeColumns:
+    """
+    Encode an edge CSV frame (src,dst,type,weight,source,version) column-wise.
+    """
+    interleaved = np.column_stack([df["src"].to_numpy(dtype=object), df["dst"].to_numpy(dtype=object)]).ravel()
+    node_codes, nodes = pd.factorize(interleaved)
+    codes: Dict[str, np.ndarray] = {}
+    values: Dict[str, List[str]] = {}
+    for name in _ATTRS:
+        column = df[name] if name in df.columns or name == "type" else pd.Series(_ATTR_DEFAULTS[name], index=df.index)
+        c, uniques = pd.factorize(column.astype(str))
+        codes[name] = c.astype(np.int32)
+        values[name] = list(uniques)
+    weight = df["weight"].to_numpy(dtype=np.float64) if "weight" in df.columns else np.ones(len(df))
+    return EdgeColumns(
+        nodes=list(nodes),
+        src=node_codes[0::2].astype(np.int64),
+        dst=node_codes[1::2].astype(np.int64),
+        weight=weight,
+        codes=codes,
+        values=values,
+    )
+
+
+def networkx_edge_order(cols: EdgeColumns) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Return (order, keys) reproducing MultiDiGraph edge iteration and multi-edge keys.
+
+    networkx yields edges grouped by source node (first-seen order), then by target
+    in the order that (source, target) pair first appeared, then by key.
+    """
+    n = len(cols)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    pair = cols.src * max(len(cols.nodes), 1) + cols.dst
+    _, first, inverse = np.unique(pair, return_index=True, return_inverse=True)
+    by_pair = np.argsort(inverse, kind="stable")
+    group_start = np.searchsorted(inverse[by_pair], inverse[by_pair], side="left")
+    keys = np.empty(n, dtype=np.int64)
+    keys[by_pair] = np.arange(n) - group_start
+    order = np.lexsort((np.arange(n), first[inverse], cols.src))
+    return order, keys
+
+
+def _open_text(path: Path, compress: bool | None) -> TextIO:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if compress is None:
+        compress = path.suffix == ".gz"
+    if compress:
+        return gzip.open(path, "wt", encoding="utf-8")
+    return open(path, "w", encoding="utf-8")
+
+
+def _json_float(value: float) -> str:
+    return repr(value) if math.isfinite(value) else json.dumps(value)
+
+
+def _chunks(n: int, chunk_size: int) -> Iterator[slice]:
+    for start in range(0, n, chunk_size):
+        yield slice(start, min(start + chunk_size, n))
+
+
+def _node_link_edges_key() -> str:
+    # networkx >= 3.6 writes the edge list under "edges"; older releases (including 3.4/3.5,
+    # whose edges= parameter defaults to None) write "links".
+    param = inspect.signature(nx.readwrite.json_graph.node_link_data).parameters.get("edges")
+    return param.default if param is not None and isinstance(param.default, str) else "links"
+
+
+def stream_node_link_json(
+    edges: EdgeInput,
+    path: Path,
+    compress: bool | None = None,
+    chunk_size: int = 100_000,
+    edges_key: str | None = None,
+) -> None:
+    """
+    Write node-link JSON (gzip when compress=True or the path ends in .gz) without networkx.
+
+    edges_key names the edge list; by default it matches the installed networkx's
+    node_link_data ("edges" from 3.6, "links" before). Memory is O(E) in integer
+    columns (see module docstring); only the text output is chunked.
+    """
+    edges_key = edges_key or _node_link_edges_key()
+    cols = collect_edge_columns(edges, chunk_size=chunk_size)
+    order, keys = networkx_edge_order(cols)
+    nodes = [json.dumps(n) for n in cols.nodes]
+    values = {name: [json.dumps(v) for v in cols.values[name]] for name in _ATTRS}
+
+    with _open_text(path, compress) as f:
+        f.write('{"directed": true, "multigraph": true, "graph": {}, "nodes": [')
+        for sl in _chunks(len(nodes), chunk_size):
+            prefix = ", " if sl.start else ""
+            f.write(prefix + ", ".join(f'{{"id": {n}}}' for n in nodes[sl]))
+        f.write(f"], {json.dumps(edges_key)}: [")
+        for sl in _chunks(len(order), chunk_size):
+            idx = order[sl]
+            rows = zip(
+                cols.codes["type"][idx].tolist(),
+                cols.weight[idx].tolist(),
+                cols.src[idx].tolist(),
+                cols.codes["version"][idx].tolist(),
+                cols.dst[idx].tolist(),
+                keys[idx].tolist(),
+            )
+            # "source" holds the edge's source node: networkx overwrites the provenance attribute.
+            prefix = ", " if sl.start else ""
+            f.write(
+                prefix
+                + ", ".join(
+                    f'{{"type": {values["type"][t]}, "weight": {_json_float(w)}, "source": {nodes[u]}, '
+                    f'"version": {values["version"][ver]}, "target": {nodes[v]}, "key": {k}}}'
+                    for t, w, u, ver, v, k in rows
+                )
+            )
+        f.write("]}")
+
+
+def _xml_text(text: str) -> str:
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _xml_attr(text: str) -> str:
+    return (
+        _xml_text(text)
+        .replace('"', "&quot;")
+        .replace("\r", "&#13;")
+        .replace("\n", "&#10;")
+        .replace("\t", "&#09;")
+    )
+
+
+def stream_graphml(edges: EdgeInput, path: Path, chunk_size: int = 100_000) -> None:
+    """
+    Write GraphML in chunks, matching networkx.write_graphml output (O(E) column buffer).
+    """
+    cols = collect_edge_columns(edges, chunk_size=chunk_size)
+    order, keys = networkx_edge_order(cols)
+    nodes = [_xml_attr(n) for n in cols.nodes]
+    values = {name: [_xml_text(v) for v in cols.values[name]] for name in _ATTRS}
+
     path.parent.mkdir(parents=True, exist_ok=True)
-    nx.write_graphml(G, path)
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(_GRAPHML_HEADER)
+        if not nodes:
+            f.write('  <graph edgedefault="directed" />\n</graphml>\n')
+            return
+        if len(order):
+            f.write(_GRAPHML_KEYS)
+        f.write('  <graph edgedefault="directed">\n')
+        for sl in _chunks(len(nodes), chunk_size):
+            f.write("".join(f'    <node id="{n}" />\n' for n in nodes[sl]))
+        for sl in _chunks(len(order), chunk_size):
+            idx = order[sl]
+            rows = zip(
+                cols.src[idx].tolist(),
+                cols.dst[idx].tolist(),
+                keys[idx].tolist(),
+                cols.codes["type"][idx].tolist(),
+                cols.weight[idx].tolist(),
+                cols.codes["source"][idx].tolist(),
+                cols.codes["version"][idx].tolist(),
+            )
+            f.write(
+                "".join(
+                    f'    <edge source="{nodes[u]}" target="{nodes[v]}" id="{k}">\n'
+                    f'      <data key="d0">{values["type"][t]}</data>\n'
+                    f'      <data key="d1">{w}</data>\n'
+                    f'      <data key="d2">{values["source"][src]}</data>\n'
+                    f'      <data key="d3">{values["version"][ver]}</data>\n'
+                    "    </edge>\n"
+                    for u, v, k, t, w, src, ver in rows
+                )
+            )
+        f.write("  </graph>\n</graphml>\n")
+
+
+def _small_codes(codes: np.ndarray, n_values: int) -> np.ndarray:
+    return codes.astype(np.uint8 if n_values <= 256 else np.uint16 if n_values <= 65_536 else np.int32)
+
+
+@dataclass
+class CSRGraph:
+    node_ids: np.ndarray  # (N,) node ids
+    offsets: np.ndarray  # (N + 1,) int64; out-edges of node i are offsets[i]:offsets[i + 1]
+    indices: np.ndarray  # (E,) target node index
+    weights: np.ndarray  # (E,)
+    type_codes: np.ndarray  # (E,) index into types
+    source_codes: np.ndarray  # (E,) index into sources
+    version_codes: np.ndarray  # (E,) index into versions
+    types: List[str]
+    sources: List[str]
+    versions: List[str]
+    _lookup: Dict[str, int] | None = field(default=None, repr=False)
+
+    @property
+    def n_nodes(self) -> int:
+        return int(self.node_ids.shape[0])
 
+    @property
+    def n_edges(self) -> int:
+        return int(self.indices.shape[0])
+
+    @classmethod
+    def from_columns(cls, cols: EdgeColumns, node_ids: Sequence[str] | None = None, weight_dtype=np.float64) -> "CSRGraph":
+        """
+        Build CSR arrays from encoded edge columns (edges keep their input order per source).
+        """
+        nodes = np.asarray(cols.nodes if node_ids is None else node_ids, dtype=str)
+        order = np.argsort(cols.src, kind="stable")
+        counts = np.bincount(cols.src, minlength=nodes.shape[0])
+        index_dtype = np.int32 if nodes.shape[0] < 2**31 else np.int64
+        return cls(
+            node_ids=nodes,
+            offsets=np.concatenate([[0], np.cumsum(counts)]).astype(np.int64),
+            indices=cols.dst[order].astype(index_dtype),
+            weights=cols.weight[order].astype(weight_dtype),
+            type_codes=_small_codes(cols.codes["type"][order], len(cols.values["type"])),
+            source_codes=_small_codes(cols.codes["source"][order], len(cols.values["source"])),
+            version_codes=_small_codes(cols.codes["version"][order], len(cols.values["version"])),
+            types=list(cols.values["type"]),
+            sources=list(cols.values["source"]),
+            versions=list(cols.values["version"]),
+        )
+
+    @classmethod
+    def from_edges(cls, edges: EdgeInput, weight_dtype=np.float64) -> "CSRGraph":
+        return cls.from_columns(collect_edge_columns(edges), weight_dtype=weight_dtype)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, weight_dtype=np.float64) -> "CSRGraph":
+        """
+        Build from an edge CSV frame such as data_samples/spotify_edges.csv.
+        """
+        return cls.from_columns(edge_columns_from_frame(df), weight_dtype=weight_dtype)
+
+    @classmethod
+    def from_networkx(cls, G: nx.Graph, weight_dtype=np.float64) -> "CSRGraph":
+        """
+        Build from a graph with Edge attributes (as produced by edges_to_networkx), keeping isolated nodes.
+        """
+        nodes = [str(n) for n in G.nodes]
+        edges = (
+            Edge(
+                src=str(u),
+                dst=str(v),
+                type=d.get("type", "SIMILAR_TO"),
+                weight=d.get("weight", 1.0),
+                source=d.get("source", "unknown"),
+                version=d.get("version", "v1"),
+            )
+            for u, v, d in G.edges(data=True)
+        )
+        cols = collect_edge_columns(edges)
+        remap = {n: i for i, n in enumerate(nodes)}
+        codes = np.array([remap[n] for n in cols.nodes], dtype=np.int64)
+        cols.src = codes[cols.src] if len(cols) else cols.src
+        cols.dst = codes[cols.dst] if len(cols) else cols.dst
+        return cls.from_columns(cols, node_ids=nodes, weight_dtype=weight_dtype)
+
+    def node_index(self, node_id: str) -> int:
+        if self._lookup is None:
+            self._lookup = {n: i for i, n in enumerate(self.node_ids.tolist())}
+        return self._lookup[node_id]
+
+    def neighbors(self, node: str | int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Zero-copy (target indices, weights) slices for a node id or index.
+        """
+        i = self.node_index(node) if isinstance(node, str) else int(node)
+        lo, hi = int(self.offsets[i]), int(self.offsets[i + 1])
+        return self.indices[lo:hi], self.weights[lo:hi]
+
+    def edge_sources(self) -> np.ndarray:
+        """
+        Source node index of every edge (expanded from offsets).
+        """
+        return np.repeat(np.arange(self.n_nodes), np.diff(np.asarray(self.offsets)))
+
+    def to_edges(self) -> List[Edge]:
+        src = self.edge_sources()
+        return [
+            Edge(
+                src=self.node_ids[u],
+                dst=self.node_ids[v],
+                type=self.types[t],
+                weight=float(w),
+                source=self.sources[s],
+                version=self.versions[ver],
+            )
+            for u, v, w, t, s, ver in zip(
+                src.tolist(),
+                np.asarray(self.indices).tolist(),
+                np.asarray(self.weights).tolist(),
+                np.asarray(self.type_codes).tolist(),
+                np.asarray(self.source_codes).tolist(),
+                np.asarray(self.version_codes).tolist(),
+            )
+        ]
+
+    def to_networkx(self, directed: bool = True) -> nx.Graph:
+        G = nx.MultiDiGraph() if directed else nx.MultiGraph()
+        G.add_nodes_from(self.node_ids.tolist())
+        for e in self.to_edges():
+            G.add_edge(e.src, e.dst, type=e.type, weight=e.weight, source=e.source, version=e.version)
+        return G
+
+    def save(self, path: Path) -> None:
+        save_bundle(
+            path,
+            {
+                "node_ids": self.node_ids,
+                "offsets": self.offsets,
+                "indices": self.indices,
+                "weights": self.weights,
+                "type_codes": self.type_codes,
+                "source_codes": self.source_codes,
+                "version_codes": self.version_codes,
+            },
+            meta={"kind": "csr_graph", "types": self.types, "sources": self.sources, "versions": self.versions},
+        )
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "CSRGraph":
+        arrays, meta = load_bundle(path, mmap=mmap)
+        if meta.get("kind") != "csr_graph":
+            raise ValueError(f"{path} does not contain a CSR graph")
+        return cls(
+            types=list(meta["types"]),
+            sources=list(meta["sources"]),
+            versions=list(meta["versions"]),
+            **arrays,
+        )
+
+
+def export_csr(edges: EdgeInput, path: Path) -> CSRGraph:
+    """
+    Write the binary CSR graph format and return the in-memory graph.
+    """
+    graph = CSRGraph.from_edges(edges)
+    graph.save(path)
+    return graph
@@ -0,0 +1,146 @@
+"""
+Hybrid similarity fusion into a precomputed neighbour table.
+
+Blends several SIMILAR_TO sources (e.g. "embedding" kNN and "cooccurrence")
+offline: each source's weights are normalised to a common scale, scaled by a
+per-source weight, summed per (track, neighbour) pair and pruned to the top-k.
+The result is a fixed-width NeighborTable (int32 indices, float32 scores), so
+serving GET /tracks/{id}/neighbors is one row slice of a memory-mapped array.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Mapping, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from classically_punk.graph.knn import topk_per_group
+from classically_punk.graph.schema import EdgeArrays
+from classically_punk.storage import load_bundle, save_bundle
+
+
+@dataclass
+class NeighborTable:
+    ids: np.ndarray  # (N,) node ids
+    indices: np.ndarray  # (N, k) int32 neighbour rows, -1 where a node has fewer than k
+    scores: np.ndarray  # (N, k) float32 fused scores, 0 in padded slots
+    version: str = "v1"
+    _lookup: Dict[str, int] | None = field(default=None, repr=False)
+
+    @property
+    def k(self) -> int:
+        return int(self.indices.shape[1])
+
+    def row(self, track_id: str) -> int:
+        if self._lookup is None:
+            self._lookup = {n: i for i, n in enumerate(np.asarray(self.ids).tolist())}
+        return self._lookup[track_id]
+
+    def neighbors(self, track_id: str, top: int | None = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (neighbour rows, scores) for a track: a slice of the table, padding dropped.
+        """
+        i = self.row(track_id)
+        idx = self.indices[i, : top or self.k]
+        valid = int((np.asarray(idx) >= 0).sum())
+        return idx[:valid], self.scores[i, :valid]
+
+    def neighbor_ids(self, track_id: str, top: int | None = None) -> pd.DataFrame:
+        idx, scores = self.neighbors(track_id, top=top)
+        return pd.DataFrame({"id": np.asarray(self.ids)[idx], "score": scores})
+
+    def save(self, path: Path) -> None:
+        save_bundle(
+            path,
+            {"ids": self.ids, "indices": self.indices, "scores": self.scores},
+            meta={"kind": "neighbor_table", "version": self.version},
+        )
+
+    @classmethod
+    def load(cls, path: Path, mmap: bool = True) -> "NeighborTable":
+        arrays, meta = load_bundle(path, mmap=mmap)
+        if meta.get("kind") != "neighbor_table":
+            raise ValueError(f"{path} does not contain a neighbour table")
+        return cls(version=meta["version"], **arrays)
+
+
+def normalize_source_weights(src: np.ndarray, weights: np.ndarray, method: str = "minmax") -> np.ndarray:
+    """
+    Map one source's edge weights onto [0, 1].
+
+    minmax rescales globally; rank scores each edge 1 - r / n by its rank r among
+    the n edges of the same src, which ignores the source's weight scale entirely.
+    """
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.size == 0:
+        return weights
+    if method == "minmax":
+        lo, hi = float(weights.min()), float(weights.max())
+        return np.ones_like(weights) if hi == lo else (weights - lo) / (hi - lo)
+    if method == "rank":
+        codes, _ = pd.factorize(src)
+        order = topk_per_group(codes, weights, weights.shape[0])
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        lengths = np.diff(np.r_[starts, order.shape[0]])
+        rank = np.arange(order.shape[0]) - np.repeat(starts, lengths)
+        out = np.empty_like(weights)
+        out[order] = 1.0 - rank / np.repeat(lengths, lengths)
+        return out
+    if method == "none":
+        return weights
+    raise ValueError(f"Unknown normalization: {method}")
+
+
+def fuse_similarity(
+    sources: Sequence[EdgeArrays] | pd.DataFrame,
+    source_weights: Mapping[str, float],
+    k: int = 30,
+    normalization: str = "minmax",
+    version: str = "v1",
+) -> NeighborTable:
+    """
+    Blend SIMILAR_TO edges from several sources (selected by their `source` tag) into a NeighborTable.
+
+    A pair's fused score is sum_s source_weights[s] * normalised_weight_s; sources
+    missing from source_weights are ignored.
+    """
+    if isinstance(sources, pd.DataFrame):
+        frame = sources[sources["type"] == "SIMILAR_TO"] if "type" in sources.columns else sources
+    else:
+        similar = [s for s in sources if s.type == "SIMILAR_TO"]
+        frame = pd.concat([s.to_frame() for s in similar], ignore_index=True) if similar else pd.DataFrame()
+    if frame.empty:
+        raise ValueError("No SIMILAR_TO edges to fuse.")
+    frame = frame[frame["source"].isin(list(source_weights))]
+
+    parts = []
+    for name, grp in frame.groupby("source", sort=False):
+        norm = normalize_source_weights(grp["src"].to_numpy(), grp["weight"].to_numpy(), method=normalization)
+        parts.append((grp["src"].to_numpy(dtype=object), grp["dst"].to_numpy(dtype=object), norm * source_weights[name]))
+    if not parts:
+        raise ValueError("None of the requested sources are present in the edges.")
+
+    src = np.concatenate([p[0] for p in parts])
+    dst = np.concatenate([p[1] for p in parts])
+    weighted = np.concatenate([p[2] for p in parts])
+    codes, ids = pd.factorize(np.concatenate([src, dst]))
+    n = len(ids)
+    src_codes, dst_codes = codes[: src.shape[0]].astype(np.int64), codes[src.shape[0] :].astype(np.int64)
+
+    pair, inverse = np.unique(src_codes * n + dst_codes, return_inverse=True)
+    fused = np.bincount(inverse, weights=weighted)
+    pair_src, pair_dst = pair // n, pair % n
+    keep = topk_per_group(pair_src, fused, k)
+
+    rows = pair_src[keep]
+    starts = np.searchsorted(rows, np.arange(n))
+    slot = np.arange(keep.shape[0]) - starts[rows]
+    indices = np.full((n, k), -1, dtype=np.int32)
+    scores = np.zeros((n, k), dtype=np.float32)
+    indices[rows, slot] = pair_dst[keep]
+    scores[rows, slot] = fused[keep]
+    return NeighborTable(ids=np.asarray(ids, dtype=str), indices=indices, scores=scores, version=version)
@@ -0,0 +1,160 @@
+"""
+Incremental maintenance of cosine kNN (SIMILAR_TO) edges.
+
+When a batch of tracks is ingested, only two things change in an exact kNN
+graph: the new tracks need neighbour lists, and existing tracks whose k-th
+neighbour is now beaten by a new track must swap that neighbour out. Both are
+found from batch-sized similarity blocks (new x catalogue), so the work grows
+with the batch instead of requiring a catalogue-wide rebuild.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from classically_punk.graph.knn import block_rows_for_budget, cosine_knn_search, normalize_rows
+from classically_punk.graph.schema import Edge, EdgeArrays
+
+
+@dataclass
+class KnnDelta:
+    added: EdgeArrays
+    removed: EdgeArrays
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.removed)
+
+
+def _merge_topk(
+    idx_a: np.ndarray, sim_a: np.ndarray, idx_b: np.ndarray, sim_b: np.ndarray, k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    idx = np.hstack([idx_a, idx_b])
+    sims = np.hstack([sim_a, sim_b])
+    order = np.argsort(-sims, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(sims, order, axis=1)
+
+
+def _reverse_candidates(
+    X: np.ndarray,
+    B: np.ndarray,
+    thresholds: np.ndarray,
+    memory_budget_mb: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (existing row, new row, similarity) for every pair beating the row's current k-th similarity.
+    """
+    block = block_rows_for_budget(B.shape[0], memory_budget_mb)
+    rows: List[np.ndarray] = [np.empty(0, dtype=np.int64)]
+    cols: List[np.ndarray] = [np.empty(0, dtype=np.int64)]
+    sims: List[np.ndarray] = [np.empty(0, dtype=np.float32)]
+    for start in range(0, X.shape[0], block):
+        S = X[start : start + block] @ B.T
+        r, c = np.nonzero(S > thresholds[start : start + block, None])
+        rows.append(r + start)
+        cols.append(c)
+        sims.append(S[r, c])
+    return np.concatenate(rows), np.concatenate(cols), np.concatenate(sims)
+
+
+def update_knn_edges(
+    edges: EdgeArrays | Iterable[Edge],
+    embeddings: np.ndarray,
+    ids: Sequence[str],
+    new_embeddings: np.ndarray,
+    new_ids: Sequence[str],
+    k: int = 10,
+    version: str = "v2",
+    source: str | None = None,
+    memory_budget_mb: float = 512.0,
+    n_jobs: int | None = None,
+) -> KnnDelta:
+    """
+    Patch an exact cosine kNN edge set for a batch of new tracks.
+
+    edges must be the current SIMILAR_TO edges over (embeddings, ids), with cosine
+    similarity weights as produced by build_knn_edges. Returns only the edges to
+    add (new tracks' neighbour lists plus new tracks entering existing lists) and
+    the existing edges they displace, all tagged with `version`.
+    """
+    if not isinstance(edges, EdgeArrays):
+        edges = EdgeArrays.from_edges(edges)
+    if embeddings.shape[0] != len(ids) or new_embeddings.shape[0] != len(new_ids):
+        raise ValueError("embeddings and ids length mismatch")
+    source = source or edges.source
+
+    X = normalize_rows(embeddings)
+    B = normalize_rows(new_embeddings)
+    n_old = X.shape[0]
+    all_ids = np.concatenate([np.asarray(ids, dtype=object), np.asarray(new_ids, dtype=object)])
+
+    # 1. Neighbour lists for the new tracks: best of (new vs catalogue) and (new vs new).
+    old_idx, old_sim = cosine_knn_search(B, X, k=k, memory_budget_mb=memory_budget_mb, n_jobs=n_jobs, normalized=True)
+    new_idx, new_sim = cosine_knn_search(
+        B, B, k=k, memory_budget_mb=memory_budget_mb, n_jobs=n_jobs, exclude_self=True, normalized=True
+    )
+    nb_idx, nb_sim = _merge_topk(old_idx, old_sim, new_idx + n_old, new_sim, k)
+    fwd_src = np.repeat(np.arange(n_old, n_old + B.shape[0]), nb_idx.shape[1])
+
+    # 2. Reverse patches: existing rows where a new track beats the current k-th neighbour.
+    src_rows = pd.Index(np.asarray(ids, dtype=object)).get_indexer(edges.src)
+    if (src_rows < 0).any():
+        raise ValueError("edges reference ids missing from the existing embeddings")
+    counts = np.bincount(src_rows, minlength=n_old)
+    kth = np.full(n_old, np.inf)
+    np.minimum.at(kth, src_rows, edges.weight)
+    thresholds = np.where(counts < k, -np.inf, kth)
+    cand_rows, cand_new, cand_sims = _reverse_candidates(X, B, thresholds, memory_budget_mb)
+
+    affected = np.zeros(n_old, dtype=bool)
+    affected[cand_rows] = True
+    existing = affected[src_rows]
+    ranked = pd.DataFrame(
+        {
+            "src": np.concatenate([src_rows[existing], cand_rows]),
+            "dst": np.concatenate([edges.dst[existing], all_ids[cand_new + n_old]]),
+            "weight": np.concatenate([edges.weight[existing], cand_sims.astype(np.float64)]),
+            "is_new": np.concatenate([np.zeros(int(existing.sum()), dtype=bool), np.ones(cand_rows.shape[0], dtype=bool)]),
+        }
+    )
+    ranked = ranked.sort_values(["src", "weight"], ascending=[True, False], kind="stable")
+    kept = ranked.groupby("src", sort=False).cumcount().to_numpy() < k
+    added_rev = ranked[kept & ranked["is_new"].to_numpy()]
+    removed = ranked[~kept & ~ranked["is_new"].to_numpy()]
+
+    added = EdgeArrays(
+        src=np.concatenate([all_ids[fwd_src], all_ids[added_rev["src"].to_numpy()]]),
+        dst=np.concatenate([all_ids[nb_idx.ravel()], added_rev["dst"].to_numpy(dtype=object)]),
+        weight=np.concatenate([nb_sim.ravel().astype(np.float64), added_rev["weight"].to_numpy()]),
+        type="SIMILAR_TO",
+        source=source,
+        version=version,
+    )
+    removed_arrays = EdgeArrays(
+        src=all_ids[removed["src"].to_numpy()],
+        dst=removed["dst"].to_numpy(dtype=object),
+        weight=removed["weight"].to_numpy(),
+        type="SIMILAR_TO",
+        source=edges.source,
+        version=version,
+    )
+    return KnnDelta(added=added, removed=removed_arrays)
+
+
+def apply_knn_delta(edges: EdgeArrays, delta: KnnDelta) -> EdgeArrays:
+    """
+    Return the patched edge set (existing - removed + added) tagged with the delta's version.
+    """
+    removed_keys = pd.MultiIndex.from_arrays([delta.removed.src, delta.removed.dst])
+    keep = ~pd.MultiIndex.from_arrays([edges.src, edges.dst]).isin(removed_keys)
+    return EdgeArrays(
+        src=np.concatenate([edges.src[keep], delta.added.src]),
+        dst=np.concatenate([edges.dst[keep], delta.added.dst]),
+        weight=np.concatenate([edges.weight[keep], delta.added.weight]),
+        type=edges.type,
+        source=delta.added.source,
+        version=delta.added.version,
+    )
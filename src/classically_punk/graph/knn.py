@@ -0,0 +1,139 @@
+"""
+Blocked exact nearest-neighbour search.
+
+Cosine kNN over row-normalised float32 embeddings, computed one row block at a
+time with a BLAS matmul so peak memory is bounded by a configurable budget
+rather than by N x N. Blocks run on a thread pool (numpy releases the GIL in
+matmul and argpartition) and write straight into preallocated result arrays.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple
+
+import numpy as np
+
+# Bytes held per (query row, base column) while a block is processed:
+# float32 similarity + int64 argpartition output.
+_BYTES_PER_CELL = 4 + 8
+
+
+def normalize_rows(X: np.ndarray, dtype=np.float32) -> np.ndarray:
+    """
+    Return a row-normalised copy of X (zero rows stay zero).
+    """
+    X = np.asarray(X, dtype=dtype)
+    if X.ndim != 2:
+        raise ValueError("Expected a 2D array of embeddings.")
+    norms = np.linalg.norm(X, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return X / norms
+
+
+def block_rows_for_budget(n_base: int, memory_budget_mb: float, n_jobs: int = 1) -> int:
+    """
+    Number of query rows per block so that n_jobs concurrent blocks fit in the budget.
+    """
+    budget = memory_budget_mb * 1024 * 1024 / max(n_jobs, 1)
+    return max(1, int(budget // (max(n_base, 1) * _BYTES_PER_CELL)))
+
+
+def _topk_block(
+    queries: np.ndarray,
+    base: np.ndarray,
+    k: int,
+    row_offset: int | None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    sims = queries @ base.T
+    if row_offset is not None:
+        rows = np.arange(sims.shape[0])
+        sims[rows, rows + row_offset] = -np.inf
+    n = sims.shape[1]
+    part = np.argpartition(sims, n - k, axis=1)[:, n - k :]
+    part_sims = np.take_along_axis(sims, part, axis=1)
+    order = np.argsort(-part_sims, axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_sims, order, axis=1)
+
+
+def topk_per_group(groups: np.ndarray, scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the k highest scores within each group, ordered by group then descending score.
+    """
+    order = np.lexsort((-scores, groups))
+    sorted_groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    run_start = np.repeat(starts, np.diff(np.r_[starts, order.shape[0]]))
+    return order[np.arange(order.shape[0]) - run_start < k]
+
+
+def cosine_knn_search(
+    queries: np.ndarray,
+    base: np.ndarray,
+    k: int,
+    memory_budget_mb: float = 512.0,
+    n_jobs: int | None = None,
+    exclude_self: bool = False,
+    normalized: bool = False,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact top-k cosine neighbours of each query row among base rows.
+
+    Returns (indices, similarities) of shape (n_queries, k), sorted by descending
+    similarity. With exclude_self, queries must be the base itself and each row's
+    own index is never returned.
+    """
+    if not normalized:
+        queries = normalize_rows(queries)
+        base = queries if exclude_self else normalize_rows(base)
+    if queries.shape[1] != base.shape[1]:
+        raise ValueError("queries and base must have the same dimensionality")
+    if exclude_self and queries.shape[0] != base.shape[0]:
+        raise ValueError("exclude_self requires queries to be the base rows")
+
+    n_q, n_base = queries.shape[0], base.shape[0]
+    k = min(k, n_base - 1 if exclude_self else n_base)
+    indices = np.empty((n_q, max(k, 0)), dtype=np.int64)
+    sims = np.empty((n_q, max(k, 0)), dtype=np.float32)
+    if k <= 0 or n_q == 0:
+        return indices, sims
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    block = block_rows_for_budget(n_base, memory_budget_mb, n_jobs)
+    starts = range(0, n_q, block)
+
+    def run(start: int) -> None:
+        stop = min(start + block, n_q)
+        idx, sim = _topk_block(queries[start:stop], base, k, start if exclude_self else None)
+        indices[start:stop] = idx
+        sims[start:stop] = sim
+
+    if n_jobs == 1 or len(starts) == 1:
+        for start in starts:
+            run(start)
+    else:
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            list(pool.map(run, starts))
+    return indices, sims
+
+
+def exact_cosine_knn(
+    embeddings: np.ndarray,
+    k: int = 10,
+    memory_budget_mb: float = 512.0,
+    n_jobs: int | None = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact cosine kNN graph of embeddings against themselves, excluding self matches.
+    """
+    X = normalize_rows(embeddings)
+    return cosine_knn_search(
+        X,
+        X,
+        k=k,
+        memory_budget_mb=memory_budget_mb,
+        n_jobs=n_jobs,
+        exclude_self=True,
+        normalized=True,
+    )
@@ -14,6 +14,10 @@ import numpy as np
 import pandas as pd
 from sklearn.neighbors import NearestNeighbors
 
+from classically_punk.features.normalization import NormalizationStats
+from classically_punk.graph.aggregate import GenreAccumulator
+from classically_punk.graph.knn import exact_cosine_knn
+
 EdgeType = Literal[
     "SIMILAR_TO",
     "HAS_TAG",
@@ -38,6 +42,97 @@ class Edge:
     version: str = "v1"
 
 
+@dataclass
+class EdgeArrays:
+    """
+    Columnar edge batch: parallel src/dst/weight arrays sharing one type/source/version.
+    """
+
+    src: np.ndarray
+    dst: np.ndarray
+    weight: np.ndarray
+    type: EdgeType
+    source: str = "unknown"
+    version: str = "v1"
+
+    def __len__(self) -> int:
+        return int(self.weight.shape[0])
+
+    @classmethod
+    def from_edges(cls, edges: Iterable[Edge]) -> "EdgeArrays":
+        """
+        Pack Edge objects of a single type into columnar arrays (source/version from the first edge).
+        """
+        edges = list(edges)
+        if not edges:
+            raise ValueError("Cannot infer edge type from an empty edge list.")
+        if len({e.type for e in edges}) > 1:
+            raise ValueError("EdgeArrays holds a single edge type.")
+        first = edges[0]
+        return cls(
+            src=np.array([e.src for e in edges], dtype=object),
+            dst=np.array([e.dst for e in edges], dtype=object),
+            weight=np.array([e.weight for e in edges], dtype=np.float64),
+            type=first.type,
+            source=first.source,
+            version=first.version,
+        )
+
+    def to_edges(self) -> List[Edge]:
+        return [
+            Edge(src=s, dst=d, type=self.type, weight=float(w), source=self.source, version=self.version)
+            for s, d, w in zip(self.src.tolist(), self.dst.tolist(), self.weight.tolist())
+        ]
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Return the batch in the edge CSV schema: src,dst,type,weight,source,version.
+        """
+        return pd.DataFrame(
+            {
+                "src": self.src,
+                "dst": self.dst,
+                "type": self.type,
+                "weight": self.weight,
+                "source": self.source,
+                "version": self.version,
+            }
+        )
+
+
+def build_knn_edge_arrays(
+    embeddings: np.ndarray,
+    ids: Sequence[str],
+    k: int = 10,
+    source: str = "embedding",
+    version: str = "v1",
+    memory_budget_mb: float = 512.0,
+    n_jobs: int | None = None,
+    normalization: NormalizationStats | None = None,
+) -> EdgeArrays:
+    """
+    Build cosine SIMILAR_TO edges as columnar arrays using the blocked exact kNN engine.
+
+    normalization standardises the embedding columns (in feature_cols order) with shared
+    feature-store statistics before the search.
+    """
+    if embeddings.shape[0] != len(ids):
+        raise ValueError("embeddings and ids length mismatch")
+    if normalization is not None:
+        embeddings = normalization.transform(embeddings)
+
+    indices, sims = exact_cosine_knn(embeddings, k=k, memory_budget_mb=memory_budget_mb, n_jobs=n_jobs)
+    id_arr = np.asarray(ids, dtype=object)
+    return EdgeArrays(
+        src=np.repeat(id_arr, indices.shape[1]),
+        dst=id_arr[indices.ravel()],
+        weight=sims.ravel().astype(np.float64),
+        type="SIMILAR_TO",
+        source=source,
+        version=version,
+    )
+
+
 def build_knn_edges(
     embeddings: np.ndarray,
     ids: Sequence[str],
@@ -45,12 +140,37 @@ def build_knn_edges(
     metric: str = "cosine",
     source: str = "embedding",
     version: str = "v1",
+    engine: str = "auto",
+    memory_budget_mb: float = 512.0,
+    n_jobs: int | None = None,
+    normalization: NormalizationStats | None = None,
 ) -> List[Edge]:
     """
     Build SIMILAR_TO edges from embeddings using kNN.
+
+    engine="auto" uses the blocked exact engine for cosine and sklearn otherwise;
+    pass engine="sklearn" to force the NearestNeighbors path. normalization applies
+    shared feature-store statistics to the embeddings first.
     """
     if embeddings.shape[0] != len(ids):
         raise ValueError("embeddings and ids length mismatch")
+    if normalization is not None:
+        embeddings = normalization.transform(embeddings)
+    if engine not in {"auto", "blocked", "sklearn"}:
+        raise ValueError(f"Unknown kNN engine: {engine}")
+    if engine == "blocked" and metric != "cosine":
+        raise ValueError("The blocked kNN engine only supports metric='cosine'.")
+
+    if engine == "blocked" or (engine == "auto" and metric == "cosine"):
+        return build_knn_edge_arrays(
+            embeddings,
+            ids,
+            k=k,
+            source=source,
+            version=version,
+            memory_budget_mb=memory_budget_mb,
+            n_jobs=n_jobs,
+        ).to_edges()
 
     nn = NearestNeighbors(n_neighbors=min(k + 1, len(ids)), metric=metric)
     nn.fit(embeddings)
@@ -78,23 +198,12 @@ def build_knn_edges(
 def aggregate_genre_embeddings(df: pd.DataFrame, target_col: str = "label") -> Tuple[pd.DataFrame, np.ndarray, List[str]]:
     """
     Aggregate track-level features/embeddings to genre-level centroids and covariance traces.
+
+    For feature tables that do not fit in memory, feed chunks to GenreAccumulator instead.
     """
     feature_cols = [c for c in df.columns if c not in {target_col, "path"}]
     if not feature_cols:
         raise ValueError("No feature columns to aggregate.")
 
-    grouped = df.groupby(target_col)
-    records = []
-    ids = []
-    vectors = []
-    for genre, grp in grouped:
-        vecs = grp[feature_cols].to_numpy()
-        centroid = vecs.mean(axis=0)
-        cov_trace = float(np.trace(np.cov(vecs, rowvar=False))) if vecs.shape[0] > 1 else 0.0
-        records.append({"genre": genre, "cov_trace": cov_trace, **{f"feat_{i}": v for i, v in enumerate(centroid)}})
-        ids.append(f"genre::{genre}")
-        vectors.append(centroid)
-
-    agg_df = pd.DataFrame(records)
-    return agg_df, np.vstack(vectors), ids
-
+    acc = GenreAccumulator(feature_cols=feature_cols, target_col=target_col)
+    return acc.update(df).finalize()
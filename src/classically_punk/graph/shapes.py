@@ -2,13 +2,19 @@
 Shape generation for genre/track visual encodings.
 
 Provides utilities to turn audio features into glyphs and genre-level hulls for 3D
-visualizations. Export targets include JSON (for three.js/Plotly) and numpy arrays
-for plotting.
+visualizations. Export targets include JSON (for three.js/Plotly), numpy arrays
+for plotting, and a binary vertex buffer with a JSON header for typed-array loading.
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+import json
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Dict, Iterable, List, Sequence, Tuple
 
 import numpy as np
@@ -42,16 +48,8 @@ def radial_glyph_from_features(
     if vec.ndim != 1:
         raise ValueError("feature_vector must be 1D")
 
-    n = len(vec)
-    radii = vec / (np.max(np.abs(vec)) + 1e-8) * scale
-
-    angles = np.linspace(0, 2 * np.pi, n, endpoint=False)
-    vertices = []
-    for i, (r, theta) in enumerate(zip(radii, angles)):
-        z = float(vec[height_idx]) if height_idx is not None else 0.0
-        x = float(r * np.cos(theta))
-        y = float(r * np.sin(theta))
-        vertices.append((x, y, z))
+    batch = radial_glyphs_batch(vec[None, :], scale=scale, height_idx=height_idx, dtype=np.float64)
+    vertices = [tuple(float(c) for c in v) for v in batch[0]]
 
     return Glyph(
         id="glyph",
@@ -60,38 +58,271 @@ def radial_glyph_from_features(
     )
 
 
-def genre_hull(embeddings: np.ndarray) -> Dict[str, object]:
+def radial_glyphs_batch(
+    features: np.ndarray,
+    scale: float = 1.0,
+    height_idx: int | None = None,
+    dtype: np.dtype = np.float32,
+) -> np.ndarray:
+    """
+    Radial glyph vertices for every row of an (N, F) feature matrix as one (N, F, 3) array.
+
+    Same geometry as radial_glyph_from_features: spoke radii are each row normalised by its
+    max absolute value, and z is the row's height_idx feature (0 if not given).
+    """
+    X = np.asarray(features, dtype=np.float64)
+    if X.ndim != 2:
+        raise ValueError("features must be 2D (n_glyphs, n_features)")
+
+    n, f = X.shape
+    radii = X / (np.abs(X).max(axis=1, keepdims=True) + 1e-8) * scale
+    angles = np.linspace(0, 2 * np.pi, f, endpoint=False)
+    out = np.empty((n, f, 3), dtype=dtype)
+    out[..., 0] = radii * np.cos(angles)
+    out[..., 1] = radii * np.sin(angles)
+    out[..., 2] = X[:, [height_idx]] if height_idx is not None else 0.0
+    return out
+
+
+def export_glyph_buffer(
+    vertices: np.ndarray,
+    path: Path,
+    ids: Sequence[str] | None = None,
+    feature_names: Sequence[str] | None = None,
+) -> Dict[str, object]:
+    """
+    Write batch glyph vertices as a raw little-endian float32 buffer (path + ".bin") and a
+    JSON header (path + ".json") describing how to view it as a Float32Array.
+
+    Glyph i's vertices start at float offset i * n_features * 3. Returns the header.
+    """
+    verts = np.ascontiguousarray(vertices, dtype="<f4")
+    if verts.ndim != 3 or verts.shape[2] != 3:
+        raise ValueError("vertices must have shape (n_glyphs, n_features, 3)")
+    path = Path(path)
+    bin_path = path.with_name(path.name + ".bin")
+    header = {
+        "buffer": bin_path.name,
+        "dtype": "float32",
+        "little_endian": True,
+        "shape": list(verts.shape),
+        "byte_length": int(verts.nbytes),
+        "ids": [str(i) for i in ids] if ids is not None else None,
+        "feature_names": list(feature_names) if feature_names is not None else None,
+    }
+    bin_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = bin_path.with_name(bin_path.name + ".tmp")
+    verts.tofile(tmp)
+    os.replace(tmp, bin_path)
+    path.with_name(path.name + ".json").write_text(json.dumps(header))
+    return header
+
+
+def load_glyph_buffer(path: Path, mmap: bool = True) -> Tuple[np.ndarray, Dict[str, object]]:
+    """
+    Read a buffer written by export_glyph_buffer back as ((N, F, 3) float32 array, header).
+    """
+    path = Path(path)
+    header = json.loads(path.with_name(path.name + ".json").read_text())
+    bin_path = path.with_name(header["buffer"])
+    shape = tuple(header["shape"])
+    if mmap and header["byte_length"]:
+        verts = np.memmap(bin_path, dtype="<f4", mode="r", shape=shape)
+    else:
+        verts = np.fromfile(bin_path, dtype="<f4").reshape(shape)
+    return verts, header
+
+
+def simplify_hull_points(points: np.ndarray, max_faces: int) -> np.ndarray:
+    """
+    Farthest-point subset of hull vertices whose hull has at most ~max_faces triangles.
+
+    A hull over V points has at most 2V - 4 faces, so V = max_faces // 2 + 2 points are
+    kept, chosen greedily to be far from each other (which preserves the silhouette).
+    """
+    target = max(max_faces // 2 + 2, 4)
+    if points.shape[0] <= target:
+        return np.arange(points.shape[0])
+    first = int(np.argmax(((points - points.mean(axis=0)) ** 2).sum(axis=1)))
+    chosen = [first]
+    dist = ((points - points[first]) ** 2).sum(axis=1)
+    for _ in range(target - 1):
+        i = int(np.argmax(dist))
+        chosen.append(i)
+        dist = np.minimum(dist, ((points - points[i]) ** 2).sum(axis=1))
+    return np.sort(np.asarray(chosen))
+
+
+def genre_hull(embeddings: np.ndarray, max_faces: int | None = None) -> Dict[str, object]:
     """
     Compute a convex hull around 3D embeddings for a genre cluster.
+
+    Only hull vertices are returned; simplices index into them. With max_faces the hull is
+    rebuilt over a farthest-point subset of its vertices for level of detail, while volume
+    and area still describe the full hull.
     """
     if embeddings.shape[0] < 4 or embeddings.shape[1] != 3:
         raise ValueError("Need at least 4 points in 3D for a convex hull.")
     hull = ConvexHull(embeddings)
+    points = embeddings[hull.vertices]
+    if max_faces is not None and hull.simplices.shape[0] > max_faces:
+        points = points[simplify_hull_points(points, max_faces)]
+        lod = ConvexHull(points)
+        points, simplices = points[lod.vertices], lod.simplices
+        remap = np.empty(lod.points.shape[0], dtype=np.int64)
+        remap[lod.vertices] = np.arange(lod.vertices.shape[0])
+    else:
+        simplices = hull.simplices
+        remap = np.empty(embeddings.shape[0], dtype=np.int64)
+        remap[hull.vertices] = np.arange(hull.vertices.shape[0])
     return {
-        "vertices": embeddings.tolist(),
-        "simplices": hull.simplices.tolist(),
+        "vertices": points.tolist(),
+        "simplices": remap[simplices].tolist(),
         "volume": float(hull.volume),
         "area": float(hull.area),
+        "n_points": int(embeddings.shape[0]),
     }
 
 
-def build_genre_hulls(projection_df: pd.DataFrame, label_col: str = "label") -> Dict[str, Dict[str, object]]:
+def _hull_task(args: Tuple[str, np.ndarray, int | None]) -> Tuple[str, Dict[str, object] | None, str | None]:
+    label, coords, max_faces = args
+    try:
+        return label, genre_hull(coords, max_faces=max_faces), None
+    except Exception as exc:  # reported per label by HullService
+        message = str(exc).strip().splitlines()
+        return label, None, f"{type(exc).__name__}: {message[0] if message else ''}"
+
+
+def membership_digest(coords: np.ndarray, ids: Sequence[str] | None = None) -> str:
+    """
+    Order-independent hash of a label's members (ids if given) and their coordinates.
+    """
+    coords = np.ascontiguousarray(coords, dtype=np.float64)
+    if ids is not None:
+        ids = np.asarray(ids, dtype=str)
+        order = np.argsort(ids, kind="stable")
+        key = "\n".join(ids[order].tolist()).encode()
+    else:
+        order = np.lexsort(coords.T[::-1])
+        key = b""
+    digest = hashlib.sha1(key)
+    digest.update(np.ascontiguousarray(coords[order]).tobytes())
+    return digest.hexdigest()
+
+
+@dataclass
+class HullService:
+    """
+    Genre hulls computed across a worker pool and cached per label.
+
+    A cached hull is reused while the projection version, the label's membership digest
+    and max_faces are unchanged, so after an incremental projection update (same version,
+    new tracks appended) only the labels whose points changed are recomputed. Labels whose
+    hull cannot be built are listed in `failures` rather than dropped silently. The cache and
+    `failures` are keyed by str(label) so they survive a JSON save/load for non-string
+    labels; cached hulls of labels absent from the latest build are evicted.
+    """
+
+    max_faces: int | None = None
+    n_jobs: int | None = 1
+    cache: Dict[str, Dict[str, object]] = field(default_factory=dict)
+    failures: Dict[str, str] = field(default_factory=dict)
+    recomputed: List[str] = field(default_factory=list)
+
+    def build(
+        self,
+        projection_df: pd.DataFrame,
+        label_col: str = "label",
+        id_col: str | None = None,
+        projection_version: str = "v1",
+    ) -> Dict[str, Dict[str, object]]:
+        required = {"x", "y", "z", label_col}
+        if not required.issubset(projection_df.columns):
+            raise ValueError("Projection DataFrame must have x,y,z and label columns.")
+
+        self.failures = {}
+        self.recomputed = []
+        hulls: Dict[str, Dict[str, object]] = {}
+        jobs = []
+        digests = {}
+        groups = projection_df.groupby(label_col)
+        present = {str(label) for label in groups.groups}
+        for key in [key for key in self.cache if key not in present]:
+            del self.cache[key]
+        for label, grp in groups:
+            coords = grp[["x", "y", "z"]].to_numpy(dtype=np.float64)
+            ids = grp[id_col].to_numpy() if id_col is not None else None
+            digest = membership_digest(coords, ids)
+            entry = self.cache.get(str(label))
+            if (
+                entry is not None
+                and entry["projection_version"] == projection_version
+                and entry["digest"] == digest
+                and entry["max_faces"] == self.max_faces
+            ):
+                hulls[label] = entry["hull"]
+                continue
+            if coords.shape[0] < 4:
+                self.failures[str(label)] = f"ValueError: only {coords.shape[0]} points, need at least 4"
+                continue
+            digests[label] = digest
+            jobs.append((label, coords, self.max_faces))
+
+        if self.n_jobs == 1 or len(jobs) <= 1:
+            results = [_hull_task(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=self.n_jobs) as pool:
+                results = list(pool.map(_hull_task, jobs))
+
+        for label, hull, error in results:
+            if error is not None:
+                self.failures[str(label)] = error
+                self.cache.pop(str(label), None)
+                continue
+            self.cache[str(label)] = {
+                "projection_version": projection_version,
+                "digest": digests[label],
+                "max_faces": self.max_faces,
+                "hull": hull,
+            }
+            hulls[label] = hull
+            self.recomputed.append(label)
+        return {label: hulls[label] for label in sorted(hulls)}
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        cache = {str(label): entry for label, entry in self.cache.items()}
+        tmp.write_text(json.dumps({"max_faces": self.max_faces, "cache": cache}))
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, n_jobs: int | None = 1) -> "HullService":
+        payload = json.loads(Path(path).read_text())
+        return cls(max_faces=payload["max_faces"], n_jobs=n_jobs, cache=payload["cache"])
+
+
+def build_genre_hulls(
+    projection_df: pd.DataFrame,
+    label_col: str = "label",
+    max_faces: int | None = None,
+    n_jobs: int | None = 1,
+    strict: bool = False,
+) -> Dict[str, Dict[str, object]]:
     """
     Given a projection DataFrame with x,y,z and labels, build hulls per genre.
+
+    Labels whose hull fails (too few or degenerate points) are skipped with a warning,
+    or raise ValueError when strict=True.
     """
-    required = {"x", "y", "z", label_col}
-    if not required.issubset(projection_df.columns):
-        raise ValueError("Projection DataFrame must have x,y,z and label columns.")
-
-    hulls: Dict[str, Dict[str, object]] = {}
-    for label, grp in projection_df.groupby(label_col):
-        coords = grp[["x", "y", "z"]].to_numpy()
-        if coords.shape[0] < 4:
-            continue
-        try:
-            hulls[label] = genre_hull(coords)
-        except Exception:
-            continue
+    service = HullService(max_faces=max_faces, n_jobs=n_jobs)
+    hulls = service.build(projection_df, label_col=label_col)
+    if service.failures:
+        details = "; ".join(f"{label}: {err}" for label, err in sorted(service.failures.items()))
+        if strict:
+            raise ValueError(f"Hull construction failed for {len(service.failures)} label(s): {details}")
+        warnings.warn(f"Skipped {len(service.failures)} label(s) without a hull: {details}", stacklevel=2)
     return hulls
 
 
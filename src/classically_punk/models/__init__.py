@@ -1,3 +1,6 @@
 """Models and evaluation helpers."""
 
-from .baseline import evaluate_classifier, train_baseline_classifier  # noqa: F401
+from .baseline import evaluate_classifier, sweep_baseline_classifier, train_baseline_classifier  # noqa: F401
+from .inference import LinearPredictor, export_linear_classifier  # noqa: F401
+from .regression import evaluate_regression, fit_linear_regression  # noqa: F401
+from .streaming import evaluate_streaming, train_streaming_classifier  # noqa: F401
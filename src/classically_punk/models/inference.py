@@ -0,0 +1,203 @@
+"""
+Lightweight inference for linear genre classifiers.
+
+export_linear_classifier reduces a fitted scaler + linear model pipeline to
+plain weight arrays: the scaler's scale is folded into the weights
+(W' = W / scale) and its mean kept as a centring vector, so scoring is one
+subtraction and one matrix product per block with no sklearn validation on
+the request path. Centring before the product (rather than folding the mean
+into the bias) avoids float32 cancellation on features with large offsets.
+Weights are written as a versioned array bundle under
+root/<version>/weights.bundle, and LinearPredictor memory-maps them back,
+scoring feature matrices (including memmapped ones) block by block into a
+preallocated output.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from classically_punk.storage import load_bundle, save_bundle
+
+_VERSION_RE = re.compile(r"^[A-Za-z0-9_.-]+$")
+WEIGHTS_FILE = "weights.bundle"
+
+
+def _versions(root: Path) -> List[str]:
+    if not root.exists():
+        return []
+    found = [p.name for p in root.iterdir() if (p / WEIGHTS_FILE).exists()]
+    return sorted(found, key=lambda v: (int(v[1:]) if re.fullmatch(r"v\d+", v) else float("inf"), v))
+
+
+def _link(model, n_classes: int) -> str:
+    if not hasattr(model, "predict_proba"):
+        return "none"
+    if n_classes == 2:
+        return "binary"
+    # lbfgs logistic regression is multinomial; SGD's log loss is one-vs-rest.
+    return "ovr" if type(model).__name__ == "SGDClassifier" else "softmax"
+
+
+def export_linear_classifier(
+    clf,
+    root: Path,
+    version: str | None = None,
+    feature_cols: Sequence[str] | None = None,
+    dtype=np.float32,
+) -> Path:
+    """
+    Write a fitted Pipeline(StandardScaler, linear classifier) as plain weights; returns the bundle path.
+
+    The final step may be any sklearn linear classifier (coef_, intercept_, classes_).
+    feature_cols defaults to the columns the pipeline was fitted on. version defaults to the
+    next "vN" under root.
+    """
+    root = Path(root)
+    steps = list(clf.named_steps.values()) if hasattr(clf, "named_steps") else [clf]
+    model = steps[-1]
+    scaler = steps[0] if len(steps) > 1 else None
+    if not hasattr(model, "coef_"):
+        raise ValueError("Only fitted linear classifiers (with coef_) can be exported.")
+    if feature_cols is None:
+        feature_cols = getattr(scaler, "feature_cols_", None)
+    if feature_cols is None:
+        feature_cols = getattr(clf, "feature_names_in_", None)
+    if feature_cols is None:
+        raise ValueError("feature_cols is required when the pipeline was fitted without column names.")
+
+    coef = np.asarray(model.coef_, dtype=np.float64)
+    intercept = np.asarray(model.intercept_, dtype=np.float64)
+    center = np.zeros(coef.shape[1])
+    if scaler is not None:
+        # StandardScaler(with_mean=False) still stores mean_ but never subtracts it.
+        if getattr(scaler, "with_mean", True) and getattr(scaler, "mean_", None) is not None:
+            center = np.asarray(scaler.mean_, dtype=np.float64)
+        if getattr(scaler, "with_std", True) and getattr(scaler, "scale_", None) is not None:
+            coef = coef / np.asarray(scaler.scale_, dtype=np.float64)
+    classes = np.asarray(model.classes_).astype(str)
+
+    if version is None:
+        numbered = [int(v[1:]) for v in _versions(root) if re.fullmatch(r"v\d+", v)]
+        version = f"v{max(numbered, default=0) + 1}"
+    if not _VERSION_RE.match(version):
+        raise ValueError(f"Invalid model version: {version!r}")
+    path = root / version / WEIGHTS_FILE
+    save_bundle(
+        path,
+        {
+            "weights": np.ascontiguousarray(coef.T, dtype=dtype),  # (n_features, n_outputs)
+            "bias": intercept.astype(dtype),
+            "center": center,
+            "classes": classes,
+        },
+        meta={
+            "kind": "linear_classifier",
+            "version": version,
+            "created_at": time.time(),
+            "model": type(model).__name__,
+            "link": _link(model, len(classes)),
+            "feature_cols": [str(c) for c in feature_cols],
+        },
+    )
+    return path
+
+
+@dataclass
+class LinearPredictor:
+    weights: np.ndarray  # (n_features, n_outputs); n_outputs = 1 for binary models
+    bias: np.ndarray
+    center: np.ndarray  # float64 feature means, subtracted before the product
+    classes: np.ndarray
+    feature_cols: List[str]
+    link: str = "softmax"
+    version: str = "v1"
+    block_size: int = 65_536
+
+    @classmethod
+    def load(cls, root: Path, version: str | None = None, mmap: bool = True) -> "LinearPredictor":
+        """
+        Open root/<version>/weights.bundle (latest numbered version by default) or a bundle path.
+        """
+        path = Path(root)
+        if not path.is_file():
+            versions = _versions(path)
+            if version is None:
+                if not versions:
+                    raise FileNotFoundError(f"No exported models under {path}")
+                version = versions[-1]
+            path = path / version / WEIGHTS_FILE
+        arrays, meta = load_bundle(path, mmap=mmap)
+        if meta.get("kind") != "linear_classifier":
+            raise ValueError(f"{path} does not contain linear classifier weights")
+        return cls(
+            weights=arrays["weights"],
+            bias=np.asarray(arrays["bias"]),
+            center=np.asarray(arrays["center"]),
+            classes=np.asarray(arrays["classes"]),
+            feature_cols=list(meta["feature_cols"]),
+            link=meta["link"],
+            version=meta["version"],
+        )
+
+    def _matrix(self, X) -> np.ndarray:
+        if isinstance(X, pd.DataFrame):
+            X = X[self.feature_cols].to_numpy(dtype=np.float64)
+        X = np.asarray(X) if not isinstance(X, np.ndarray) else X
+        if X.ndim == 1:
+            X = X[None, :]
+        if X.shape[1] != self.weights.shape[0]:
+            raise ValueError(f"Expected {self.weights.shape[0]} features, got {X.shape[1]}.")
+        return X
+
+    def decision_function(self, X) -> np.ndarray:
+        """
+        Raw scores (n, n_outputs), computed block by block so memmapped inputs stream through.
+        """
+        X = self._matrix(X)
+        out = np.empty((X.shape[0], self.weights.shape[1]), dtype=self.weights.dtype)
+        for start in range(0, X.shape[0], self.block_size):
+            block = np.asarray(X[start : start + self.block_size])
+            if block.dtype != np.float64:
+                block = block.astype(self.weights.dtype, copy=False)
+            # Centre in the input's precision, then run the product in the weights' dtype.
+            block = np.subtract(block, self.center, dtype=block.dtype).astype(self.weights.dtype, copy=False)
+            np.matmul(block, self.weights, out=out[start : start + block.shape[0]])
+            out[start : start + block.shape[0]] += self.bias
+        return out
+
+    def predict_proba(self, X) -> np.ndarray:
+        if self.link == "none":
+            raise ValueError("This model does not produce probabilities.")
+        scores = self.decision_function(X)
+        if self.link == "binary":
+            p = 1.0 / (1.0 + np.exp(-scores[:, 0]))
+            return np.stack([1.0 - p, p], axis=1)
+        if self.link == "ovr":
+            p = 1.0 / (1.0 + np.exp(-scores))
+            return p / np.maximum(p.sum(axis=1, keepdims=True), np.finfo(p.dtype).tiny)
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def predict(self, X) -> np.ndarray:
+        scores = self.decision_function(X)
+        if scores.shape[1] == 1:
+            return self.classes[(scores[:, 0] > 0).astype(np.int64)]
+        return self.classes[scores.argmax(axis=1)]
+
+    def info(self) -> Dict[str, object]:
+        return {
+            "version": self.version,
+            "link": self.link,
+            "n_features": int(self.weights.shape[0]),
+            "classes": self.classes.tolist(),
+        }
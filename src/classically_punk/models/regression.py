@@ -0,0 +1,308 @@
+"""
+Out-of-core multivariable linear regression on the feature store.
+
+RegressionAccumulator keeps the sufficient statistics of a least-squares fit
+(row count, feature/target means and the centred cross-product blocks XᵀX,
+Xᵀy, yᵀy) and folds in feature chunks one at a time with the pairwise update
+of Chan et al., like GenreAccumulator. Workers can each accumulate a shard and
+the parent merges the partials, so a fit costs a single read of the data.
+
+Coefficients are solved in closed form from the statistics (Cholesky, with a
+least-squares fallback for rank-deficient systems); every ridge penalty reuses
+the same statistics. Hold-out rows, chosen by hashing track ids as in the
+streaming classifier, get their own accumulator, which scores each candidate
+model exactly without another pass.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import linalg
+
+from classically_punk.features.store import META_COLUMNS, feature_columns, iter_feature_chunks
+from classically_punk.models.streaming import holdout_mask
+
+
+class RegressionAccumulator:
+    def __init__(self, feature_cols: Sequence[str] | None = None, target_cols: Sequence[str] = ("target",)):
+        self.feature_cols: List[str] | None = list(feature_cols) if feature_cols is not None else None
+        self.target_cols = list(target_cols)
+        self.count = 0
+        self.mean_x = np.zeros(0)
+        self.mean_y = np.zeros(len(self.target_cols))
+        self.xx = np.zeros((0, 0))  # centred XᵀX
+        self.xy = np.zeros((0, len(self.target_cols)))  # centred Xᵀy
+        self.yy = np.zeros((len(self.target_cols), len(self.target_cols)))  # centred yᵀy
+
+    def _combine(self, n_b: int, mean_x, mean_y, xx, xy, yy) -> None:
+        if self.count == 0:
+            self.count, self.mean_x, self.mean_y, self.xx, self.xy, self.yy = n_b, mean_x, mean_y, xx, xy, yy
+            return
+        n_a = float(self.count)
+        n = n_a + n_b
+        w = n_a * n_b / n
+        dx = mean_x - self.mean_x
+        dy = mean_y - self.mean_y
+        self.xx = self.xx + xx + w * np.outer(dx, dx)
+        self.xy = self.xy + xy + w * np.outer(dx, dy)
+        self.yy = self.yy + yy + w * np.outer(dy, dy)
+        self.mean_x = self.mean_x + dx * (n_b / n)
+        self.mean_y = self.mean_y + dy * (n_b / n)
+        self.count += n_b
+
+    def update_arrays(self, X: np.ndarray, y: np.ndarray) -> "RegressionAccumulator":
+        """
+        Fold a feature block (n, p) and target block (n,) or (n, k) into the statistics.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64).reshape(X.shape[0], -1)
+        keep = np.isfinite(X).all(axis=1) & np.isfinite(y).all(axis=1)
+        X, y = X[keep], y[keep]
+        if X.shape[0] == 0:
+            return self
+        mean_x, mean_y = X.mean(axis=0), y.mean(axis=0)
+        dx, dy = X - mean_x, y - mean_y
+        self._combine(X.shape[0], mean_x, mean_y, dx.T @ dx, dx.T @ dy, dy.T @ dy)
+        return self
+
+    def update(self, chunk: pd.DataFrame) -> "RegressionAccumulator":
+        """
+        Fold a DataFrame chunk (feature columns + target columns) into the statistics.
+        """
+        if self.feature_cols is None:
+            self.feature_cols = feature_columns(chunk, exclude=set(META_COLUMNS) | set(self.target_cols))
+            if not self.feature_cols:
+                raise ValueError("No feature columns to regress on.")
+        return self.update_arrays(chunk[self.feature_cols].to_numpy(dtype=np.float64), chunk[self.target_cols].to_numpy(dtype=np.float64))
+
+    def merge(self, other: "RegressionAccumulator") -> "RegressionAccumulator":
+        """
+        Merge a partial accumulator (e.g. from a worker process) into this one.
+        """
+        if other.count == 0:
+            return self
+        if self.feature_cols is None:
+            self.feature_cols = other.feature_cols
+        if list(other.feature_cols or []) != list(self.feature_cols or []) or other.target_cols != self.target_cols:
+            raise ValueError("Cannot merge accumulators over different columns.")
+        self._combine(other.count, other.mean_x, other.mean_y, other.xx, other.xy, other.yy)
+        return self
+
+    def solve(self, alpha: float = 0.0) -> "LinearRegressionModel":
+        """
+        Closed-form (ridge) solution; the intercept is not penalised.
+        """
+        if self.count == 0:
+            raise ValueError("No rows were accumulated.")
+        system = self.xx + alpha * np.eye(self.xx.shape[0])
+        try:
+            coef = linalg.cho_solve(linalg.cho_factor(system, lower=True, check_finite=False), self.xy, check_finite=False)
+        except linalg.LinAlgError:
+            # Collinear features without enough penalty: minimum-norm least squares.
+            coef = linalg.lstsq(system, self.xy, check_finite=False)[0]
+        intercept = self.mean_y - self.mean_x @ coef
+        return LinearRegressionModel(coef, intercept, list(self.feature_cols or []), self.target_cols, float(alpha))
+
+    def solve_path(self, alphas: Sequence[float]) -> List["LinearRegressionModel"]:
+        """
+        Solutions for many penalties from one eigendecomposition of the centred XᵀX.
+        """
+        if self.count == 0:
+            raise ValueError("No rows were accumulated.")
+        w, V = linalg.eigh(self.xx, check_finite=False)
+        w = np.clip(w, 0.0, None)
+        proj = V.T @ self.xy
+        tol = w.max(initial=0.0) * max(self.xx.shape) * np.finfo(np.float64).eps
+        models = []
+        for alpha in alphas:
+            d = w + alpha
+            inv = np.divide(1.0, d, out=np.zeros_like(d), where=d > tol)
+            coef = V @ (inv[:, None] * proj)
+            intercept = self.mean_y - self.mean_x @ coef
+            models.append(LinearRegressionModel(coef, intercept, list(self.feature_cols or []), self.target_cols, float(alpha)))
+        return models
+
+    def sse(self, model: "LinearRegressionModel") -> np.ndarray:
+        """
+        Exact per-target sum of squared residuals of model over the accumulated rows.
+        """
+        coef = model.coef
+        offset = self.mean_y - model.intercept - self.mean_x @ coef
+        quad = np.diag(self.yy) - 2 * np.einsum("pk,pk->k", coef, self.xy) + np.einsum("pk,pq,qk->k", coef, self.xx, coef)
+        return np.maximum(quad, 0.0) + self.count * offset**2
+
+    def score(self, model: "LinearRegressionModel") -> Dict[str, np.ndarray]:
+        """
+        R² and RMSE per target over the accumulated rows.
+        """
+        sse = self.sse(model)
+        sst = np.diag(self.yy)
+        r2 = np.where(sst > 0, 1.0 - sse / np.where(sst > 0, sst, 1.0), 0.0)
+        return {"r2": r2, "rmse": np.sqrt(sse / max(self.count, 1))}
+
+
+@dataclass
+class LinearRegressionModel:
+    coef: np.ndarray  # (n_features, n_targets)
+    intercept: np.ndarray  # (n_targets,)
+    feature_cols: List[str]
+    target_cols: List[str]
+    alpha: float = 0.0
+
+    def predict(self, X) -> np.ndarray:
+        """
+        Predictions for a feature DataFrame (columns selected by name) or array; 1-D for one target.
+        """
+        if isinstance(X, pd.DataFrame):
+            X = X[self.feature_cols]
+        pred = np.asarray(X, dtype=np.float64) @ self.coef + self.intercept
+        return pred[:, 0] if pred.shape[1] == 1 else pred
+
+
+class RegressionMetrics:
+    """
+    Streaming R², RMSE and MAE per target from (y_true, y_pred) blocks.
+    """
+
+    def __init__(self, n_targets: int = 1):
+        self.count = 0
+        self.sse = np.zeros(n_targets)
+        self.sae = np.zeros(n_targets)
+        self.mean = np.zeros(n_targets)
+        self.m2 = np.zeros(n_targets)
+
+    def update(self, y_true, y_pred) -> "RegressionMetrics":
+        y_true = np.asarray(y_true, dtype=np.float64).reshape(len(y_true), -1)
+        err = y_true - np.asarray(y_pred, dtype=np.float64).reshape(y_true.shape)
+        n_b = y_true.shape[0]
+        if n_b == 0:
+            return self
+        self.sse += (err**2).sum(axis=0)
+        self.sae += np.abs(err).sum(axis=0)
+        mean_b = y_true.mean(axis=0)
+        m2_b = ((y_true - mean_b) ** 2).sum(axis=0)
+        n = self.count + n_b
+        delta = mean_b - self.mean
+        self.m2 += m2_b + delta**2 * (self.count * n_b / n)
+        self.mean += delta * (n_b / n)
+        self.count = n
+        return self
+
+    def summary(self) -> Dict[str, np.ndarray]:
+        n = max(self.count, 1)
+        r2 = np.where(self.m2 > 0, 1.0 - self.sse / np.where(self.m2 > 0, self.m2, 1.0), 0.0)
+        return {"r2": r2, "rmse": np.sqrt(self.sse / n), "mae": self.sae / n, "n_samples": self.count}
+
+
+def accumulate_regression_chunks(
+    chunks: Iterable[pd.DataFrame],
+    target_cols: Sequence[str],
+    feature_cols: Sequence[str] | None = None,
+    id_col: str = "track_id",
+    test_size: float = 0.0,
+) -> Tuple[RegressionAccumulator, RegressionAccumulator]:
+    """
+    One pass over chunks into (train, hold-out) accumulators; hold-out rows are picked by id hash.
+    """
+    train = RegressionAccumulator(feature_cols, target_cols)
+    holdout = RegressionAccumulator(feature_cols, target_cols)
+    for chunk in chunks:
+        if train.feature_cols is None:
+            train.feature_cols = feature_columns(chunk, exclude=set(META_COLUMNS) | set(target_cols) | {id_col})
+            holdout.feature_cols = train.feature_cols
+        if test_size > 0:
+            ids = chunk[id_col] if id_col in chunk.columns else chunk.index
+            held = holdout_mask(ids.to_numpy(), test_size)
+            holdout.update(chunk[held])
+            chunk = chunk[~held]
+        train.update(chunk)
+    return train, holdout
+
+
+def _accumulate_shard(args) -> Tuple[RegressionAccumulator, RegressionAccumulator]:
+    path, target_cols, feature_cols, id_col, test_size, chunksize = args
+    return accumulate_regression_chunks(
+        iter_feature_chunks(path, chunksize=chunksize), target_cols, feature_cols, id_col=id_col, test_size=test_size
+    )
+
+
+def fit_linear_regression(
+    paths: Path | Sequence[Path],
+    target_cols: str | Sequence[str],
+    feature_cols: Sequence[str] | None = None,
+    alphas: Sequence[float] = (0.0,),
+    id_col: str = "track_id",
+    test_size: float = 0.2,
+    chunksize: int = 100_000,
+    n_jobs: int | None = None,
+) -> Tuple[LinearRegressionModel, pd.DataFrame]:
+    """
+    Fit linear regression over feature store shard(s) in one read and pick the penalty on the hold-out.
+
+    Returns the best model (highest mean hold-out R², or training R² when test_size=0) and a
+    table with one row per alpha: train/hold-out R² and RMSE averaged over targets.
+    """
+    paths = [Path(paths)] if isinstance(paths, (str, Path)) else [Path(p) for p in paths]
+    target_cols = [target_cols] if isinstance(target_cols, str) else list(target_cols)
+    if feature_cols is None:
+        # Shards must agree on columns; fix them from a full first chunk, since dtypes inferred
+        # from a single row misread text columns that happen to be empty there.
+        first = next(iter_feature_chunks(paths[0], chunksize=chunksize), None)
+        if first is None:
+            raise ValueError(f"No rows in {paths[0]} to infer feature columns from.")
+        feature_cols = feature_columns(first, exclude=set(META_COLUMNS) | set(target_cols) | {id_col})
+    jobs = [(p, target_cols, feature_cols, id_col, test_size, chunksize) for p in paths]
+    if n_jobs == 1 or len(jobs) <= 1:
+        partials = [_accumulate_shard(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            partials = list(pool.map(_accumulate_shard, jobs))
+
+    train = RegressionAccumulator(feature_cols, target_cols)
+    holdout = RegressionAccumulator(feature_cols, target_cols)
+    for part_train, part_holdout in partials:
+        train.merge(part_train)
+        holdout.merge(part_holdout)
+
+    models = train.solve_path(alphas) if len(alphas) > 1 else [train.solve(alphas[0])]
+    rows = []
+    for model in models:
+        row = {"alpha": model.alpha}
+        for name, acc in (("train", train), ("holdout", holdout)):
+            if acc.count:
+                scores = acc.score(model)
+                row[f"{name}_r2"] = float(scores["r2"].mean())
+                row[f"{name}_rmse"] = float(scores["rmse"].mean())
+        rows.append(row)
+    results = pd.DataFrame(rows)
+    key = "holdout_r2" if holdout.count else "train_r2"
+    best = int(results[key].to_numpy().argmax())
+    results["n_train"] = train.count
+    results["n_holdout"] = holdout.count
+    return models[best], results.sort_values(key, ascending=False, kind="stable").reset_index(drop=True)
+
+
+def evaluate_regression(
+    model: LinearRegressionModel,
+    chunks: Iterable[pd.DataFrame],
+    id_col: str = "track_id",
+    test_size: float | None = 0.2,
+) -> Dict[str, np.ndarray]:
+    """
+    Streaming R²/RMSE/MAE of model over chunks (hold-out rows only unless test_size is None).
+    """
+    metrics = RegressionMetrics(len(model.target_cols))
+    for chunk in chunks:
+        if test_size is not None:
+            ids = chunk[id_col] if id_col in chunk.columns else chunk.index
+            chunk = chunk[holdout_mask(ids.to_numpy(), test_size)]
+        chunk = chunk.dropna(subset=list(model.feature_cols) + list(model.target_cols))
+        if len(chunk):
+            metrics.update(chunk[model.target_cols].to_numpy(), model.predict(chunk))
+    return metrics.summary()
@@ -0,0 +1,205 @@
+"""
+Out-of-core training for the genre classifier.
+
+Streams the feature store chunk by chunk instead of loading it: a first pass
+accumulates StandardScaler statistics and the class set, then each epoch feeds
+scaled chunks to SGDClassifier(loss="log_loss").partial_fit. The hold-out set
+is chosen by hashing track ids, so it is stable across chunks, epochs and new
+batches of tracks without keeping an index in memory, and hold-out metrics are
+accumulated in a confusion matrix. Memory is bounded by the chunk size.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, List, Sequence
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from classically_punk.features.store import META_COLUMNS, feature_columns, iter_feature_chunks
+
+ChunkSource = Path | str | Callable[[], Iterable[pd.DataFrame]]
+
+_HASH_KEY = "classically_punk"  # pandas needs a 16-byte key
+_HASH_BUCKETS = 10_000
+
+
+def holdout_mask(ids: Sequence, test_size: float = 0.2) -> np.ndarray:
+    """
+    Deterministic hold-out membership from a hash of each id (True = hold-out).
+    """
+    hashed = pd.util.hash_array(np.asarray(ids, dtype=object).astype(str), hash_key=_HASH_KEY)
+    return (hashed % _HASH_BUCKETS) < int(round(test_size * _HASH_BUCKETS))
+
+
+def _chunks(source: ChunkSource, chunksize: int) -> Iterable[pd.DataFrame]:
+    if callable(source):
+        return source()
+    return iter_feature_chunks(Path(source), chunksize=chunksize)
+
+
+@dataclass
+class StreamingMetrics:
+    classes: np.ndarray
+    matrix: np.ndarray = field(default=None)  # rows = true class, columns = predicted class
+    n_unknown: int = 0  # rows skipped because a label is not in classes
+
+    def __post_init__(self):
+        self.classes = np.sort(np.asarray(self.classes))
+        if self.matrix is None:
+            self.matrix = np.zeros((len(self.classes), len(self.classes)), dtype=np.int64)
+
+    def _codes(self, labels: Iterable) -> tuple[np.ndarray, np.ndarray]:
+        labels = np.asarray(labels)
+        idx = np.minimum(np.searchsorted(self.classes, labels), len(self.classes) - 1)
+        return idx, self.classes[idx] == labels
+
+    def update(self, y_true: Iterable, y_pred: Iterable) -> None:
+        """
+        Count (true, predicted) pairs; rows with a label outside classes are skipped and tallied in n_unknown.
+        """
+        true_idx, true_known = self._codes(y_true)
+        pred_idx, pred_known = self._codes(y_pred)
+        known = true_known & pred_known
+        self.n_unknown += int((~known).sum())
+        k = len(self.classes)
+        self.matrix += np.bincount(true_idx[known] * k + pred_idx[known], minlength=k * k).reshape(k, k)
+
+    def summary(self) -> dict:
+        """
+        Same keys as evaluate_classifier, computed from the accumulated confusion matrix.
+        """
+        m = self.matrix
+        tp = np.diag(m).astype(np.float64)
+        support = m.sum(axis=1)
+        predicted = m.sum(axis=0)
+        precision = np.divide(tp, predicted, out=np.zeros_like(tp), where=predicted > 0)
+        recall = np.divide(tp, support, out=np.zeros_like(tp), where=support > 0)
+        denom = precision + recall
+        f1 = np.divide(2 * precision * recall, denom, out=np.zeros_like(tp), where=denom > 0)
+        # Like sklearn's f1_score, only labels present in y_true or y_pred count towards the macro mean.
+        present = (support + predicted) > 0
+        total = int(m.sum())
+        report = pd.DataFrame(
+            {"precision": precision, "recall": recall, "f1-score": f1, "support": support},
+            index=pd.Index(self.classes.astype(str), name="label"),
+        )
+        return {
+            "accuracy": float(tp.sum() / total) if total else 0.0,
+            "f1_macro": float(f1[present].mean()) if present.any() else 0.0,
+            "report": report.to_string(float_format=lambda v: f"{v:.2f}"),
+            "confusion": pd.DataFrame(m, index=self.classes, columns=self.classes),
+            "n_samples": total,
+            "n_unknown": self.n_unknown,
+        }
+
+
+def _prepare(chunk: pd.DataFrame, cols: List[str], target_col: str, id_col: str, test_size: float):
+    chunk = chunk[chunk[target_col].notna()]
+    ids = chunk[id_col] if id_col in chunk.columns else chunk.index
+    held = holdout_mask(ids.to_numpy(), test_size)
+    X = chunk[cols].to_numpy(dtype=np.float64)
+    y = chunk[target_col].astype(str).to_numpy()
+    return X, y, held
+
+
+def evaluate_streaming(
+    clf: Pipeline,
+    source: ChunkSource,
+    target_col: str = "label",
+    id_col: str = "track_id",
+    test_size: float = 0.2,
+    chunksize: int = 100_000,
+    holdout_only: bool = True,
+) -> dict:
+    """
+    Hold-out metrics of a fitted pipeline accumulated over the chunk stream.
+    """
+    cols = list(clf.named_steps["scale"].feature_cols_)
+    metrics = StreamingMetrics(np.asarray(clf.classes_).astype(str))
+    for chunk in _chunks(source, chunksize):
+        X, y, held = _prepare(chunk, cols, target_col, id_col, test_size)
+        if holdout_only:
+            X, y = X[held], y[held]
+        if len(y):
+            metrics.update(y, clf.predict(X))
+    return metrics.summary()
+
+
+def train_streaming_classifier(
+    source: ChunkSource,
+    target_col: str = "label",
+    id_col: str = "track_id",
+    test_size: float = 0.2,
+    epochs: int = 5,
+    chunksize: int = 100_000,
+    alpha: float = 1e-4,
+    model: Pipeline | None = None,
+    random_state: int = 42,
+):
+    """
+    Train a scaled linear classifier (logistic loss) over a chunked feature source.
+
+    source is a feature store CSV path or a zero-argument callable returning a fresh
+    iterable of DataFrame chunks (it is iterated once per epoch plus two extra passes).
+    Pass a previously returned model to continue training on a new batch of tracks:
+    its scaler statistics and weights are updated rather than refit; the batch may
+    not introduce new labels.
+
+    Returns the fitted pipeline and a metrics dict with the evaluate_classifier keys,
+    the hold-out confusion matrix and per-epoch hold-out accuracy ("history").
+    """
+    if model is not None:
+        scaler: StandardScaler = model.named_steps["scale"]
+        sgd: SGDClassifier = model.named_steps["sgd"]
+        cols = list(scaler.feature_cols_)
+        classes = np.asarray(sgd.classes_)
+    else:
+        scaler = StandardScaler()
+        sgd = SGDClassifier(loss="log_loss", alpha=alpha, random_state=random_state)
+        cols, classes = None, None
+
+    # Pass 1: scaler statistics and label set over the training rows.
+    seen: set = set()
+    for chunk in _chunks(source, chunksize):
+        if cols is None:
+            cols = feature_columns(chunk, exclude=set(META_COLUMNS) | {target_col, id_col})
+        X, y, held = _prepare(chunk, cols, target_col, id_col, test_size)
+        if (~held).any():
+            scaler.partial_fit(X[~held])
+        seen.update(np.unique(y).tolist())
+    if cols is None or not hasattr(scaler, "mean_"):
+        raise ValueError("No training rows in the feature source.")
+    scaler.feature_cols_ = cols
+    if classes is None:
+        classes = np.array(sorted(seen))
+    elif not seen <= set(classes.tolist()):
+        raise ValueError(f"New labels {sorted(seen - set(classes.tolist()))} cannot be added to a trained model.")
+    if len(classes) < 2:
+        raise ValueError("Need at least two labels to train a classifier.")
+
+    rng = np.random.default_rng(random_state)
+    clf = Pipeline(steps=[("scale", scaler), ("sgd", sgd)])
+    history: List[float] = []
+    for _ in range(epochs):
+        held_out = StreamingMetrics(classes)
+        for chunk in _chunks(source, chunksize):
+            X, y, held = _prepare(chunk, cols, target_col, id_col, test_size)
+            Xs = scaler.transform(X)
+            train = np.flatnonzero(~held)
+            if train.size:
+                # Chunks arrive in file order; shuffling within each keeps SGD steps unbiased.
+                train = rng.permutation(train)
+                sgd.partial_fit(Xs[train], y[train], classes=classes)
+            if held.any() and hasattr(sgd, "coef_"):
+                held_out.update(y[held], sgd.predict(Xs[held]))
+        history.append(held_out.summary()["accuracy"])
+
+    metrics = evaluate_streaming(clf, source, target_col, id_col, test_size, chunksize)
+    metrics["history"] = history
+    return clf, metrics
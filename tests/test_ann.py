@@ -0,0 +1,41 @@
+import numpy as np
+
+from classically_punk.graph.ann import IVFIndex, benchmark_index
+
+
+def _clustered(n_clusters: int = 20, per_cluster: int = 50, dims: int = 8, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dims))
+    X = np.repeat(centers, per_cluster, axis=0) + 0.05 * rng.normal(size=(n_clusters * per_cluster, dims))
+    ids = [f"track::{i}" for i in range(X.shape[0])]
+    return X, ids
+
+
+def test_ivf_index_save_load_and_query(tmp_path):
+    X, ids = _clustered()
+    index = IVFIndex.build(X, ids, n_lists=16, n_probe=4, random_state=0)
+
+    path = tmp_path / "tracks.ivf"
+    index.save(path)
+    loaded = IVFIndex.load(path)
+    assert isinstance(loaded.vectors, np.memmap)
+    assert loaded.n_probe == 4 and len(loaded) == len(ids)
+
+    rows, sims = loaded.search(X[:5], k=3)
+    assert rows.shape == sims.shape == (5, 3)
+    assert (rows[:, 0] == np.arange(5)).all()
+    assert (np.diff(sims, axis=1) <= 0).all()
+
+    nbrs = loaded.neighbors("track::0", k=5)
+    assert len(nbrs) == 5
+    assert "track::0" not in set(nbrs["id"])
+
+
+def test_benchmark_index_recall_increases_with_probes():
+    X, ids = _clustered(seed=1)
+    index = IVFIndex.build(X, ids, n_lists=32, random_state=0)
+    report = benchmark_index(index, X[::10], k=10, n_probes=(1, 32))
+    assert list(report["n_probe"]) == [1, 32]
+    assert report["recall_at_k"].iloc[1] == 1.0
+    assert report["recall_at_k"].iloc[0] <= report["recall_at_k"].iloc[1]
+    assert (report["qps"] > 0).all()
@@ -0,0 +1,55 @@
+import networkx as nx
+import numpy as np
+import pandas as pd
+from networkx.algorithms.community import louvain_communities
+from sklearn.metrics import adjusted_rand_score, homogeneity_score
+
+from classically_punk.graph.community import (
+    attach_communities,
+    detect_communities,
+    modularity,
+    similarity_adjacency,
+)
+from classically_punk.graph.export import CSRGraph
+from classically_punk.graph.schema import aggregate_genre_embeddings, build_knn_edge_arrays
+
+
+def _clustered_graph(n_clusters=4, per_cluster=60, dim=8, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(scale=5.0, size=(n_clusters, dim))
+    truth = np.repeat(np.arange(n_clusters), per_cluster)
+    X = centers[truth] + rng.normal(size=(truth.shape[0], dim))
+    ids = [f"track::{i}" for i in range(truth.shape[0])]
+    edges = build_knn_edge_arrays(X, ids, k=8)
+    return CSRGraph.from_edges(edges), X, ids, truth
+
+
+def test_communities_recover_planted_clusters():
+    graph, _, ids, truth = _clustered_graph()
+    louvain = detect_communities(graph, method="louvain").loc[ids].to_numpy()
+    assert adjusted_rand_score(truth, louvain) > 0.95
+    # Label propagation may split a cluster but never merges two.
+    lpa = detect_communities(graph, method="lpa").loc[ids].to_numpy()
+    assert homogeneity_score(truth, lpa) > 0.95
+
+
+def test_louvain_modularity_close_to_networkx():
+    graph, _, _, _ = _clustered_graph(n_clusters=6, per_cluster=40, seed=1)
+    A = similarity_adjacency(graph)
+    labels = detect_communities(graph, method="louvain").to_numpy()
+
+    G = nx.from_scipy_sparse_array(A)
+    ref = louvain_communities(G, weight="weight", seed=0)
+    assert modularity(A, labels) >= nx.community.modularity(G, ref, weight="weight") - 0.01
+
+
+def test_attached_communities_feed_genre_aggregation():
+    graph, X, ids, _ = _clustered_graph()
+    df = pd.DataFrame(X, columns=[f"f{i}" for i in range(X.shape[1])])
+    df.insert(0, "track_id", ids)
+    labeled = attach_communities(df, detect_communities(graph), id_col="track_id")
+
+    agg_df, centroids, genre_ids = aggregate_genre_embeddings(labeled.drop(columns=["track_id"]))
+    assert len(genre_ids) == 4
+    assert all(g.startswith("cluster_") for g in labeled["label"])
+    assert centroids.shape == (4, X.shape[1])
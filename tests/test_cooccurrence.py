@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+from classically_punk.graph.cooccurrence import build_cooccurrence_edges, incidence_matrix
+
+
+def _playlist_edges():
+    rows = [
+        ("p1", "t1"), ("p1", "t2"), ("p1", "t3"),
+        ("p2", "t1"), ("p2", "t2"),
+        ("p3", "t2"), ("p3", "t4"),
+        ("p3", "t4"),  # repeated pair counts once
+    ]
+    return pd.DataFrame(
+        {
+            "src": [f"playlist::{p}" for p, _ in rows],
+            "dst": [f"track::{t}" for _, t in rows],
+            "type": "IN_PLAYLIST",
+            "weight": 1.0,
+            "source": "spotify",
+            "version": "v1",
+        }
+    )
+
+
+def test_cooccurrence_cosine_matches_dense_reference():
+    edges = _playlist_edges()
+    P, _, tracks = incidence_matrix(edges)
+    dense = P.toarray()
+    C = dense.T @ dense
+    deg = dense.sum(axis=0)
+    expected = C / np.sqrt(np.outer(deg, deg))
+    np.fill_diagonal(expected, 0)
+
+    # A tiny budget forces one track row per block.
+    arrays = build_cooccurrence_edges(edges, k=2, memory_budget_mb=1e-6)
+    assert arrays.source == "cooccurrence" and arrays.type == "SIMILAR_TO"
+    lookup = {t: i for i, t in enumerate(tracks)}
+    for s, d, w in zip(arrays.src, arrays.dst, arrays.weight):
+        assert s != d
+        np.testing.assert_allclose(w, expected[lookup[s], lookup[d]])
+    counts = pd.Series(arrays.src).value_counts()
+    assert counts.max() <= 2
+    assert counts["track::t2"] == 2
+
+
+def test_cooccurrence_jaccard_and_ppmi():
+    edges = _playlist_edges()
+    jac = build_cooccurrence_edges(edges, k=5, normalization="jaccard")
+    pair = dict(zip(zip(jac.src, jac.dst), jac.weight))
+    # t1 in {p1,p2}, t2 in {p1,p2,p3}: |A&B| / |A|B| = 2/3
+    np.testing.assert_allclose(pair[("track::t1", "track::t2")], 2 / 3)
+
+    # Two more single-track playlists make t1/t2 co-occur less often than chance (PMI < 0).
+    extra = edges.iloc[:2].assign(src=["playlist::p4", "playlist::p5"], dst=["track::t1", "track::t2"])
+    edges = pd.concat([edges, extra], ignore_index=True)
+    P, _, tracks = incidence_matrix(edges)
+    dense = P.toarray()
+    deg = dense.sum(axis=0)
+    with np.errstate(divide="ignore"):
+        expected = np.maximum(np.log(dense.T @ dense * P.shape[0] / np.outer(deg, deg)), 0.0)
+    np.fill_diagonal(expected, 0)
+
+    ppmi = build_cooccurrence_edges(edges, k=5, normalization="ppmi")
+    lookup = {t: i for i, t in enumerate(tracks)}
+    got = {(s, d): w for s, d, w in zip(ppmi.src, ppmi.dst, ppmi.weight)}
+    want = {(tracks[i], tracks[j]): expected[i, j] for i, j in zip(*np.nonzero(expected))}
+    assert set(got) == set(want) and ("track::t1", "track::t2") not in got
+    for (s, d), w in got.items():
+        np.testing.assert_allclose(w, expected[lookup[s], lookup[d]])
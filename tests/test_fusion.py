@@ -0,0 +1,53 @@
+import numpy as np
+
+from classically_punk.graph.fusion import NeighborTable, fuse_similarity, normalize_source_weights
+from classically_punk.graph.schema import EdgeArrays
+
+
+def _arrays(pairs, source):
+    src, dst, w = zip(*pairs)
+    return EdgeArrays(
+        src=np.array(src, dtype=object),
+        dst=np.array(dst, dtype=object),
+        weight=np.array(w, dtype=float),
+        type="SIMILAR_TO",
+        source=source,
+    )
+
+
+def test_fuse_similarity_blends_sources_into_fixed_width_table(tmp_path):
+    embedding = _arrays([("a", "b", 0.9), ("a", "c", 0.5), ("b", "a", 0.9), ("c", "a", 0.1)], "embedding")
+    cooc = _arrays([("a", "c", 10.0), ("a", "d", 2.0), ("b", "c", 6.0)], "cooccurrence")
+    # Other edge types are not similarity, even when their source tag matches.
+    performs = EdgeArrays(
+        src=np.array(["x"], dtype=object),
+        dst=np.array(["a"], dtype=object),
+        weight=np.array([1.0]),
+        type="PERFORMS",
+        source="embedding",
+    )
+
+    table = fuse_similarity([embedding, cooc, performs], {"embedding": 0.5, "cooccurrence": 0.5}, k=2)
+    assert table.indices.dtype == np.int32 and table.scores.dtype == np.float32
+    assert table.indices.shape == (4, 2) and "x" not in table.ids
+
+    # a->c is supported by both sources and outranks a->b (embedding only).
+    nbrs = table.neighbor_ids("a")
+    assert nbrs["id"].tolist() == ["c", "b"]
+    np.testing.assert_allclose(nbrs["score"], [0.5 * 0.5 + 0.5 * 1.0, 0.5 * 1.0], atol=1e-6)
+
+    # Nodes without outgoing edges get an empty (padded) row.
+    idx, scores = table.neighbors("d")
+    assert idx.size == 0 and scores.size == 0
+
+    table.save(tmp_path / "neighbors.bin")
+    loaded = NeighborTable.load(tmp_path / "neighbors.bin")
+    idx, _ = loaded.neighbors("a")
+    assert np.shares_memory(idx, loaded.indices)
+    assert loaded.neighbor_ids("a")["id"].tolist() == ["c", "b"]
+
+
+def test_rank_normalization_is_per_source_node():
+    src = np.array(["a", "a", "a", "b"], dtype=object)
+    norm = normalize_source_weights(src, np.array([5.0, 50.0, 0.5, 7.0]), method="rank")
+    np.testing.assert_allclose(norm, [1 - 1 / 3, 1.0, 1 - 2 / 3, 1.0])
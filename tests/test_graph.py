@@ -3,9 +3,26 @@ import pandas as pd
 
 from pathlib import Path
 
-from classically_punk.graph.export import edges_to_networkx, export_node_link_json
-from classically_punk.graph.schema import Edge, aggregate_genre_embeddings, build_knn_edges
-from classically_punk.graph.shapes import build_genre_hulls, radial_glyph_from_features
+from classically_punk.graph.aggregate import aggregate_feature_store, aggregate_genre_chunks
+from classically_punk.graph.export import (
+    CSRGraph,
+    edges_to_networkx,
+    export_csr,
+    export_graphml,
+    export_node_link_json,
+    stream_node_link_json,
+)
+from classically_punk.graph.incremental import apply_knn_delta, update_knn_edges
+from classically_punk.graph.knn import exact_cosine_knn
+from classically_punk.graph.schema import Edge, aggregate_genre_embeddings, build_knn_edge_arrays, build_knn_edges
+from classically_punk.graph.shapes import (
+    HullService,
+    build_genre_hulls,
+    export_glyph_buffer,
+    load_glyph_buffer,
+    radial_glyph_from_features,
+    radial_glyphs_batch,
+)
 
 
 def test_build_knn_edges_cosine_weights():
@@ -16,6 +33,24 @@ def test_build_knn_edges_cosine_weights():
     assert all(0.0 <= e.weight <= 1.0 for e in edges)
 
 
+def test_blocked_knn_matches_sklearn():
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(200, 8))
+    ids = [f"t{i}" for i in range(200)]
+    ref = build_knn_edges(embeddings, ids, k=5, engine="sklearn")
+    # Tiny budget forces many row blocks across threads.
+    arrays = build_knn_edge_arrays(embeddings, ids, k=5, memory_budget_mb=0.01, n_jobs=4)
+    assert len(arrays) == len(ref) == 200 * 5
+    assert {(e.src, e.dst) for e in ref} == set(zip(arrays.src, arrays.dst))
+    np.testing.assert_allclose(
+        sorted(e.weight for e in ref), np.sort(arrays.weight), atol=1e-5
+    )
+
+    indices, sims = exact_cosine_knn(embeddings, k=5, memory_budget_mb=0.01, n_jobs=1)
+    assert (indices != np.arange(200)[:, None]).all()
+    assert (np.diff(sims, axis=1) <= 0).all()
+
+
 def test_aggregate_genre_embeddings_returns_centroids():
     df = pd.DataFrame(
         [
@@ -37,6 +72,23 @@ def test_radial_glyph_from_features_normalizes():
     assert glyph.metadata["feature_names"] == names
 
 
+def test_radial_glyphs_batch_matches_single_and_roundtrips(tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(50, 6))
+    names = [f"f{i}" for i in range(6)]
+    batch = radial_glyphs_batch(X, scale=2.0, height_idx=1)
+    assert batch.shape == (50, 6, 3) and batch.dtype == np.float32
+    for i in (0, 17, 49):
+        single = radial_glyph_from_features(X[i], names, scale=2.0, height_idx=1)
+        np.testing.assert_allclose(batch[i], np.array(single.vertices), rtol=1e-6, atol=1e-6)
+
+    header = export_glyph_buffer(batch, tmp_path / "glyphs", ids=[f"t{i}" for i in range(50)], feature_names=names)
+    assert (tmp_path / "glyphs.bin").stat().st_size == header["byte_length"] == batch.nbytes
+    loaded, loaded_header = load_glyph_buffer(tmp_path / "glyphs")
+    np.testing.assert_array_equal(loaded, batch)
+    assert loaded_header["ids"][17] == "t17"
+
+
 def test_build_genre_hulls():
     # Create two simple tetrahedrons for two genres
     coords = pd.DataFrame(
@@ -52,6 +104,51 @@ def test_build_genre_hulls():
     assert hulls["rock"]["vertices"]
 
 
+def test_hull_service_lod_cache_and_failures(tmp_path):
+    rng = np.random.default_rng(0)
+    blobs = {name: rng.normal(loc=offset, size=(400, 3)) for name, offset in (("rock", 0.0), ("jazz", 10.0))}
+    df = pd.concat(
+        [pd.DataFrame(pts, columns=["x", "y", "z"]).assign(label=name) for name, pts in blobs.items()], ignore_index=True
+    )
+    df["track_id"] = [f"t{i}" for i in range(len(df))]
+    flat = pd.DataFrame({"x": [0, 1, 0, 1], "y": [0, 0, 1, 1], "z": 0.0, "label": "flat", "track_id": list("abcd")})
+    df = pd.concat([df, flat], ignore_index=True)
+
+    service = HullService(max_faces=20)
+    hulls = service.build(df, id_col="track_id")
+    assert set(hulls) == {"jazz", "rock"} and "flat" in service.failures
+    rock = hulls["rock"]
+    assert len(rock["simplices"]) <= 20
+    assert np.max(rock["simplices"]) < len(rock["vertices"]) < 400
+    full = build_genre_hulls(df[df["label"] != "flat"])
+    assert rock["volume"] == full["rock"]["volume"]
+
+    # Only the label whose membership changed is recomputed, also after a save/load.
+    service.save(tmp_path / "hulls.json")
+    service = HullService.load(tmp_path / "hulls.json")
+    moved = df.copy()
+    moved.loc[0, "x"] += 50.0
+    service.build(moved, id_col="track_id")
+    assert service.recomputed == ["rock"]
+    service.build(moved, id_col="track_id", projection_version="v2")
+    assert sorted(service.recomputed) == ["jazz", "rock"]
+
+    # Non-string labels (e.g. numpy ints from a cluster column) round-trip through the cache file.
+    coded = moved[moved["label"] != "flat"].assign(label=lambda d: np.where(d["label"] == "rock", np.int64(1), np.int64(2)))
+    service = HullService(max_faces=20)
+    service.build(coded, id_col="track_id")
+    service.save(tmp_path / "coded.json")
+    service = HullService.load(tmp_path / "coded.json")
+    assert set(service.build(coded, id_col="track_id")) == {1, 2} and service.recomputed == []
+
+    # Failures share the cache's str keys, and labels that disappear are evicted on rebuild.
+    coded = pd.concat([coded, flat.assign(label=np.int64(3))], ignore_index=True)
+    service.build(coded, id_col="track_id")
+    assert set(service.failures) == {"3"}
+    service.build(coded[coded["label"] != 2], id_col="track_id")
+    assert set(service.cache) == {"1"}
+
+
 def test_edges_to_networkx_and_export(tmp_path):
     edges = [
         Edge(src="a", dst="b", type="SIMILAR_TO", weight=0.9, source="test", version="v1"),
@@ -64,3 +161,109 @@ def test_edges_to_networkx_and_export(tmp_path):
     out = tmp_path / "graph.json"
     export_node_link_json(edges, out)
     assert out.exists()
+
+
+def test_update_knn_edges_matches_full_rebuild():
+    rng = np.random.default_rng(1)
+    old = rng.normal(size=(300, 6))
+    new = rng.normal(size=(20, 6))
+    old_ids = [f"t{i}" for i in range(300)]
+    new_ids = [f"n{i}" for i in range(20)]
+
+    edges = build_knn_edge_arrays(old, old_ids, k=5, version="v1")
+    delta = update_knn_edges(edges, old, old_ids, new, new_ids, k=5, version="v2")
+    assert delta.added.version == delta.removed.version == "v2"
+    assert len(delta.added) >= 20 * 5
+    assert len(delta.removed) == len(delta.added) - 20 * 5
+
+    patched = apply_knn_delta(edges, delta)
+    full = build_knn_edge_arrays(np.vstack([old, new]), old_ids + new_ids, k=5)
+    assert set(zip(patched.src, patched.dst)) == set(zip(full.src, full.dst))
+
+
+def test_genre_accumulator_streaming_matches_in_memory(tmp_path):
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame(rng.normal(loc=1e4, size=(500, 3)), columns=["f0", "f1", "f2"])
+    df.insert(0, "label", rng.choice(["rock", "jazz", "punk"], size=500))
+    df.insert(0, "track_id", [f"t{i}" for i in range(500)])
+
+    acc = aggregate_genre_chunks((df.iloc[i : i + 64] for i in range(0, 500, 64)), full_covariance=True)
+    agg_df, centroids, ids = acc.finalize()
+    assert ids == ["genre::jazz", "genre::punk", "genre::rock"]
+    for label, grp in df.groupby("label"):
+        vecs = grp[["f0", "f1", "f2"]].to_numpy()
+        row = agg_df.set_index("genre").loc[label]
+        np.testing.assert_allclose(row["cov_trace"], np.trace(np.cov(vecs, rowvar=False)), rtol=1e-9)
+        np.testing.assert_allclose(acc.covariances()[label], np.cov(vecs, rowvar=False), rtol=1e-9, atol=1e-9)
+
+    shards = []
+    for i, start in enumerate(range(0, 500, 200)):
+        shard = tmp_path / f"features_{i}.csv"
+        df.iloc[start : start + 200].to_csv(shard, index=False)
+        shards.append(shard)
+    merged = aggregate_feature_store(shards, chunksize=50, n_jobs=2)
+    np.testing.assert_allclose(merged.finalize()[1], centroids)
+
+
+def test_streaming_exporters_match_networkx_bytes(tmp_path):
+    import gzip
+    import json
+
+    import networkx as nx
+
+    rng = np.random.default_rng(3)
+    nodes = [f"track::{i}" for i in range(25)] + ['tag::r&b "<soul>"']
+    edges = [
+        Edge(
+            src=str(rng.choice(nodes)),
+            dst=str(rng.choice(nodes)),
+            type=str(rng.choice(["SIMILAR_TO", "HAS_TAG"])),
+            weight=float(rng.random()),
+            source="test",
+            version="v1",
+        )
+        for _ in range(300)
+    ]
+    G = edges_to_networkx(edges)
+
+    export_node_link_json(edges, tmp_path / "graph.json")
+    assert (tmp_path / "graph.json").read_text() == json.dumps(nx.readwrite.json_graph.node_link_data(G))
+
+    stream_node_link_json(edges, tmp_path / "graph.json.gz")
+    with gzip.open(tmp_path / "graph.json.gz", "rt") as f:
+        assert f.read() == (tmp_path / "graph.json").read_text()
+
+    # Older networkx releases name the edge list "links".
+    stream_node_link_json(edges, tmp_path / "links.json", edges_key="links")
+    reference = json.loads((tmp_path / "graph.json").read_text())
+    legacy = json.loads((tmp_path / "links.json").read_text())
+    assert legacy["links"] == next(v for k, v in reference.items() if k in ("edges", "links"))
+
+    nx.write_graphml(G, tmp_path / "ref.graphml")
+    export_graphml(iter(edges), tmp_path / "graph.graphml")
+    assert (tmp_path / "graph.graphml").read_bytes() == (tmp_path / "ref.graphml").read_bytes()
+
+
+def test_csr_graph_roundtrip_and_zero_copy_neighbors(tmp_path):
+    edges = [
+        Edge(src="a", dst="b", type="SIMILAR_TO", weight=0.9, source="embedding", version="v1"),
+        Edge(src="b", dst="c", type="HAS_TAG", weight=1.0, source="test", version="v2"),
+        Edge(src="a", dst="c", type="SIMILAR_TO", weight=0.4, source="embedding", version="v1"),
+    ]
+    export_csr(edges, tmp_path / "graph.csr")
+    graph = CSRGraph.load(tmp_path / "graph.csr")
+    assert isinstance(graph.indices, np.memmap)
+    assert graph.n_nodes == 3 and graph.n_edges == 3
+
+    targets, weights = graph.neighbors("a")
+    assert np.shares_memory(targets, graph.indices)
+    assert [graph.node_ids[t] for t in targets] == ["b", "c"]
+    np.testing.assert_allclose(weights, [0.9, 0.4])
+
+    assert sorted(graph.to_edges(), key=lambda e: (e.src, e.dst)) == sorted(edges, key=lambda e: (e.src, e.dst))
+
+    G = edges_to_networkx(edges)
+    G.add_node("lonely")
+    again = CSRGraph.from_networkx(G).to_networkx()
+    assert set(again.nodes) == set(G.nodes)
+    assert sorted(again.edges(data="weight")) == sorted(G.edges(data="weight"))
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from classically_punk.features.isosurface import (
+    decimate_mesh,
+    export_meshes,
+    genre_isosurfaces,
+    load_meshes,
+    marching_tetrahedra,
+)
+
+
+def _edge_counts(faces):
+    edges = np.sort(np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]]), axis=1).astype(np.int64)
+    return np.unique(edges, axis=0, return_counts=True)
+
+
+def test_marching_tetrahedra_sphere_is_closed_and_outward():
+    g = np.linspace(-2.0, 2.0, 41)
+    X, Y, Z = np.meshgrid(g, g, g, indexing="ij")
+    volume = np.exp(-(X**2 + Y**2 + Z**2) / 2)
+    vertices, faces = marching_tetrahedra(volume, np.exp(-0.5), origin=(-2.0, -2.0, -2.0), spacing=(0.1, 0.1, 0.1))
+
+    assert vertices.dtype == np.float32 and faces.dtype == np.uint32
+    np.testing.assert_allclose(np.linalg.norm(vertices, axis=1), 1.0, atol=0.01)
+    edges, counts = _edge_counts(faces)
+    assert (counts == 2).all()  # welded and watertight
+    assert len(vertices) - len(edges) + len(faces) == 2  # sphere topology
+
+    tri = vertices[faces].astype(np.float64)
+    normal = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    area = np.linalg.norm(normal, axis=1)
+    facing = np.einsum("ij,ij->i", normal, tri.mean(axis=1))
+    assert (facing[area > 1e-9] > 0).all()
+
+    small_v, small_f = decimate_mesh(vertices, faces, cell_size=0.3)
+    assert len(small_f) < len(faces) / 10
+    assert (_edge_counts(small_f)[1] == 2).all()
+
+
+def test_genre_isosurfaces_export_roundtrip(tmp_path):
+    rng = np.random.default_rng(0)
+    coords_df = pd.DataFrame(
+        np.vstack([rng.normal(size=(300, 3)), rng.normal(loc=4.0, size=(300, 3))]), columns=["x", "y", "z"]
+    )
+    coords_df["label"] = ["rock"] * 300 + ["jazz"] * 300
+    meshes = genre_isosurfaces(coords_df, levels=(0.3, 0.6), bandwidth=0.6, grid_size=24, decimate=0.02)
+    assert sorted(meshes) == ["jazz@0.3", "jazz@0.6", "rock@0.3", "rock@0.6"]
+    assert all(m.n_faces > 0 for m in meshes.values())
+    assert meshes["rock@0.6"].n_faces < meshes["rock@0.3"].n_faces
+
+    manifest = export_meshes(meshes, tmp_path / "genres")
+    assert manifest["byte_length"] == sum(12 * (m.vertices.shape[0] + m.faces.shape[0]) for m in meshes.values())
+    loaded = load_meshes(tmp_path / "genres")
+    for name, mesh in meshes.items():
+        np.testing.assert_array_equal(loaded[name].vertices, mesh.vertices)
+        np.testing.assert_array_equal(loaded[name].faces, mesh.faces)
+        assert loaded[name].metadata["label"] == mesh.metadata["label"]
@@ -1,6 +1,16 @@
+import numpy as np
 import pandas as pd
 
-from classically_punk.models.baseline import evaluate_classifier, train_baseline_classifier
+from classically_punk.features.store import iter_feature_chunks
+from classically_punk.models.baseline import (
+    evaluate_classifier,
+    fold_arrays,
+    sweep_baseline_classifier,
+    train_baseline_classifier,
+)
+from classically_punk.models.inference import LinearPredictor, export_linear_classifier
+from classically_punk.models.regression import RegressionAccumulator, evaluate_regression, fit_linear_regression
+from classically_punk.models.streaming import evaluate_streaming, holdout_mask, train_streaming_classifier
 
 
 def test_train_and_evaluate_baseline_classifier():
@@ -19,3 +29,150 @@ def test_train_and_evaluate_baseline_classifier():
     assert 0.0 <= metrics["accuracy"] <= 1.0
     assert 0.0 <= metrics["f1_macro"] <= 1.0
     assert "rock" in metrics["report"]
+
+
+def _write_store(path, n_per_label=400, seed=0, offset=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    for label, center in (("rock", (2.0, 0.0, 0.0)), ("jazz", (0.0, 2.0, 0.0)), ("punk", (0.0, 0.0, 2.0))):
+        feats = rng.normal(loc=center, scale=0.6, size=(n_per_label, 3))
+        frame = pd.DataFrame(feats, columns=["f1", "f2", "f3"])
+        frame.insert(0, "track_id", [f"{label}{offset + i}" for i in range(n_per_label)])
+        frame["label"] = label
+        frames.append(frame)
+    df = pd.concat(frames).sample(frac=1.0, random_state=seed)
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_streaming_classifier_trains_from_chunks(tmp_path):
+    store = tmp_path / "features.csv"
+    df = _write_store(store)
+
+    clf, metrics = train_streaming_classifier(store, epochs=3, chunksize=250, random_state=0)
+    assert metrics["accuracy"] > 0.9 and len(metrics["history"]) == 3
+    np.testing.assert_allclose(clf.named_steps["scale"].mean_, df[~holdout_mask(df["track_id"])][["f1", "f2", "f3"]].mean(), atol=1e-9)
+
+    # Streaming metrics agree with the in-memory evaluation on the same hold-out rows.
+    held = df[holdout_mask(df["track_id"])]
+    assert metrics["n_samples"] == len(held)
+    reference = evaluate_classifier(clf, held[["f1", "f2", "f3"]].to_numpy(), held["label"])
+    assert abs(reference["accuracy"] - metrics["accuracy"]) < 1e-12
+    assert abs(reference["f1_macro"] - metrics["f1_macro"]) < 1e-12
+
+    # A hold-out label the model never saw is skipped and reported, not miscounted.
+    relabeled = df.assign(label=df["label"].replace({"punk": "zydeco"}))
+    shifted = evaluate_streaming(clf, lambda: [relabeled])
+    assert shifted["n_unknown"] == (held["label"] == "punk").sum()
+    assert shifted["n_samples"] + shifted["n_unknown"] == len(held)
+
+    # Continue on a new batch without a full retrain.
+    batch = tmp_path / "batch.csv"
+    _write_store(batch, n_per_label=100, seed=1, offset=10_000)
+    n_seen = clf.named_steps["scale"].n_samples_seen_
+    clf, metrics = train_streaming_classifier(batch, epochs=1, chunksize=100, model=clf)
+    assert clf.named_steps["scale"].n_samples_seen_ > n_seen
+    assert metrics["accuracy"] > 0.9
+
+
+def test_linear_regression_from_sufficient_statistics(tmp_path):
+    from sklearn.linear_model import Ridge
+
+    rng = np.random.default_rng(0)
+    n = 3000
+    X = rng.normal(size=(n, 4)) * [1.0, 10.0, 0.1, 3.0] + 5.0
+    y = X @ [0.5, -0.2, 3.0, 0.0] + 7.0 + 0.1 * rng.normal(size=n)
+    df = pd.DataFrame(X, columns=["f1", "f2", "f3", "f4"])
+    df.insert(0, "track_id", [f"t{i}" for i in range(n)])
+    df["tempo"] = y
+    # A text column that is empty in the first row must still be recognised as non-numeric.
+    df["comment"] = np.where(np.arange(n) % 5 == 1, "live", None)
+    shards = [tmp_path / "a.csv", tmp_path / "b.csv"]
+    df.iloc[:1200].to_csv(shards[0], index=False)
+    df.iloc[1200:].to_csv(shards[1], index=False)
+
+    model, results = fit_linear_regression(shards, "tempo", alphas=[0.0, 10.0, 1e4], chunksize=500, n_jobs=2)
+    assert results["alpha"].tolist()[-1] == 1e4 and results.loc[0, "holdout_r2"] > 0.99
+    assert results.loc[0, "n_train"] + results.loc[0, "n_holdout"] == n
+
+    train = df[~holdout_mask(df["track_id"])]
+    reference = Ridge(alpha=model.alpha).fit(train[["f1", "f2", "f3", "f4"]], train["tempo"])
+    np.testing.assert_allclose(model.coef[:, 0], reference.coef_, atol=1e-8)
+    np.testing.assert_allclose(model.intercept[0], reference.intercept_, atol=1e-7)
+
+    # Hold-out scores from statistics equal the streaming pass over the rows.
+    streamed = evaluate_regression(model, iter_feature_chunks(shards[1], chunksize=300))
+    held = df.iloc[1200:][holdout_mask(df.iloc[1200:]["track_id"])]
+    resid = held["tempo"] - model.predict(held)
+    np.testing.assert_allclose(streamed["rmse"][0], np.sqrt((resid**2).mean()))
+    np.testing.assert_allclose(streamed["mae"][0], resid.abs().mean())
+
+    # The eigen path and the Cholesky solve agree.
+    acc = RegressionAccumulator(["f1", "f2", "f3", "f4"], ["tempo"]).update(df)
+    for alpha, path_model in zip([0.0, 10.0], acc.solve_path([0.0, 10.0])):
+        np.testing.assert_allclose(path_model.coef, acc.solve(alpha).coef, atol=1e-8)
+
+
+def test_sweep_baseline_classifier_ranks_configurations():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(120, 3)), columns=["f1", "f2", "f3"])
+    df["label"] = np.where(df["f1"] + 0.5 * df["f2"] > 0, "rock", "jazz")
+
+    results = sweep_baseline_classifier(df, models=("logreg", "sgd_log"), Cs=(0.001, 1.0), n_splits=3, n_jobs=2)
+    assert len(results) == 4 and results["rank"].tolist() == [1, 2, 3, 4]
+    assert results["f1_macro"].is_monotonic_decreasing
+    assert results.loc[0, "f1_macro"] > 0.9 and (results["fit_time"] > 0).all()
+
+    inline = sweep_baseline_classifier(df, models=("logreg", "sgd_log"), Cs=(0.001, 1.0), n_splits=3, n_jobs=1)
+    pd.testing.assert_frame_equal(
+        results.drop(columns=["fit_time", "score_time"]), inline.drop(columns=["fit_time", "score_time"])
+    )
+
+    # Folds share one feature matrix; each keeps only its training-part scaling statistics.
+    arrays = fold_arrays(df[["f1", "f2", "f3"]], df["label"], n_splits=3)
+    assert arrays["X"].shape == (120, 3) and np.bincount(arrays["fold"]).tolist() == [40, 40, 40]
+    np.testing.assert_allclose(arrays["mean"][1], arrays["X"][arrays["fold"] != 1].mean(axis=0))
+
+
+def test_exported_linear_predictor_matches_pipeline(tmp_path):
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    rng = np.random.default_rng(0)
+    Z = rng.normal(size=(600, 5))
+    y = np.array(["jazz", "punk", "rock"])[np.argmax(Z[:, :3], axis=1)]
+    X = Z * [1.0, 100.0, 0.01, 5.0, 1.0] + 3.0
+    df = pd.DataFrame(X, columns=[f"f{i}" for i in range(5)])
+    clf = Pipeline([("scale", StandardScaler()), ("logreg", LogisticRegression(max_iter=1000))]).fit(df, y)
+
+    path = export_linear_classifier(clf, tmp_path / "models")
+    assert path == tmp_path / "models" / "v1" / "weights.bundle"
+    assert export_linear_classifier(clf, tmp_path / "models").parent.name == "v2"
+
+    predictor = LinearPredictor.load(tmp_path / "models")
+    predictor.block_size = 128
+    assert predictor.version == "v2" and isinstance(predictor.weights, np.memmap)
+    np.testing.assert_allclose(predictor.predict_proba(df), clf.predict_proba(df), atol=1e-5)
+    assert (predictor.predict(df) == clf.predict(df)).mean() > 0.99
+
+    # Memmapped feature matrices are scored block by block without loading them whole
+    # (float32 inputs quantise the raw features, hence the looser tolerance).
+    np.save(tmp_path / "X.npy", X.astype(np.float32))
+    mapped = np.load(tmp_path / "X.npy", mmap_mode="r")
+    np.testing.assert_allclose(predictor.predict_proba(mapped), clf.predict_proba(df), atol=1e-3)
+    assert predictor.predict(X[0]).shape == (1,)
+
+    # Scalers that skip centring or scaling export exactly what they apply.
+    for kwargs in ({"with_mean": False}, {"with_std": False}):
+        partial = Pipeline([("scale", StandardScaler(**kwargs)), ("logreg", LogisticRegression(max_iter=1000))]).fit(df, y)
+        exported = LinearPredictor.load(export_linear_classifier(partial, tmp_path / "partial"))
+        np.testing.assert_allclose(exported.predict_proba(df), partial.predict_proba(df), atol=1e-4)
+
+    # The streaming classifier's pipeline exports too (one-vs-rest probabilities).
+    store = tmp_path / "features.csv"
+    _write_store(store)
+    sgd, _ = train_streaming_classifier(store, epochs=2, chunksize=500)
+    stream_predictor = LinearPredictor.load(export_linear_classifier(sgd, tmp_path / "sgd"))
+    feats = pd.read_csv(store)
+    np.testing.assert_allclose(stream_predictor.predict_proba(feats), sgd.predict_proba(feats[["f1", "f2", "f3"]].to_numpy()), atol=1e-5)
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.model_selection import cross_val_score
+
+from classically_punk.features.normalization import FrozenScaler, NormalizationStats, compute_normalization_stats
+from classically_punk.features.projection import project_large, project_with_umap
+from classically_punk.graph.schema import build_knn_edge_arrays
+from classically_punk.models.baseline import train_baseline_classifier
+
+
+def _store(path, n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(rng.normal(size=(n, 3)) * [1.0, 50.0, 0.01] + [0.0, 100.0, -3.0], columns=["f1", "f2", "f3"])
+    df.loc[df.index[::7], "f2"] = np.nan
+    df.insert(0, "track_id", [f"t{i}" for i in range(n)])
+    df["label"] = np.where(df["f1"] > 0, "rock", "jazz")
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_streaming_stats_match_full_table_and_persist(tmp_path):
+    store = tmp_path / "features.csv"
+    df = _store(store)
+    stats = compute_normalization_stats(store, out=tmp_path / "norm.bundle", chunksize=128)
+
+    assert stats.feature_cols == ["f1", "f2", "f3"]
+    np.testing.assert_allclose(stats.mean, df[stats.feature_cols].mean(), rtol=1e-10)
+    np.testing.assert_allclose(stats.std, df[stats.feature_cols].std(), rtol=1e-10)
+    assert stats.count.tolist() == df[stats.feature_cols].count().tolist()
+    # The reservoir holds every row here, so quantiles are exact.
+    np.testing.assert_allclose(stats.quantiles, np.nanquantile(df[stats.feature_cols], stats.quantile_levels, axis=0))
+
+    sampled = compute_normalization_stats(store, reservoir_size=300, chunksize=128)
+    np.testing.assert_allclose(sampled.mean, stats.mean)
+    assert np.all(np.abs(sampled.center_scale("robust")[0] - stats.center_scale("robust")[0]) < 0.25 * stats.std)
+
+    loaded = NormalizationStats.load(tmp_path / "norm.bundle")
+    assert loaded.version == stats.version and loaded.is_current(store)
+    np.testing.assert_allclose(loaded.transform(df), stats.transform(df))
+    z = loaded.transform(df, dtype=np.float64)
+    np.testing.assert_allclose(np.nanmean(z, axis=0), 0.0, atol=1e-9)
+
+    _store(store, n=1001)
+    assert not loaded.is_current(store)
+
+
+def test_consumers_apply_shared_stats_without_refitting(tmp_path):
+    store = tmp_path / "features.csv"
+    df = _store(store, n=200).dropna()
+    stats = compute_normalization_stats(store)
+    X = df[stats.feature_cols].to_numpy()
+    # A column the stats do not cover: consumers given stats must ignore it.
+    df["extra"] = np.random.default_rng(1).normal(size=len(df)) * 1e3
+
+    clf, X_test, _ = train_baseline_classifier(df.drop(columns=["track_id"]), normalization=stats, random_state=0)
+    assert list(X_test.columns) == stats.feature_cols
+    scaler = clf.named_steps["scale"]
+    assert isinstance(scaler, FrozenScaler)
+    np.testing.assert_array_equal(scaler.mean_, stats.mean)
+    np.testing.assert_allclose(scaler.transform(X_test), stats.transform(X_test), atol=1e-5)
+
+    # Cloned pipelines (cross-validation, grid search) keep the shared statistics.
+    scores = cross_val_score(clf, df[stats.feature_cols], df["label"], cv=3)
+    assert scores.mean() > 0.9
+    np.testing.assert_array_equal(clone(scaler).fit(X[:5]).mean_, stats.mean)
+
+    ids = df["track_id"].tolist()
+    edges = build_knn_edge_arrays(X, ids, k=5, normalization=stats)
+    reference = build_knn_edge_arrays(stats.transform(X), ids, k=5)
+    np.testing.assert_array_equal(edges.dst, reference.dst)
+
+    coords, pipeline = project_large(df, n_neighbors=10, pca_components=None, standardize=False, normalization=stats, random_state=0)
+    assert pipeline.feature_cols == stats.feature_cols and isinstance(pipeline.scaler, FrozenScaler)
+    np.testing.assert_array_equal(pipeline.scaler.mean_, stats.mean)
+    assert coords.shape[0] == len(df) and np.isfinite(coords[["x", "y"]].to_numpy()).all()
+
+    coords, _ = project_with_umap(df, n_neighbors=5, random_state=0, normalization=stats)
+    assert coords.shape[0] == len(df) and np.isfinite(coords[["x", "y"]].to_numpy()).all()
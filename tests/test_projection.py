@@ -1,7 +1,9 @@
 import numpy as np
 import pandas as pd
+import pytest
 
-from classically_punk.features.projection import project_with_umap
+from classically_punk.features.projection import ProjectionStore, knn_from_edges, project_large, project_with_umap
+from classically_punk.graph.schema import build_knn_edge_arrays
 
 
 def test_project_with_umap_returns_coordinates():
@@ -19,3 +21,71 @@ def test_project_with_umap_returns_coordinates():
     assert {"label", "x", "y"}.issubset(coords_df.columns)
     assert np.isfinite(coords_df[["x", "y"]].values).all()
     assert mapper.n_components == 2
+
+
+def _tracks(n_per_label=15, offset=0):
+    rng = np.random.default_rng(offset)
+    rows = []
+    for label, center in (("rock", (3.0, 0.0, 0.0)), ("jazz", (0.0, 3.0, 1.0))):
+        for i in range(n_per_label):
+            f = np.asarray(center) + 0.1 * rng.normal(size=3)
+            rows.append({"track_id": f"{label}{offset + i}", "label": label, "f1": f[0], "f2": f[1], "f3": f[2]})
+    return pd.DataFrame(rows)
+
+
+def test_projection_store_versions_and_transform(tmp_path):
+    store = ProjectionStore(tmp_path / "projections")
+    df = _tracks()
+    df.loc[0, "label"] = np.nan
+    version = store.fit(df, n_neighbors=5, random_state=0)
+    assert version == "v1"
+
+    # A fresh store (e.g. a restarted server) sees the version and places new tracks without refitting.
+    store = ProjectionStore(tmp_path / "projections")
+    listing = store.list_versions()
+    assert listing["version"].tolist() == ["v1"] and listing.loc[0, "n_points"] == len(df)
+    before = store.load_coords("v1")
+
+    new = _tracks(n_per_label=3, offset=100)
+    new.loc[0, "label"] = np.nan
+    placed = store.transform(new, version="v1")
+    assert placed.shape[0] == 6 and np.isfinite(placed[["x", "y"]].to_numpy()).all()
+
+    # Appending writes a new version; v1 still identifies the original map.
+    assert store.append(new, version="v1") == "v2"
+    pd.testing.assert_frame_equal(store.load_coords("v1"), before)
+    after = store.load_coords("v2")
+    assert len(after) == len(df) + 6
+    # Missing labels read back the same whether fitted or appended.
+    assert after.loc[after["id"].isin([df.loc[0, "track_id"], new.loc[0, "track_id"]]), "label"].tolist() == ["", ""]
+    np.testing.assert_array_equal(after[["x", "y"]].to_numpy()[: len(df)], before[["x", "y"]].to_numpy())
+    np.testing.assert_allclose(after[["x", "y"]].to_numpy()[len(df) :], placed[["x", "y"]].to_numpy())
+    assert store.metadata("v2")["n_points"] == len(df) + 6 and store.metadata("v2")["parent"] == "v1"
+    assert store.latest() == "v2" and store.next_version() == "v3"
+    assert store.transform(new, version="v2").shape[0] == 6
+
+
+def test_project_large_precomputed_knn_and_landmarks(tmp_path):
+    df = _tracks(n_per_label=60)
+    ids = df["track_id"].tolist()
+    X = df[["f1", "f2", "f3"]].to_numpy()
+    knn = knn_from_edges(build_knn_edge_arrays(X, ids, k=9), ids, n_neighbors=10)
+    assert (knn[0][:, 0] == np.arange(len(df))).all() and (knn[1][:, 0] == 0).all()
+
+    # The graph is over raw features, so UMAP must see raw features too.
+    with pytest.raises(ValueError, match="precomputed_knn"):
+        project_large(df, n_neighbors=10, pca_components=2, precomputed_knn=knn, random_state=0)
+    coords, _ = project_large(df, n_neighbors=10, standardize=False, pca_components=None, precomputed_knn=knn, random_state=0)
+    assert coords["track_id"].tolist() == ids and np.isfinite(coords[["x", "y"]].to_numpy()).all()
+    rock = coords.loc[coords["label"] == "rock", ["x", "y"]].mean()
+    jazz = coords.loc[coords["label"] == "jazz", ["x", "y"]].mean()
+    assert np.linalg.norm(rock - jazz) > 1.0
+
+    coords, pipeline = project_large(df, n_neighbors=10, landmarks=40, batch_size=25, random_state=0)
+    assert np.isfinite(coords[["x", "y"]].to_numpy()).all()
+    np.testing.assert_allclose(pipeline.transform(X[:3]).shape, (3, 2))
+
+    with pytest.raises(ValueError, match="landmarks"):
+        project_large(df, n_neighbors=10, landmarks=40, blocked_knn=True, random_state=0)
+    with pytest.raises(ValueError, match="blocked_knn"):
+        ProjectionStore(tmp_path / "projections").fit(df, large=True, n_neighbors=10, blocked_knn=True)
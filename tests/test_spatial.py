@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from classically_punk.features.spatial import MapIndex
+
+
+def _projection(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "track_id": [f"t{i}" for i in range(n)],
+            "x": rng.normal(size=n),
+            "y": rng.normal(scale=3.0, size=n),
+            "label": rng.choice(["rock", "jazz", "punk"], size=n, p=[0.6, 0.3, 0.1]),
+        }
+    )
+
+
+def test_bbox_and_nearest_match_brute_force(tmp_path):
+    df = _projection()
+    index = MapIndex.build(df, leaf_size=16)
+    index.save(tmp_path / "map.bundle")
+    index = MapIndex.load(tmp_path / "map.bundle")
+
+    bbox = (-0.5, -1.0, 1.0, 2.0)
+    hits = index.query_bbox(bbox)
+    inside = df["x"].between(bbox[0], bbox[2]) & df["y"].between(bbox[1], bbox[3])
+    assert set(hits["id"]) == set(df.loc[inside, "track_id"])
+
+    for x, y in [(0.0, 0.0), (2.5, -8.0), (-10.0, 10.0)]:
+        nn = index.nearest(x, y, k=7)
+        dist = np.hypot(df["x"] - x, df["y"] - y).to_numpy()
+        np.testing.assert_allclose(nn["distance"].to_numpy(), np.sort(dist)[:7], atol=1e-5)
+
+
+def test_zoom_clusters_aggregate_counts_and_labels():
+    df = _projection()
+    index = MapIndex.build(df, max_zoom=4)
+
+    top = index.clusters(0)
+    assert len(top) == 1 and top.loc[0, "count"] == len(df)
+    assert top.loc[0, "label"] == df["label"].mode()[0]
+    np.testing.assert_allclose(top.loc[0, ["x", "y"]].to_numpy(float), df[["x", "y"]].mean().to_numpy(), atol=1e-5)
+
+    for zoom in range(5):
+        assert index.clusters(zoom)["count"].sum() == len(df)
+    view = index.clusters(4, bbox=(-1.0, -1.0, 1.0, 1.0))
+    assert 0 < view["count"].sum() < len(df)
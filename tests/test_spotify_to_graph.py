@@ -26,3 +26,34 @@ def test_build_edges_creates_playlist_and_artist_edges(tmp_path: Path):
     types = set(edges["type"].tolist())
     assert "IN_PLAYLIST" in types
     assert "PERFORMS" in types
+
+
+def test_build_edges_dedupes_pairs_across_chunks(tmp_path: Path):
+    tracks_csv = tmp_path / "tracks.csv"
+    pd.DataFrame(
+        [
+            {"playlist_id": "pl1", "track_id": "t1", "artist_ids": "['a1', 'a2']"},
+            {"playlist_id": "pl1", "track_id": "t2", "artist_ids": "[a3]"},
+            {"playlist_id": "pl1", "track_id": "t1", "artist_ids": "['a1', 'a2']"},
+            {"playlist_id": None, "track_id": "t3", "artist_ids": None},
+            {"playlist_id": "pl2", "track_id": "t1", "artist_ids": "['a1', 'a2']"},
+        ]
+    ).to_csv(tracks_csv, index=False)
+
+    edges = build_edges(tmp_path / "playlists.csv", tracks_csv, chunksize=2)
+    assert list(edges.columns) == ["src", "dst", "type", "weight", "source", "version"]
+
+    in_playlist = edges[edges["type"] == "IN_PLAYLIST"]
+    assert in_playlist[["src", "dst"]].values.tolist() == [
+        ["playlist::pl1", "track::t1"],
+        ["playlist::pl1", "track::t2"],
+        ["playlist::pl2", "track::t1"],
+    ]
+
+    performs = edges[edges["type"] == "PERFORMS"]
+    assert performs[["src", "dst"]].values.tolist() == [
+        ["artist::a1", "track::t1"],
+        ["artist::a2", "track::t1"],
+        ["artist::a3", "track::t2"],
+    ]
+    assert edges["type"].tolist().index("PERFORMS") == len(in_playlist)
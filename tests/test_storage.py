@@ -0,0 +1,23 @@
+import numpy as np
+
+from classically_punk.storage import load_bundle, save_bundle
+
+
+def test_bundle_roundtrip_memmap(tmp_path):
+    path = tmp_path / "arrays.bin"
+    arrays = {
+        "weights": np.arange(10, dtype=np.float32).reshape(2, 5),
+        "ids": np.array(["a", "bb", "ccc"], dtype=object),
+        "empty": np.zeros((0, 3), dtype=np.int64),
+    }
+    save_bundle(path, arrays, meta={"version": "v1"})
+
+    loaded, meta = load_bundle(path)
+    assert meta == {"version": "v1"}
+    assert isinstance(loaded["weights"], np.memmap)
+    np.testing.assert_array_equal(loaded["weights"], arrays["weights"])
+    assert loaded["ids"].tolist() == ["a", "bb", "ccc"]
+    assert loaded["empty"].shape == (0, 3)
+
+    eager, _ = load_bundle(path, mmap=False)
+    assert not isinstance(eager["weights"], np.memmap)
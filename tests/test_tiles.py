@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from classically_punk.features.tiles import QUANT_MAX, TileSet, export_tiles
+
+
+@pytest.mark.parametrize("packed", [False, True])
+def test_tile_pyramid_roundtrip_and_downsampling(tmp_path, packed):
+    rng = np.random.default_rng(0)
+    n = 3000
+    df = pd.DataFrame(
+        {
+            "track_id": [f"t{i}" for i in range(n)],
+            "x": rng.normal(size=n),
+            "y": rng.normal(size=n),
+            "label": rng.choice(["rock", "jazz"], size=n),
+        }
+    )
+    out = tmp_path / ("tiles.bundle" if packed else "tiles")
+    header = export_tiles(df, out, max_zoom=3, max_points_per_tile=100, packed=packed)
+    tiles = TileSet.open(out)
+    assert header["n_tiles"] == len(tiles.tile_keys())
+
+    # The full-resolution level holds every point, within quantisation error.
+    top = pd.concat([tiles.points(z, x, y) for z, x, y in tiles.tile_keys() if z == 3], ignore_index=True)
+    merged = top.merge(df, left_on="id", right_on="track_id", suffixes=("", "_ref"))
+    assert len(merged) == n
+    cell = (df[["x", "y"]].max() - df[["x", "y"]].min()).to_numpy() / 8
+    assert (np.abs(merged["x"] - merged["x_ref"]) <= cell[0] / QUANT_MAX).all()
+    assert (np.abs(merged["y"] - merged["y_ref"]) <= cell[1] / QUANT_MAX).all()
+    assert (merged["label"] == merged["label_ref"]).all()
+
+    # Low zooms are capped, and points kept at zoom 0 are still present at zoom 1.
+    root = tiles.points(0, 0, 0)
+    assert len(root) == 100
+    zoom1 = pd.concat([tiles.points(z, x, y) for z, x, y in tiles.tile_keys() if z == 1])
+    assert set(root["id"]) <= set(zoom1["id"])
+    assert tiles.tile(0, 5, 5) is None
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from classically_punk.features.visualization import (
+    kde_density_surface,
+    plotly_scatter3d_large,
+    resolve_kde_method,
+    voxel_aggregate,
+)
+
+
+def test_fft_kde_matches_exact_kde():
+    rng = np.random.default_rng(0)
+    coords = np.vstack([rng.normal(size=(400, 3)), rng.normal(loc=3.0, size=(400, 3))])
+    exact = kde_density_surface(coords, bandwidth=0.6, grid_size=25, method="exact")
+    fast = kde_density_surface(coords, bandwidth=0.6, grid_size=25, method="fft")
+
+    for key in ("xx", "yy", "zz"):
+        np.testing.assert_array_equal(exact[key], fast[key])
+    err = np.abs(exact["density"] - fast["density"]).max() / exact["density"].max()
+    # Linear binning error scales with (grid step / bandwidth)^2; here the step is ~0.6 bandwidths.
+    assert err < 0.05
+
+    default = kde_density_surface(coords, bandwidth=0.6, grid_size=25)
+    assert set(default) == {"xx", "yy", "zz", "density"}
+    np.testing.assert_array_equal(default["density"], exact["density"])
+    assert resolve_kde_method(len(coords), 25) == "fft" and resolve_kde_method(len(coords), 10) == "exact"
+    with pytest.raises(ValueError):
+        kde_density_surface(coords, grid_size=1, method="fft")
+
+
+def test_large_scatter_single_trace_with_point_budget():
+    rng = np.random.default_rng(0)
+    n = 20_000
+    df = pd.DataFrame(rng.normal(size=(n, 3)), columns=["x", "y", "z"])
+    df["label"] = rng.choice(["rock", "jazz", "punk"], size=n)
+
+    fig = plotly_scatter3d_large(df, max_points=None)
+    trace = fig.data[0]
+    assert len(fig.data) == 1 and trace.x.dtype == np.float32
+    assert fig.layout.meta["labels"] == pd.unique(df["label"]).tolist()
+    np.testing.assert_array_equal(trace.customdata, np.arange(n))
+    assert '"bdata"' in fig.to_json()
+
+    sampled = plotly_scatter3d_large(df, max_points=2_000, method="density").data[0]
+    assert len(sampled.x) == 2_000
+    np.testing.assert_allclose(sampled.x, df["x"].to_numpy(np.float32)[sampled.customdata])
+
+    codes = pd.factorize(df["label"])[0]
+    agg = voxel_aggregate(df[["x", "y", "z"]].to_numpy(), codes, max_points=500)
+    assert len(agg["counts"]) <= 500 and agg["counts"].sum() == n
+    assert len(plotly_scatter3d_large(df, max_points=500, method="voxel").data[0].x) == len(agg["counts"])